@@ -0,0 +1,484 @@
+# -*- coding:utf-8 -*-
+"""Benchmark of rika modules.
+
+bench_hashsum() measures throughput of rika.hashsum functions, sweeping
+algorithms, block sizes, file sizes, input modes (file path, mmap or bytes)
+and page cache state (warm or cold).
+bench_cache() measures throughput and page cache residency of
+rika.hashsum with and without I/O hints (posix_fadvise and O_DIRECT).
+bench_html_image() measures rika.html_image.create_table() on tall images,
+so that time per pixel shows whether it is linear in pixel count.
+Results are dict (and JSON in main()), so that they can be compared across
+releases.
+
+You can try with,
+$python -m rika.bench hashsum --file-sizes 1M 64M > result.json
+$python -m rika.bench cache --file-size 1G > cache.json
+$python -m rika.bench html_image --heights 256 4096 > html_image.json
+"""
+
+import functools
+import json
+import mmap
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import rika.hashsum
+import rika.html_image
+
+__author__ = 'suomesta'
+__version__ = '1.0.0'
+
+# -------->>-------->>-------->>-------->>-------->> constants
+
+ARGPARSE_DESCRIPTION = """\
+Benchmark rika modules, and output results in JSON."""
+
+ALGORITHMS = ('adler32', 'crc32', 'md5', 'sha1', 'sha256', 'sha512',
+              'blake2b', 'blake2s', 'sha3_256', 'xxh64')
+
+BLOCK_SIZES = (4 * 1024, 64 * 1024, rika.hashsum.DEFAULT_BLOCK_SIZE,
+               1024 * 1024)
+
+FILE_SIZES = (64 * 1024, 16 * 1024 * 1024)
+
+REPEAT = 3
+
+OVERHEAD_CALLS = 10000
+
+FUNCTIONS = ('adler32', 'crc32', 'md5', 'sha1', 'sha224', 'sha256', 'sha384',
+             'sha512')  # algorithms which have own function in hashsum
+
+CACHE_FILE_SIZE = 256 * 1024 * 1024
+
+CACHE_BLOCK_SIZE = 1024 * 1024
+
+CACHE_HINTS = {
+    'none': None,
+    'sequential': rika.hashsum.IOHints(dont_need=False),
+    'readahead': rika.hashsum.IOHints(dont_need=False,
+                                      readahead=16 * 1024 * 1024),
+    'dont_need': rika.hashsum.BULK_HINTS,
+    'direct': rika.hashsum.IOHints(sequential=False, dont_need=False,
+                                   direct=True),
+}
+
+HTML_WIDTH = 64
+
+HTML_HEIGHTS = (256, 1024, 4096)
+
+_SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# -------->>-------->>-------->>-------->>-------->> private
+
+
+def _parse_size(text):
+    """Convert '64K', '16M' or '1G' into int."""
+    unit = _SIZE_UNITS.get(text[-1:].upper())
+    if unit is None:
+        return int(text)
+    return int(text[:-1]) * unit
+
+
+def _peak_rss():
+    """Return peak RSS of this process in KiB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, others report KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _peak_alloc(function, args):
+    """Call function(*args) once, and return its peak allocation in KiB.
+
+    Memory allocated by Python is traced by tracemalloc only during the
+    call, so that each case is measured separately. mmap is not counted.
+    """
+    tracemalloc.start()
+    try:
+        function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+def _drop_cache(path):
+    """Drop page cache of path as far as possible, and return success."""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def _resident_ratio(path):
+    """Return ratio of pages of path in page cache, or None if unknown.
+
+    mincore() of libc is called via ctypes, so that it works only on
+    platforms which have it (e.g. Linux).
+    """
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        libc_mmap, mincore, munmap = libc.mmap, libc.mincore, libc.munmap
+    except (ImportError, OSError, AttributeError):
+        return None
+    libc_mmap.restype = ctypes.c_void_p
+    libc_mmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                          ctypes.c_int, ctypes.c_int, ctypes.c_long)
+    mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p)
+    munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+
+    size = os.path.getsize(path)
+    if not size:
+        return None
+    pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    vector = (ctypes.c_ubyte * pages)()
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # mapping without touching does not read pages into cache
+        address = libc_mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, fd,
+                            0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            return None
+        try:
+            if mincore(address, size, vector) != 0:
+                return None
+        finally:
+            munmap(address, size)
+    finally:
+        os.close(fd)
+    return sum(i & 1 for i in vector) / pages
+
+
+def _create_file(directory, size):
+    """Create file of random data, and return its path."""
+    fd, path = tempfile.mkstemp(prefix='rika_bench_', dir=directory)
+    with os.fdopen(fd, 'wb') as file:
+        block = os.urandom(min(size, 1024 * 1024))
+        remain = size
+        while remain > 0:
+            remain -= file.write(block[:remain])
+    return path
+
+
+def _best_time(function, args, repeat, before=None):
+    """Call function(*args) repeat times, and return the best seconds."""
+    best = None
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _calculate(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+               mmap=False, algorithm='sha256'):
+    """Call rika.hashsum.calculate() in order of arguments of functions."""
+    return rika.hashsum.calculate(path_or_bytes, algorithm, block_size, mmap)
+
+
+def _per_call(algorithm):
+    """Get function which users call for one input of algorithm.
+
+    rika.hashsum.crc32() and so on for FUNCTIONS, otherwise
+    rika.hashsum.calculate() bound to algorithm.
+    """
+    if algorithm in FUNCTIONS:
+        return getattr(rika.hashsum, algorithm)
+    return functools.partial(rika.hashsum.calculate, algorithm=algorithm)
+
+
+def _record(algorithm, mode, cache, file_size, block_size, seconds,
+            peak_alloc_kib):
+    """Create one result in dict."""
+    return {
+        'algorithm': algorithm,
+        'input': mode,
+        'cache': cache,
+        'file_size': file_size,
+        'block_size': block_size,
+        'seconds': seconds,
+        'mb_per_s': file_size / seconds / 1e6 if seconds else None,
+        'peak_alloc_kib': peak_alloc_kib,
+    }
+
+# -------->>-------->>-------->>-------->>-------->> public
+
+
+def bench_hashsum(algorithms=ALGORITHMS, block_sizes=BLOCK_SIZES,
+                  file_sizes=FILE_SIZES, repeat=REPEAT, cold=True,
+                  directory=None):
+    """Measure throughput of rika.hashsum functions.
+
+    param[in]  algorithms: iterable of algorithm names in str. each name
+                           shall be one of rika.hashsum.algorithms().
+    param[in]  block_sizes: iterable of block_size in int.
+    param[in]  file_sizes: iterable of file size in int.
+    param[in]  repeat: number of measurement. the best one is reported.
+    param[in]  cold: True measures also cold page cache by
+                     posix_fadvise(DONTNEED). ignored if it is unavailable.
+    param[in]  directory: directory for temporary files. None means default
+                          temporary directory.
+    return     dict. 'results' is list of dict, which has 'algorithm',
+               'input' ('path', 'mmap' or 'bytes'), 'cache' ('warm' or
+               'cold'), 'file_size', 'block_size' (None for mmap and
+               bytes), 'seconds', 'mb_per_s' and 'peak_alloc_kib' (peak
+               of memory allocated by the case itself, traced in an extra
+               call).
+               'peak_rss_kib' is peak RSS of the whole process.
+               'overhead' is list of dict, which has 'algorithm',
+               'us_per_call' (microseconds of one call with b'' of
+               rika.hashsum.crc32() and so on, or of calculate() for
+               algorithms not in FUNCTIONS) and
+               'us_per_batch_item' (microseconds of one b'' in
+               rika.hashsum.batch()).
+    """
+    results = []
+    overhead = []
+
+    for algorithm in algorithms:
+        function = _per_call(algorithm)
+        seconds = _best_time(
+            lambda: [function(b'') for _ in range(OVERHEAD_CALLS)], (),
+            repeat)
+        buffers = [b''] * OVERHEAD_CALLS
+        batch_seconds = _best_time(rika.hashsum.batch, (algorithm, buffers),
+                                   repeat)
+        overhead.append({
+            'algorithm': algorithm,
+            'us_per_call': seconds / OVERHEAD_CALLS * 1e6,
+            'us_per_batch_item': batch_seconds / OVERHEAD_CALLS * 1e6,
+        })
+
+    for file_size in file_sizes:
+        path = _create_file(directory, file_size)
+        try:
+            for algorithm in algorithms:
+                function = functools.partial(_calculate, algorithm=algorithm)
+                for block_size in block_sizes:
+                    function(path, block_size)  # warm up
+                    seconds = _best_time(function, (path, block_size),
+                                         repeat)
+                    peak = _peak_alloc(function, (path, block_size))
+                    results.append(_record(algorithm, 'path', 'warm',
+                                           file_size, block_size, seconds,
+                                           peak))
+                    if cold and _drop_cache(path):
+                        seconds = _best_time(
+                            function, (path, block_size), repeat,
+                            lambda: _drop_cache(path))
+                        results.append(_record(algorithm, 'path', 'cold',
+                                               file_size, block_size,
+                                               seconds, peak))
+
+                mapped = functools.partial(function, mmap=True)
+                seconds = _best_time(mapped, (path,), repeat)
+                results.append(_record(algorithm, 'mmap', 'warm',
+                                       file_size, None, seconds,
+                                       _peak_alloc(mapped, (path,))))
+
+                with open(path, 'rb') as file:
+                    data = file.read()
+                seconds = _best_time(function, (data,), repeat)
+                peak = _peak_alloc(function, (data,))
+                del data
+                results.append(_record(algorithm, 'bytes', 'warm',
+                                       file_size, None, seconds, peak))
+        finally:
+            os.remove(path)
+
+    return {'results': results, 'overhead': overhead,
+            'peak_rss_kib': _peak_rss()}
+
+
+def bench_cache(algorithm='crc32', file_size=CACHE_FILE_SIZE,
+                block_size=CACHE_BLOCK_SIZE, hints=None, repeat=1,
+                directory=None):
+    """Measure throughput and page cache residency with I/O hints.
+
+    Each measurement starts with cold page cache, and residency is measured
+    by mincore() after hashing. It shows how much hashing leaves behind in
+    page cache, i.e. how much it evicts hot data of other processes.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  file_size: file size in int.
+    param[in]  block_size: block_size in int.
+    param[in]  hints: dict whose key is label and whose value is
+                      rika.hashsum.IOHints or None. None means CACHE_HINTS.
+    param[in]  repeat: number of measurement. the best one is reported.
+    param[in]  directory: directory for temporary files. None means default
+                          temporary directory. tmpfs is meaningless.
+    return     dict. 'results' is list of dict, which has 'hints' (label),
+               'algorithm', 'file_size', 'block_size', 'seconds',
+               'mb_per_s' and 'resident_ratio' (0.0 to 1.0, or None if
+               unknown). 'cold' is False if page cache cannot be dropped.
+    """
+    if hints is None:
+        hints = CACHE_HINTS
+    results = []
+    path = _create_file(directory, file_size)
+    try:
+        cold = _drop_cache(path)
+        for label, io_hints in hints.items():
+            function = functools.partial(rika.hashsum.calculate,
+                                         algorithm=algorithm,
+                                         block_size=block_size,
+                                         hints=io_hints)
+            seconds = _best_time(function, (path,), repeat,
+                                 lambda: _drop_cache(path))
+            results.append({
+                'hints': label,
+                'algorithm': algorithm,
+                'file_size': file_size,
+                'block_size': block_size,
+                'seconds': seconds,
+                'mb_per_s': file_size / seconds / 1e6 if seconds else None,
+                'resident_ratio': _resident_ratio(path),
+            })
+    finally:
+        os.remove(path)
+    return {'results': results, 'cold': cold}
+
+
+def bench_html_image(width=HTML_WIDTH, heights=HTML_HEIGHTS, repeat=REPEAT):
+    """Measure rika.html_image.create_table() on tall images.
+
+    Each image is width x height, and given as list of tuple, raw RGB bytes
+    and numpy array (only if NumPy is installed). 'us_per_pixel' should not
+    grow with height, otherwise table generation is not linear.
+    param[in]  width: width of images in int.
+    param[in]  heights: iterable of height in int.
+    param[in]  repeat: number of measurement. the best one is reported.
+    return     dict. 'results' is list of dict, which has 'input' ('list',
+               'bytes' or 'numpy'), 'width', 'height', 'seconds' and
+               'us_per_pixel'.
+    """
+    results = []
+    for height in heights:
+        pixels = width * height
+        data = os.urandom(pixels * 3)
+        inputs = {
+            'list': list(zip(*[iter(data)] * 3)),
+            'bytes': data,
+        }
+        numpy = rika.html_image._numpy
+        if numpy is not None:
+            inputs['numpy'] = numpy.frombuffer(data, numpy.uint8).reshape(
+                height, width, 3)
+        for mode, rgb_obj in inputs.items():
+            seconds = _best_time(
+                lambda: ''.join(rika.html_image.create_table(width, height,
+                                                             rgb_obj)),
+                (), repeat)
+            results.append({
+                'input': mode,
+                'width': width,
+                'height': height,
+                'seconds': seconds,
+                'us_per_pixel': seconds / pixels * 1e6 if pixels else None,
+            })
+    return {'results': results}
+
+
+def main():
+    """Call bench_*() via argparse, and output JSON.
+
+    $python -m rika.bench -o result.json hashsum
+    is a good way to use this program.
+    """
+    # parse args using argparse
+    import argparse
+    parser = argparse.ArgumentParser(description=ARGPARSE_DESCRIPTION)
+    parser.add_argument('-v', '--version', action='version',
+                        version=('%(prog)s ' + __version__))
+    parser.add_argument('-o', '--output', metavar='file',
+                        type=str, help='output file. default is stdout')
+    subparsers = parser.add_subparsers(dest='target', required=True)
+
+    hashsum = subparsers.add_parser('hashsum', help='benchmark hashsum')
+    hashsum.add_argument('--algorithms', nargs='+', metavar='name',
+                         default=list(ALGORITHMS), help='algorithm names')
+    hashsum.add_argument('--block-sizes', nargs='+', metavar='size',
+                         type=_parse_size, default=list(BLOCK_SIZES),
+                         help='block sizes. K, M and G are allowed')
+    hashsum.add_argument('--file-sizes', nargs='+', metavar='size',
+                         type=_parse_size, default=list(FILE_SIZES),
+                         help='file sizes. K, M and G are allowed')
+    hashsum.add_argument('--repeat', metavar='n', type=int, default=REPEAT,
+                         help='number of measurement')
+    hashsum.add_argument('--no-cold', action='store_true',
+                         help='do not measure cold page cache')
+    hashsum.add_argument('--directory', metavar='dir', type=str,
+                         help='directory for temporary files')
+
+    cache = subparsers.add_parser(
+        'cache', help='benchmark page cache residency of I/O hints')
+    cache.add_argument('--algorithm', metavar='name', default='crc32',
+                       help='algorithm name')
+    cache.add_argument('--file-size', metavar='size', type=_parse_size,
+                       default=CACHE_FILE_SIZE,
+                       help='file size. K, M and G are allowed')
+    cache.add_argument('--block-size', metavar='size', type=_parse_size,
+                       default=CACHE_BLOCK_SIZE,
+                       help='block size. K, M and G are allowed')
+    cache.add_argument('--repeat', metavar='n', type=int, default=1,
+                       help='number of measurement')
+    cache.add_argument('--directory', metavar='dir', type=str,
+                       help='directory for temporary files')
+
+    html_image = subparsers.add_parser(
+        'html_image', help='benchmark create_table() of html_image')
+    html_image.add_argument('--width', metavar='n', type=int,
+                            default=HTML_WIDTH, help='width of images')
+    html_image.add_argument('--heights', nargs='+', metavar='n', type=int,
+                            default=list(HTML_HEIGHTS),
+                            help='heights of images')
+    html_image.add_argument('--repeat', metavar='n', type=int,
+                            default=REPEAT, help='number of measurement')
+
+    args = parser.parse_args()
+
+    # call benchmark, and output
+    report = {
+        'target': args.target,
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    if args.target == 'hashsum':
+        report.update(bench_hashsum(args.algorithms, args.block_sizes,
+                                    args.file_sizes, args.repeat,
+                                    not args.no_cold, args.directory))
+    elif args.target == 'html_image':
+        report.update(bench_html_image(args.width, args.heights,
+                                       args.repeat))
+    else:
+        report.update(bench_cache(args.algorithm, args.file_size,
+                                  args.block_size, None, args.repeat,
+                                  args.directory))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            print(text, file=file)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
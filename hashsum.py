@@ -4,15 +4,94 @@
 Defines functions, which calculate hash or sum.
 adler32, crc32, md5, sha1, sha224, sha256, sha384, and sha512 are supported.
 All functions have same arguments type and returns type.
+calculate() supports also blake2b, blake2s, sha3_*, shake_* and xxh64 by
+name, and register() adds other algorithms to it.
+multi() calculates several of them at once, reading the data only once.
+hash_tree() calculates hash or sum of files in a directory tree in parallel.
+HashCache stores calculated values of files in a file, and reuses them while
+the files are not changed.
+new() creates Hasher for incremental calculation, and from_stream()
+calculates hash or sum of iterable of bytes or file-like object.
+chunked() calculates hash or sum of fixed-size chunks of a file in parallel,
+and their Merkle root.
+crc32_combine() and adler32_combine() combine sums of two adjacent data, and
+parallel_sum() uses them to calculate CRC32 or Adler-32 of a file in
+parallel.
+verify_manifest() checks files listed in a checksum manifest in parallel.
+find_duplicates() finds files of same content by size, partial sum and hash.
+Observer reports progress of hashing, and aggregates counters of it.
+IOHints (e.g. BULK_HINTS) keeps bulk hashing from polluting page cache.
+RollingAdler32 and rolling_adler32() are rolling checksums for delta-sync,
+and cdc_chunks() splits data into content-defined chunks for dedup.
+
+You can try with,
+$python -m rika.hashsum -a sha256 -j 4 'dist/*' > SHA256SUMS
+$python -m rika.hashsum --check SHA256SUMS
 """
 
+import array
+import errno
+import os
+import re
+import shutil
+import stat as _stat
+import sys
+import mmap as _mmap
 import zlib
 import hashlib
+import collections.abc
+import concurrent.futures
+import sqlite3
+import struct
+import threading
+import time
 import rika
 
+try:
+    import xxhash as _xxhash
+except ImportError:  # pure python xxh64 is used
+    _xxhash = None
+
+try:
+    import numpy as _numpy
+except ImportError:  # pure python rolling checksum and chunking are used
+    _numpy = None
+
 __author__ = 'suomesta'
 __version__ = '1.0.0'
 
+DEFAULT_BLOCK_SIZE = 256 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+PROGRESS_INTERVAL = 1.0  # seconds
+CDC_MIN_SIZE = 2 * 1024
+CDC_AVG_SIZE = 8 * 1024
+CDC_MAX_SIZE = 64 * 1024
+
+ARGPARSE_DESCRIPTION = """\
+Print or check hash or sum of files.
+Output is compatible with coreutils (e.g. sha256sum). If two or more
+algorithms are given, or --tag is set, then BSD style is output."""
+
+_ADLER32_BASE = 65521
+_MIN_BUFFER_SIZE = 8 * 1024  # even for small file, which may grow
+_DIRECT_ALIGNMENT = 4096  # O_DIRECT buffer, offset and size
+_DROP_INTERVAL = 8 * 1024 * 1024  # bytes between posix_fadvise(DONTNEED)
+_CRC32_POLYNOMIAL = 0xedb88320  # reflected
+
+# random 32 bits for each byte value, fixed so that chunks are stable
+_GEAR = tuple(int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], 'big')
+              for i in range(256))
+_GEAR_WINDOW = 32  # bytes, which affect 32 bits gear hash
+_ROLLING_SPAN = 1 << 16  # positions calculated at once by numpy
+
+_BATCH_FUNCTIONS = {'adler32': zlib.adler32, 'crc32': zlib.crc32}
+
+_EXECUTORS = {
+    'thread': concurrent.futures.ThreadPoolExecutor,
+    'process': concurrent.futures.ProcessPoolExecutor,
+}
+
 
 class _WrapZlib(object):
     """ Wrapper class for zlib sum.
@@ -61,190 +140,2678 @@ class _WrapZlib(object):
         """
         return self.__data.to_bytes(self.digest_size, byteorder='big')
 
+    def hexdigest(self):
+        """ get data in hex str
+
+        This method is correspond to hexdigest() of hashlib.
+        return     str of data in hex lower case
+        """
+        return self.digest().hex()
+
+    def copy(self):
+        """ copy instance
+
+        This method is correspond to copy() of hashlib.
+        return     new instance which has same data
+        """
+        other = _WrapZlib(self.name)
+        other.__data = self.__data
+        return other
+
+
+class _WrapShake(object):
+    """ Wrapper class for SHAKE of hashlib.
+
+    digest() of SHAKE requires length, unlike other hash functions.
+    This class fixes the length, and make it same interface with others.
+    """
+    def __init__(self, name, digest_size, instance=None):
+        """ initialize.
+
+        param[in]  name: shall be 'shake_128' or 'shake_256'.
+        param[in]  digest_size: length of digest() in bytes.
+        param[in]  instance: hashlib's SHAKE object. None creates new one.
+        """
+        self.name = name
+        self.digest_size = digest_size
+        self.__instance = instance or hashlib.new(name)
+
+    def update(self, byte_data):
+        """ update data """
+        self.__instance.update(byte_data)
+
+    def digest(self):
+        """ get data in bytes """
+        return self.__instance.digest(self.digest_size)
+
+    def hexdigest(self):
+        """ get data in hex str """
+        return self.__instance.hexdigest(self.digest_size)
+
+    def copy(self):
+        """ copy instance """
+        return _WrapShake(self.name, self.digest_size,
+                          self.__instance.copy())
+
+
+class _XXH64(object):
+    """ XXH64 in pure python.
+
+    Used if xxhash package is not installed. It is same as xxhash.xxh64
+    with seed 0, but it is much slower.
+    """
+    _PRIME1 = 0x9e3779b185ebca87
+    _PRIME2 = 0xc2b2ae3d27d4eb4f
+    _PRIME3 = 0x165667b19e3779f9
+    _PRIME4 = 0x85ebca77c2b2ae63
+    _PRIME5 = 0x27d4eb2f165667c5
+    _MASK = 0xffffffffffffffff
+
+    name = 'xxh64'
+    digest_size = 8
+
+    def __init__(self):
+        """ initialize. """
+        self.__accs = [
+            (self._PRIME1 + self._PRIME2) & self._MASK,
+            self._PRIME2,
+            0,
+            -self._PRIME1 & self._MASK,
+        ]
+        self.__buffer = b''
+        self.__length = 0
+
+    @classmethod
+    def _round(cls, acc, lane):
+        """ one round of accumulator """
+        acc = (acc + lane * cls._PRIME2) & cls._MASK
+        acc = ((acc << 31) | (acc >> 33)) & cls._MASK
+        return (acc * cls._PRIME1) & cls._MASK
+
+    def update(self, byte_data):
+        """ update data
+
+        data is consumed in stripes of 32 bytes. the rest is kept.
+        """
+        data = self.__buffer + bytes(byte_data)
+        self.__length += len(data) - len(self.__buffer)
+        stripes = len(data) // 32 * 32
+        if stripes:
+            accs = self.__accs
+            round_ = self._round
+            for lanes in struct.iter_unpack('<4Q', data[:stripes]):
+                accs[0] = round_(accs[0], lanes[0])
+                accs[1] = round_(accs[1], lanes[1])
+                accs[2] = round_(accs[2], lanes[2])
+                accs[3] = round_(accs[3], lanes[3])
+        self.__buffer = data[stripes:]
+
+    def digest(self):
+        """ get data in bytes (big endian, same as xxhash) """
+        mask, prime1, prime2 = self._MASK, self._PRIME1, self._PRIME2
+        prime3, prime4, prime5 = self._PRIME3, self._PRIME4, self._PRIME5
+
+        def rotl(value, bits):
+            """ inner function to rotate 64 bits left """
+            return ((value << bits) | (value >> (64 - bits))) & mask
+
+        if self.__length >= 32:
+            acc1, acc2, acc3, acc4 = self.__accs
+            h = (rotl(acc1, 1) + rotl(acc2, 7) + rotl(acc3, 12) +
+                 rotl(acc4, 18)) & mask
+            for acc in self.__accs:
+                h ^= self._round(0, acc)
+                h = (h * prime1 + prime4) & mask
+        else:
+            h = prime5
+        h = (h + self.__length) & mask
+
+        rest = self.__buffer
+        i = 0
+        while i + 8 <= len(rest):
+            h ^= self._round(0, int.from_bytes(rest[i:i + 8], 'little'))
+            h = (rotl(h, 27) * prime1 + prime4) & mask
+            i += 8
+        if i + 4 <= len(rest):
+            h ^= (int.from_bytes(rest[i:i + 4], 'little') * prime1) & mask
+            h = (rotl(h, 23) * prime2 + prime3) & mask
+            i += 4
+        for byte in rest[i:]:
+            h ^= (byte * prime5) & mask
+            h = (rotl(h, 11) * prime1) & mask
+
+        h ^= h >> 33
+        h = (h * prime2) & mask
+        h ^= h >> 29
+        h = (h * prime3) & mask
+        h ^= h >> 32
+        return h.to_bytes(8, byteorder='big')
+
+    def hexdigest(self):
+        """ get data in hex str """
+        return self.digest().hex()
+
+    def copy(self):
+        """ copy instance """
+        other = _XXH64()
+        other.__accs = list(self.__accs)
+        other.__buffer = self.__buffer
+        other.__length = self.__length
+        return other
+
+
+_FACTORIES = {
+    'adler32': lambda: _WrapZlib('adler32'),
+    'crc32': lambda: _WrapZlib('crc32'),
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha224': hashlib.sha224,
+    'sha256': hashlib.sha256,
+    'sha384': hashlib.sha384,
+    'sha512': hashlib.sha512,
+    'blake2b': hashlib.blake2b,
+    'blake2s': hashlib.blake2s,
+    'sha3_224': hashlib.sha3_224,
+    'sha3_256': hashlib.sha3_256,
+    'sha3_384': hashlib.sha3_384,
+    'sha3_512': hashlib.sha3_512,
+    'shake_128': lambda: _WrapShake('shake_128', 32),
+    'shake_256': lambda: _WrapShake('shake_256', 64),
+    'xxh64': _xxhash.xxh64 if _xxhash is not None else _XXH64,
+}
+
+
+def _new(name):
+    """ create instance by name
+
+    create instance of calculating class from algorithm name.
+    param[in]  name: algorithm name. shall be one of algorithms().
+    return     instance of _WrapZlib, hashlib's object, or so on.
+    raise      TypeError: name is not str
+               LookupError: name is unknown algorithm
+    """
+    rika.check_type('name', locals(), allow=str)
+
+    if name not in _FACTORIES:
+        raise LookupError('unknown algorithm: ' + name)
+    return _FACTORIES[name]()
+
+
+def algorithms():
+    """ names of supported algorithms
+
+    return     sorted list of algorithm names in str, including registered
+               ones.
+    """
+    return sorted(_FACTORIES)
+
 
-def _skeleton(path_or_bytes, block_size, instance):
+def register(name, factory, replace=False):
+    """ register algorithm
+
+    Add algorithm, which is available by name in calculate(), multi(),
+    new() and so on, in this process. Workers of 'process' executor (e.g.
+    hash_tree() and chunked()) inherit registered algorithms only with
+    'fork' start method. with 'spawn' or 'forkserver' (default on Windows
+    and macOS), they import this module again and know only built-in
+    algorithms, so that registered algorithms shall be used with 'thread'
+    executor.
+    param[in]  name: algorithm name in str.
+    param[in]  factory: callable without argument, which returns object
+                        having same interface with hashlib's hash object
+                        (update(), digest(), hexdigest(), copy() and
+                        digest_size).
+    param[in]  replace: True allows to replace existing algorithm.
+    raise      TypeError: name is not str, or factory is not callable
+               ValueError: name is already registered and replace is False
+    """
+    rika.check_type('name', locals(), allow=str)
+    rika.check_type('factory', locals(), allow=collections.abc.Callable)
+    if name in _FACTORIES and not replace:
+        raise ValueError('already registered algorithm: ' + name)
+    _FACTORIES[name] = factory
+
+
+Progress = collections.namedtuple(
+    'Progress',
+    ['algorithms', 'bytes', 'total', 'seconds', 'bytes_per_second', 'done'])
+Progress.__doc__ = """ progress of one input, given to Observer.on_progress()
+
+algorithms is tuple of algorithm names, bytes is bytes processed so far,
+total is size of input in bytes (None if unknown), seconds is elapsed
+time, bytes_per_second is throughput (None if seconds is 0), and done is
+True at the last report of the input.
+"""
+
+
+class Observer(object):
+    """ progress and statistics of hashing
+
+    Observer is given to functions by observer argument. It reports progress
+    of each input at intervals, and aggregates counters per algorithm over
+    all inputs. It is thread-safe, so that one observer can be shared by
+    threads and hash_tree().
+    Override on_progress(), or give callback, to receive Progress.
+
+    typical usage is,
+    observer = Observer(print, interval=5.0)
+    for path in paths:
+        sha256(path, observer=observer)
+    print(observer.stats())
+    """
+    __slots__ = ('__callback', '__interval', '__lock', '__counters')
+
+    def __init__(self, callback=None, interval=PROGRESS_INTERVAL):
+        """ initialize.
+
+        param[in]  callback: callable with one argument Progress, or None.
+        param[in]  interval: minimum seconds between reports of one input.
+                             0 reports every block. the last report (done
+                             is True) is always given.
+        raise      TypeError: callback is neither callable nor None, or
+                              interval is neither int nor float
+                   ValueError: interval is negative
+        """
+        rika.check_type('callback', locals(),
+                        allow=(collections.abc.Callable, type(None)))
+        rika.check_type('interval', locals(), allow=(int, float),
+                        not_allow=bool)
+        if interval < 0:
+            raise ValueError('interval shall be 0 or more')
+
+        self.__callback = callback
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__counters = {}
+
+    @property
+    def interval(self):
+        """ getter of interval in seconds """
+        return self.__interval
+
+    def on_progress(self, progress):
+        """ receive progress
+
+        called in the thread which calculates. default implementation calls
+        callback.
+        param[in]  progress: Progress of one input.
+        """
+        if self.__callback is not None:
+            self.__callback(progress)
+
+    def add(self, algorithms, size, seconds):
+        """ add one input to counters
+
+        called when calculation of an input is finished.
+        param[in]  algorithms: iterable of algorithm names in str.
+        param[in]  size: bytes of the input.
+        param[in]  seconds: elapsed time of the input.
+        """
+        with self.__lock:
+            for name in algorithms:
+                counter = self.__counters.setdefault(name, [0, 0, 0.0])
+                counter[0] += 1
+                counter[1] += size
+                counter[2] += seconds
+
+    def stats(self):
+        """ get counters
+
+        multi() counts one input and its elapsed time for each algorithm.
+        return     dict whose key is algorithm name and whose value is dict
+                   of 'files', 'bytes', 'seconds' and 'bytes_per_second'.
+                   it can be exported by json.dumps().
+        """
+        with self.__lock:
+            return {
+                name: {
+                    'files': files,
+                    'bytes': size,
+                    'seconds': seconds,
+                    'bytes_per_second': size / seconds if seconds else None,
+                }
+                for name, (files, size, seconds) in self.__counters.items()
+            }
+
+    def reset(self):
+        """ clear counters """
+        with self.__lock:
+            self.__counters.clear()
+
+
+class _Tracker(object):
+    """ progress of one input
+
+    update() is given to _feed() as one of update functions, so that it
+    counts bytes of blocks.
+    """
+    __slots__ = ('observer', 'algorithms', 'total', 'bytes', 'start', 'last')
+
+    def __init__(self, observer, algorithms):
+        """ initialize.
+
+        param[in]  observer: Observer.
+        param[in]  algorithms: tuple of algorithm names.
+        """
+        self.observer = observer
+        self.algorithms = algorithms
+        self.total = None
+        self.bytes = 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, block):
+        """ count block, and report if interval passed """
+        self.bytes += len(block)
+        now = time.perf_counter()
+        if now - self.last >= self.observer.interval:
+            self.last = now
+            self.report(now, False)
+
+    def report(self, now, done):
+        """ report progress to observer """
+        seconds = now - self.start
+        self.observer.on_progress(Progress(
+            self.algorithms, self.bytes, self.total, seconds,
+            self.bytes / seconds if seconds else None, done))
+
+    def finish(self):
+        """ report the last progress, and add counters to observer """
+        now = time.perf_counter()
+        self.report(now, True)
+        self.observer.add(self.algorithms, self.bytes, now - self.start)
+
+
+def _track(observer, algorithms):
+    """ create _Tracker
+
+    param[in]  observer: Observer or None.
+    param[in]  algorithms: tuple of algorithm names.
+    return     _Tracker, or None if observer is None.
+    raise      TypeError: observer is neither Observer nor None
+    """
+    if observer is None:
+        return None
+    rika.check_type('observer', locals(), allow=Observer)
+    return _Tracker(observer, algorithms)
+
+
+IOHints = collections.namedtuple(
+    'IOHints', ['sequential', 'dont_need', 'direct', 'readahead'])
+IOHints.__new__.__defaults__ = (True, True, False, 0)
+IOHints.__doc__ = """ I/O hints for reading file path, given by hints argument
+
+sequential issues posix_fadvise(SEQUENTIAL) before reading. dont_need
+issues posix_fadvise(DONTNEED) for read range while reading and for whole
+file at the end, so that page cache is not kept. direct opens file with
+O_DIRECT and reads into aligned buffer (falls back to normal read if file
+system refuses it at open or at reading). readahead is bytes prefetched
+ahead of reading by posix_fadvise(WILLNEED), 0 means kernel default.
+Hints which the platform does not support are ignored. posix_fadvise() is
+issued only for regular file.
+"""
+
+BULK_HINTS = IOHints()  # sequential and dont_need, for bulk verification
+
+
+def _fadvise(fd, offset, length, advice):
+    """ call os.posix_fadvise() if platform supports it
+
+    param[in]  fd: file descriptor.
+    param[in]  offset: start of range.
+    param[in]  length: length of range. 0 means until the end of file.
+    param[in]  advice: name of advice in os, e.g. 'POSIX_FADV_DONTNEED'.
+    """
+    advice = getattr(os, advice, None)
+    if advice is not None:
+        os.posix_fadvise(fd, offset, length, advice)
+
+
+def _buffer_size(block_size, file_stat):
+    """ decide buffer size of reading file
+
+    buffer is not larger than regular file, but not smaller than
+    _MIN_BUFFER_SIZE, because file may grow after fstat(). size of other
+    files (pipe, character device, /proc, ...) is not reliable, so that
+    block_size is used as it is.
+    param[in]  block_size: buffer size requested. shall be positive.
+    param[in]  file_stat: os.stat_result of the file.
+    return     buffer size in int.
+    """
+    if _stat.S_ISREG(file_stat.st_mode):
+        return min(block_size, max(_MIN_BUFFER_SIZE, file_stat.st_size))
+    return block_size
+
+
+def _open_hinted(path, hints):
+    """ open file path according to hints
+
+    param[in]  path: appointed file path.
+    param[in]  hints: IOHints.
+    return     tuple(file, direct). file is opened in unbuffered binary
+               mode, direct is True if it is opened with O_DIRECT.
+    raise      OSError: an error involving open()
+    """
+    if hints.direct and hasattr(os, 'O_DIRECT'):
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_DIRECT)
+        except OSError as error:
+            if error.errno != errno.EINVAL:  # EINVAL is not supported
+                raise
+        else:
+            return (open(fd, 'rb', buffering=0), True)
+    return (open(path, 'rb', buffering=0), False)
+
+
+def _clear_direct(fd):
+    """ clear O_DIRECT of opened file descriptor
+
+    some file systems accept O_DIRECT at open, but refuse reading by
+    EINVAL. reading is continued without O_DIRECT after this.
+    param[in]  fd: file descriptor opened with O_DIRECT.
+    raise      OSError: an error involving fcntl()
+    """
+    import fcntl
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags & ~os.O_DIRECT)
+
+
+def _feed_hinted(path, block_size, updates, hints, tracker):
+    """ feed file path into update functions with I/O hints
+
+    param[in]  path: appointed file path.
+    param[in]  block_size: buffer size of reading file. shall be positive.
+                           rounded up to _DIRECT_ALIGNMENT for O_DIRECT.
+    param[in]  updates: sequence of update functions of instances.
+    param[in]  hints: IOHints.
+    param[in]  tracker: _Tracker or None.
+    raise      OSError: an error involving open(), file.readinto() or
+                        os.posix_fadvise()
+    """
+    file, direct = _open_hinted(path, hints)
+    with file:
+        fd = file.fileno()
+        file_stat = os.fstat(fd)
+        file_size = file_stat.st_size
+        if tracker is not None:
+            tracker.total = file_size
+        if not _stat.S_ISREG(file_stat.st_mode):  # pipe cannot be advised
+            hints = hints._replace(sequential=False, dont_need=False,
+                                   readahead=0)
+        if hints.sequential:
+            _fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+
+        if direct:  # anonymous mapping is aligned to page
+            block_size = -(-block_size // _DIRECT_ALIGNMENT) * \
+                _DIRECT_ALIGNMENT
+            buffer = _mmap.mmap(-1, block_size)
+        else:
+            block_size = _buffer_size(block_size, file_stat)
+            buffer = bytearray(block_size)
+
+        position = dropped = prefetched = 0
+        refused = not direct  # O_DIRECT can be cleared only once
+        try:
+            with memoryview(buffer) as view:
+                while True:
+                    if hints.readahead and \
+                            position + hints.readahead // 2 >= prefetched:
+                        _fadvise(fd, position, hints.readahead,
+                                 'POSIX_FADV_WILLNEED')
+                        prefetched = position + hints.readahead
+                    try:
+                        size = file.readinto(view)
+                    except OSError as error:
+                        if refused or error.errno != errno.EINVAL:
+                            raise
+                        _clear_direct(fd)  # and read same block again
+                        refused = True
+                        continue
+                    if not size:
+                        break
+                    with view[:size] as block:
+                        for update in updates:
+                            update(block)
+                    position += size
+                    if hints.dont_need and \
+                            position - dropped >= _DROP_INTERVAL:
+                        _fadvise(fd, dropped, position - dropped,
+                                 'POSIX_FADV_DONTNEED')
+                        dropped = position
+        finally:
+            if direct:
+                buffer.close()
+
+        if hints.dont_need:
+            _fadvise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+
+
+def _result(instance):
+    """ convert instance into result
+
+    param[in]  instance: instance of calculating class. should be _WrapZlib
+                         or hashlib's object.
+    return     tuple(value, size). [0] is hash or sum value in int, [1] is
+               size of value in bytes.
+    """
+    return (int.from_bytes(instance.digest(), byteorder='big'),
+            instance.digest_size)
+
+
+def _feed_file(file, block_size, updates):
+    """ feed file into update functions by reading
+
+    one buffer is reused for all blocks, and file reads into it directly.
+    param[in]  file: opened file in unbuffered binary mode.
+    param[in]  block_size: buffer size of reading file. shall be positive.
+    param[in]  updates: sequence of update functions of instances.
+    """
+    buffer = bytearray(block_size)
+    with memoryview(buffer) as view:
+        size = file.readinto(buffer)
+        while size:
+            block = view if size == block_size else view[:size]
+            for update in updates:
+                update(block)
+            size = file.readinto(buffer)
+
+
+def _feed_mmap(file, block_size, updates):
+    """ feed file into update functions by memory mapping
+
+    slices of the mapping are given to update functions without copying.
+    param[in]  file: opened file in binary mode. shall not be empty.
+    param[in]  block_size: slice size of the mapping. shall be positive.
+    param[in]  updates: sequence of update functions of instances.
+    """
+    with _mmap.mmap(file.fileno(), 0, access=_mmap.ACCESS_READ) as mapping:
+        if hasattr(mapping, 'madvise'):
+            mapping.madvise(_mmap.MADV_SEQUENTIAL)
+        with memoryview(mapping) as view:
+            for start in range(0, len(view), block_size):
+                with view[start:start + block_size] as block:
+                    for update in updates:
+                        update(block)
+
+
+def _feed_read(file, block_size, updates):
+    """ feed file-like object into update functions by read()
+
+    param[in]  file: file-like object which has read(n) returning bytes.
+    param[in]  block_size: size of read(n). shall be positive.
+    param[in]  updates: sequence of update functions of instances.
+    """
+    block = file.read(block_size)
+    while block:
+        for update in updates:
+            update(block)
+        block = file.read(block_size)
+
+
+def _feed(path_or_bytes, block_size, instances, mmap=False, tracker=None,
+          hints=None):
+    """ feed data into instances
+
+    read file (or byte buffer) once, and update all instances with it.
+    param[in]  path_or_bytes: appointed file path in str or os.PathLike,
+                              file descriptor in int, binary file object,
+                              or byte buffer supporting buffer protocol.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  instances: sequence of instances of calculating class.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  tracker: _Tracker or None. its total is set if size of data
+                        is known, and its update() is called with blocks.
+    param[in]  hints: IOHints or None. only file path uses it, and mmap is
+                      ignored if it is given.
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, or hints is neither IOHints nor None
+    """
+    updates = [instance.update for instance in instances]
+    if tracker is not None:
+        updates.append(tracker.update)
+
+    if isinstance(path_or_bytes, (bytes, bytearray)):  # byte buffer
+        if tracker is not None:
+            tracker.total = len(path_or_bytes)
+        # create hash or sum from byte buffer
+        for update in updates:
+            update(path_or_bytes)
+        return
+
+    # check and define block_size and mmap
+    rika.check_type('block_size', locals(), allow=int)
+    rika.check_type('mmap', locals(), allow=(bool, type(None)))
+    rika.check_type('hints', locals(), allow=(IOHints, type(None)))
+    block_size = max(1, block_size)
+
+    if isinstance(path_or_bytes, (str, os.PathLike)) and \
+            hints is not None:  # file path with hints
+        _feed_hinted(path_or_bytes, block_size, updates, hints, tracker)
+    elif isinstance(path_or_bytes, (str, os.PathLike)):  # file path
+        # create hash or sum from file
+        with open(path_or_bytes, 'rb', buffering=0) as file:
+            file_stat = os.fstat(file.fileno())
+            file_size = file_stat.st_size
+            if tracker is not None:
+                tracker.total = file_size
+            if mmap is None:
+                mmap = file_size >= MMAP_THRESHOLD
+            if mmap and file_size:  # empty file cannot be mapped
+                _feed_mmap(file, block_size, updates)
+            else:
+                _feed_file(file, _buffer_size(block_size, file_stat), updates)
+    elif isinstance(path_or_bytes, int) and \
+            not isinstance(path_or_bytes, bool):  # file descriptor
+        # create hash or sum from current position. fd is not closed.
+        with open(path_or_bytes, 'rb', buffering=0, closefd=False) as file:
+            _feed_file(file, block_size, updates)
+    else:
+        try:
+            view = memoryview(path_or_bytes)
+        except TypeError:
+            view = None
+
+        if view is not None:  # other buffer (memoryview, array, mmap, ...)
+            with view:
+                if tracker is not None:
+                    tracker.total = view.nbytes
+                # update() requires contiguous buffer. copy only if it is not
+                if view.c_contiguous:
+                    with view.cast('B') as block:
+                        for update in updates:
+                            update(block)
+                else:
+                    block = view.tobytes()
+                    for update in updates:
+                        update(block)
+        elif hasattr(path_or_bytes, 'readinto'):  # binary file object
+            _feed_file(path_or_bytes, block_size, updates)
+        elif hasattr(path_or_bytes, 'read'):  # file-like object
+            _feed_read(path_or_bytes, block_size, updates)
+        else:
+            msg = 'path_or_bytes: {0} not allowed'.format(
+                type(path_or_bytes).__name__)
+            raise TypeError(msg)
+
+
+def _skeleton(path_or_bytes, block_size, instance, mmap, observer=None,
+              name=None, hints=None):
     """ execute
 
     calculate hash or sum using instance of class.
-    param[in]  path_or_bytes: appointed file path or byte buffer data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
     param[in]  instance: instance of calculating class. should be _WrapZlib
                          or hashlib's object.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer or None.
+    param[in]  name: algorithm name reported to observer.
+    param[in]  hints: IOHints or None.
     return     tuple(value, size). [0] is hash or sum value in int, [1] is
                size of value in bytes.
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    rika.check_type('path_or_bytes', locals(), allow=(str, bytes, bytearray))
+    tracker = _track(observer, (name,))
+    _feed(path_or_bytes, block_size, (instance,), mmap, tracker, hints)
+    if tracker is not None:
+        tracker.finish()
 
-    if isinstance(path_or_bytes, str):  # file path
-        # check and define block_size
-        rika.check_type('block_size', locals(), allow=int)
-        block_size = max(1, block_size)
+    return _result(instance)
 
-        # create hash or sum from file
-        with open(path_or_bytes, 'rb') as file:
-            block = file.read(block_size)
-            while block:
-                instance.update(block)
-                block = file.read(block_size)
-    else:  # byte buffer
-        # create hash or sum from byte buffer
-        instance.update(path_or_bytes)
 
-    return (int.from_bytes(instance.digest(), byteorder='big'),
-            instance.digest_size)
+def calculate(path_or_bytes, algorithm, block_size=DEFAULT_BLOCK_SIZE,
+              mmap=False, observer=None, hints=None):
+    """ hash or sum by algorithm name
 
+    Calculate hash or sum of algorithm chosen at runtime.
+    e.g. calculate(path, 'sha256') == sha256(path)
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  algorithm: algorithm name. shall be one of algorithms().
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           if path_or_bytes is byte buffer, then ignored.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    return     tuple(value, size). [0] is hash or sum value in int, [1] is
+               size of value in bytes.
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          algorithm is not str, block_size is not int,
+                          mmap is neither bool nor None, observer is
+                          neither Observer nor None, or hints is neither
+                          IOHints nor None
+               LookupError: algorithm is unknown name
+    """
+    return _skeleton(path_or_bytes, block_size, _new(algorithm), mmap,
+                     observer, algorithm, hints)
 
-def adler32(path_or_bytes, block_size=1024):
+
+def multi(path_or_bytes, algorithms, block_size=DEFAULT_BLOCK_SIZE,
+          mmap=False, observer=None, hints=None):
+    """ several hashes and sums at once
+
+    Calculate several hashes or sums while reading the data only once.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  algorithms: iterable of algorithm names in str. each name
+                           shall be one of algorithms().
+                           duplicated names are calculated only once.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    return     dict whose key is algorithm name and whose value is
+               tuple(value, size), same as the result of each function.
+               e.g. multi(path, ['crc32', 'md5'])['md5'] == md5(path)
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          algorithms is not iterable of str,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
+               LookupError: algorithms includes unknown name
+    """
+    rika.check_type('algorithms', locals(), not_allow=str)
+    algorithms = list(algorithms)
+    rika.check_type('algorithms', locals(), element_allow=str)
+
+    instances = {}
+    for name in algorithms:
+        if name not in instances:
+            instances[name] = _new(name)
+
+    tracker = _track(observer, tuple(instances))
+    _feed(path_or_bytes, block_size, instances.values(), mmap, tracker,
+          hints)
+    if tracker is not None:
+        tracker.finish()
+
+    return {name: _result(instance) for name, instance in instances.items()}
+
+
+def batch(algorithm, buffers):
+    """ hash or sum of many byte buffers
+
+    Calculate hash or sum of each buffer with low overhead per buffer.
+    algorithm is checked only once, and buffers are not checked at all.
+    adler32 and crc32 are calculated by zlib directly. others are copied
+    from one prepared instance.
+    compared with calling crc32() etc. for each buffer, overhead per buffer
+    is about 30 times lower for adler32 and crc32, but only 2 to 4 times
+    lower for hashlib's algorithms, because creating and finalizing hashlib
+    object dominates. batch() is already close to bare
+    [hashlib.sha256(b).digest() for b in buffers], so that more is not
+    reachable for them.
+    e.g. batch('crc32', [b1, b2]) == array('L', [crc32(b1)[0],
+                                                crc32(b2)[0]])
+    param[in]  algorithm: algorithm name. shall be one of algorithms().
+    param[in]  buffers: iterable of byte buffers (bytes, bytearray,
+                        memoryview, ...).
+    return     array('L') of values for adler32 and crc32, or list of values
+               in int for others. size of each value is same as
+               new(algorithm).digest_size.
+    raise      TypeError: algorithm is not str, or a buffer is not byte
+                          buffer
+               LookupError: algorithm is unknown name
+    """
+    prototype = _new(algorithm)
+
+    function = _BATCH_FUNCTIONS.get(algorithm)
+    if function is not None:
+        return array.array('L', map(function, buffers))
+
+    from_bytes = int.from_bytes
+    values = []
+    append = values.append
+    for buffer in buffers:
+        instance = prototype.copy()
+        instance.update(buffer)
+        append(from_bytes(instance.digest(), 'big'))
+    return values
+
+
+def adler32(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+            observer=None, hints=None):
     """ Adler-32
 
     Calculate Adler-32 and return Adler-32 value.
     It is a good way to print Adler-32 value is in '08X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is Adler-32 value in int, [1] is size
                of value in bytes (=always 4).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, _WrapZlib('adler32'))
+    return _skeleton(path_or_bytes, block_size, _WrapZlib('adler32'), mmap,
+                     observer, 'adler32', hints)
 
 
-def crc32(path_or_bytes, block_size=1024):
+def crc32(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+          observer=None, hints=None):
     """ CRC32
 
     Calculate CRC32 and return CRC32 value.
     It is a good way to print CRC32 value is in '08X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is CRC32 value in int, [1] is size
                of value in bytes (=always 4).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, _WrapZlib('crc32'))
+    return _skeleton(path_or_bytes, block_size, _WrapZlib('crc32'), mmap,
+                     observer, 'crc32', hints)
 
 
-def md5(path_or_bytes, block_size=1024):
+def md5(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+        observer=None, hints=None):
     """ MD5
 
     Calculate MD5 and return MD5 value.
     It is a good way to print MD5 value is in '032X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is MD5 value in int, [1] is size
                of value in bytes (=always 16).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.md5())
+    return _skeleton(path_or_bytes, block_size, hashlib.md5(), mmap,
+                     observer, 'md5', hints)
 
 
-def sha1(path_or_bytes, block_size=1024):
+def sha1(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+         observer=None, hints=None):
     """ SHA-1
 
     Calculate SHA-1 and return SHA-1 value.
     It is a good way to print SHA-1 value is in '040X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is SHA-1 value in int, [1] is size
                of value in bytes (=always 20).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.sha1())
+    return _skeleton(path_or_bytes, block_size, hashlib.sha1(), mmap,
+                     observer, 'sha1', hints)
 
 
-def sha224(path_or_bytes, block_size=1024):
+def sha224(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+           observer=None, hints=None):
     """ SHA-224
 
     Calculate SHA-224 and return SHA-224 value.
     It is a good way to print SHA-224 value is in '056X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is SHA-224 value in int, [1] is size
                of value in bytes (=always 28).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.sha224())
+    return _skeleton(path_or_bytes, block_size, hashlib.sha224(), mmap,
+                     observer, 'sha224', hints)
 
 
-def sha256(path_or_bytes, block_size=1024):
+def sha256(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+           observer=None, hints=None):
     """ SHA-256
 
     Calculate SHA-256 and return SHA-224 value.
     It is a good way to print SHA-256 value is in '064X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is SHA-256 value in int, [1] is size
                of value in bytes (=always 32).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.sha256())
+    return _skeleton(path_or_bytes, block_size, hashlib.sha256(), mmap,
+                     observer, 'sha256', hints)
 
 
-def sha384(path_or_bytes, block_size=1024):
+def sha384(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+           observer=None, hints=None):
     """ SHA-384
 
     Calculate SHA-384 and return SHA-384 value.
     It is a good way to print SHA-384 value is in '096X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is SHA-384 value in int, [1] is size
                of value in bytes (=always 48).
-    raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.sha384())
+    return _skeleton(path_or_bytes, block_size, hashlib.sha384(), mmap,
+                     observer, 'sha384', hints)
 
 
-def sha512(path_or_bytes, block_size=1024):
+def sha512(path_or_bytes, block_size=DEFAULT_BLOCK_SIZE, mmap=False,
+           observer=None, hints=None):
     """ SHA-512
 
     Calculate SHA-512 and return SHA-512 value.
     It is a good way to print SHA-512 value is in '0128X' format.
-    param[in]  path_or_bytes: appointed file path or byte data.
-    param[in]  block_size: buffer size of file.read(). shall be int.
-                           if path_or_bytes is byte buffer, then ignored.
-    note       the argument path_or_bytes is allowed both str or bytes.
-               the execution is switched if the path_or_bytes is str or not.
+    param[in]  path_or_bytes: appointed file path, file descriptor, file
+                              object or byte data.
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           used for file path, file descriptor and file
+                           object. ignored for byte buffer and mapped file.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+                     only file path is mapped. otherwise, ignored.
+    param[in]  observer: Observer, which receives progress and counts this
+                         input. None means no observation.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    note       the argument path_or_bytes is allowed file path (str or
+               os.PathLike), file descriptor (int), binary file object, or
+               byte buffer (bytes, bytearray, memoryview, array.array, ...).
+               file descriptor and file object are read from the current
+               position, and they are not closed.
     return     tuple(value, size). [0] is SHA-512 value in int, [1] is size
                of value in bytes (=always 64).
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: path_or_bytes is not supported type,
+                          block_size is not int, mmap is neither bool nor
+                          None, observer is neither Observer nor None, or
+                          hints is neither IOHints nor None
+    """
+    return _skeleton(path_or_bytes, block_size, hashlib.sha512(), mmap,
+                     observer, 'sha512', hints)
+
+
+def _hash_file(path, algorithm, block_size, mmap, observer=None,
+               hints=None):
+    """ calculate hash or sum of one file by algorithm name
+
+    This function is called in worker thread or worker process.
+    param[in]  path: appointed file path.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    param[in]  mmap: same as mmap of _feed().
+    param[in]  observer: Observer or None. only for worker thread.
+    param[in]  hints: IOHints or None.
+    return     tuple(path, value, size), or tuple(path, error, None) if
+               OSError is raised, so that other files are continued.
+    """
+    try:
+        return (path,) + _skeleton(path, block_size, _new(algorithm), mmap,
+                                   observer, algorithm, hints)
+    except OSError as error:
+        return (path, error, None)
+
+
+def _map_unordered(function, args_list, workers, executor):
+    """ call function in pool, and yield results as they complete
+
+    the number of calls in flight is bounded, so that huge args_list does
+    not create huge number of futures at once.
+    param[in]  function: called function. shall be picklable for 'process'.
+    param[in]  args_list: iterable of tuple of arguments for function.
+    param[in]  workers: number of workers. None means os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    yield      return value of function, in completion order.
+    raise      TypeError: workers is neither int nor None, or executor is
+                          not str
+               ValueError: workers is less than 1, or executor is unknown
+               Exception: raised by function is raised again
+    """
+    rika.check_type('workers', locals(), allow=(int, type(None)),
+                    not_allow=bool)
+    rika.check_type('executor', locals(), allow=str)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError('workers shall be 1 or more')
+    if executor not in _EXECUTORS:
+        raise ValueError('unknown executor: ' + executor)
+
+    args_iter = iter(args_list)
+    with _EXECUTORS[executor](max_workers=workers) as pool:
+        pending = set()
+        try:
+            while True:
+                for args in args_iter:
+                    pending.add(pool.submit(function, *args))
+                    if len(pending) >= workers * 4:
+                        break
+                if not pending:
+                    break
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def hash_tree(root_dir='.', pattern='*', algorithm='sha256', recursive=True,
+              workers=None, executor='thread', block_size=DEFAULT_BLOCK_SIZE,
+              mmap=False, observer=None, hints=None):
+    """ hash or sum of files in directory tree
+
+    Calculate hash or sum of each file in parallel. files are searched by
+    rika.my_glob(), and distributed to the pool of workers.
+    hashlib releases GIL while calculating large data, so that 'thread' is
+    normally enough. 'process' is useful for adler32 and crc32 of many
+    small files.
+    param[in]  root_dir: root directory name in str.
+    param[in]  pattern: pattern for filtering file name. shall be str.
+    param[in]  algorithm: algorithm name. shall be one of algorithms().
+    param[in]  recursive: recursive or not. shall be bool.
+    param[in]  workers: number of workers in int. None means
+                        os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    param[in]  mmap: True maps file into memory instead of reading it.
+                     None maps only if file size is MMAP_THRESHOLD or more.
+    param[in]  observer: Observer, which receives progress and counts each
+                         file in worker threads. None means no observation.
+                         not allowed with 'process'.
+    param[in]  hints: IOHints for file path, e.g. BULK_HINTS. None means
+                      no hint. mmap is ignored if it is given.
+    yield      tuple(path, value, size) in completion order (not in order of
+               path). [1] and [2] are same as the result of each function.
+               if a file cannot be read, [1] is the OSError (involving
+               open(), file.readinto() or mmap) and [2] is None, and the
+               other files are continued.
+    raise      TypeError: an argument is wrong type
+               ValueError: workers is less than 1, executor is unknown, or
+                           observer is given with 'process'
+               LookupError: algorithm is unknown name
+    """
+    _new(algorithm)  # check algorithm before starting workers
+    rika.check_type('observer', locals(), allow=(Observer, type(None)))
+    rika.check_type('hints', locals(), allow=(IOHints, type(None)))
+    if observer is not None and executor == 'process':
+        raise ValueError('observer is not allowed with process executor')
+    paths = rika.my_glob(root_dir, pattern, recursive)
+
+    args_list = ((path, algorithm, block_size, mmap, observer, hints)
+                 for path in paths)
+    yield from _map_unordered(_hash_file, args_list, workers, executor)
+
+
+class HashCache(object):
+    """ persistent cache of hash or sum of files
+
+    Calculated values are stored in SQLite database file, keyed by absolute
+    path and algorithm. A stored value is reused while os.stat() of the file
+    shows same identity (size, mtime_ns, inode and device). Otherwise the
+    file is calculated again.
+
+    typical usage is,
+    with HashCache('hash.db') as cache:
+        value, size = cache.get('some/file', 'sha256')
+    """
+    __slots__ = ('__connection',)
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS hashes ('
+        'path TEXT NOT NULL, algorithm TEXT NOT NULL, '
+        'file_size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+        'inode INTEGER NOT NULL, device INTEGER NOT NULL, '
+        'digest BLOB NOT NULL, digest_size INTEGER NOT NULL, '
+        'PRIMARY KEY (path, algorithm))'
+    )
+
+    _INSERT = 'INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+
+    def __init__(self, db_path):
+        """ initialize.
+
+        open (or create) database file.
+        param[in]  db_path: database file path in str. ':memory:' creates
+                            cache which is not stored.
+        raise      TypeError: db_path is not str
+                   sqlite3.Error: an error involving database
+        """
+        rika.check_type('db_path', locals(), allow=str)
+
+        self.__connection = sqlite3.connect(db_path)
+        with self.__connection:
+            self.__connection.execute(self._SCHEMA)
+
+    def __enter__(self):
+        """ __enter__ """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """ __exit__
+
+        close database.
+        """
+        self.close()
+
+    @staticmethod
+    def _identity(stat):
+        """ get identity of file from os.stat_result """
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+
+    def close(self):
+        """ close database. """
+        self.__connection.close()
+
+    def get(self, path, algorithm, block_size=DEFAULT_BLOCK_SIZE, mmap=False):
+        """ get hash or sum of file
+
+        return stored value if the file is not changed. otherwise, calculate
+        and store it.
+        param[in]  path: appointed file path in str.
+        param[in]  algorithm: algorithm name in str.
+        param[in]  block_size: buffer size of reading file. shall be int.
+        param[in]  mmap: same as mmap of each function.
+        return     tuple(value, size). same as the result of each function.
+        raise      OSError: an error involving os.stat(), open(),
+                            file.readinto() or mmap
+                   TypeError: an argument is wrong type
+                   LookupError: algorithm is unknown name
+                   sqlite3.Error: an error involving database
+        """
+        rika.check_type('path', locals(), allow=str)
+        instance = _new(algorithm)
+        path = os.path.abspath(path)
+
+        identity = self._identity(os.stat(path))
+        row = self.__connection.execute(
+            'SELECT file_size, mtime_ns, inode, device, digest, digest_size '
+            'FROM hashes WHERE path = ? AND algorithm = ?',
+            (path, algorithm)).fetchone()
+        if row is not None and row[:4] == identity:
+            return (int.from_bytes(row[4], byteorder='big'), row[5])
+
+        _feed(path, block_size, (instance,), mmap)
+        digest = instance.digest()
+
+        # do not store the value, if the file is changed while calculating
+        if self._identity(os.stat(path)) == identity:
+            record = (path, algorithm) + identity
+            record += (digest, instance.digest_size)
+            with self.__connection:
+                self.__connection.execute(self._INSERT, record)
+        return (int.from_bytes(digest, byteorder='big'), instance.digest_size)
+
+    def compact(self):
+        """ remove stale entries
+
+        remove entries whose file no longer exists or is changed, and
+        shrink database file.
+        return     number of removed entries in int.
+        raise      sqlite3.Error: an error involving database
+        """
+        rows = self.__connection.execute(
+            'SELECT path, algorithm, file_size, mtime_ns, inode, device '
+            'FROM hashes').fetchall()
+        stale = []
+        for row in rows:
+            try:
+                if self._identity(os.stat(row[0])) == row[2:]:
+                    continue
+            except OSError:
+                pass
+            stale.append(row[:2])
+
+        with self.__connection:
+            self.__connection.executemany(
+                'DELETE FROM hashes WHERE path = ? AND algorithm = ?', stale)
+        self.__connection.execute('VACUUM')
+        return len(stale)
+
+
+class Hasher(object):
+    """ incremental hash or sum calculator
+
+    Hasher has same interface with hashlib's hash objects, and value()
+    returns the result in same format with each function.
+
+    typical usage is,
+    hasher = new('crc32')
+    for chunk in chunks:
+        hasher.update(chunk)
+    value, size = hasher.value()
+    """
+    __slots__ = ('__name', '__instance')
+
+    def __init__(self, name):
+        """ initialize.
+
+        param[in]  name: algorithm name in str.
+        raise      TypeError: name is not str
+                   LookupError: name is unknown algorithm
+        """
+        self.__instance = _new(name)
+        self.__name = name
+
+    @property
+    def name(self):
+        """ getter of algorithm name, which is given to new() """
+        return self.__name
+
+    @property
+    def digest_size(self):
+        """ getter of size of value in bytes """
+        return self.__instance.digest_size
+
+    def update(self, byte_data):
+        """ update data
+
+        param[in]  byte_data: input byte data.
+        """
+        self.__instance.update(byte_data)
+
+    def digest(self):
+        """ get value in bytes """
+        return self.__instance.digest()
+
+    def hexdigest(self):
+        """ get value in hex str of lower case """
+        return self.__instance.hexdigest()
+
+    def copy(self):
+        """ copy instance
+
+        return     new Hasher which has same data. updating one does not
+                   affect the other.
+        """
+        other = Hasher.__new__(Hasher)
+        other.__name = self.__name
+        other.__instance = self.__instance.copy()
+        return other
+
+    def value(self):
+        """ get value
+
+        return     tuple(value, size). same as the result of each function.
+        """
+        return _result(self.__instance)
+
+
+def new(name):
+    """ create Hasher
+
+    param[in]  name: algorithm name. shall be one of algorithms().
+    return     new Hasher instance.
+    raise      TypeError: name is not str
+               LookupError: name is unknown algorithm
+    """
+    return Hasher(name)
+
+
+def from_stream(stream, algorithm, block_size=DEFAULT_BLOCK_SIZE):
+    """ hash or sum of stream
+
+    Calculate hash or sum of data coming piece by piece. Whole data is never
+    kept in memory.
+    param[in]  stream: file-like object in binary mode (which has read(n)),
+                       or iterable of byte data (e.g. generator of bytes).
+    param[in]  algorithm: algorithm name in str.
+    param[in]  block_size: size of read(n) for file-like object. shall be
+                           int.
+    return     tuple(value, size). same as the result of each function.
+    raise      OSError: an error involving stream.read()
+               TypeError: an argument is wrong type
+               LookupError: algorithm is unknown name
+    """
+    rika.check_type('block_size', locals(), allow=int)
+    hasher = new(algorithm)
+    update = hasher.update
+    block_size = max(1, block_size)
+
+    if hasattr(stream, 'read'):  # file-like object
+        chunk = stream.read(block_size)
+        while chunk:
+            update(chunk)
+            chunk = stream.read(block_size)
+    else:  # iterable of byte data
+        for chunk in stream:
+            update(chunk)
+
+    return hasher.value()
+
+
+def _write_all(file):
+    """ create function to write whole block
+
+    param[in]  file: opened file in unbuffered binary mode.
+    return     function, which writes a block to file, retrying short
+               writes.
+    """
+    def write(block):
+        """ inner function to write block until all is written """
+        written = file.write(block)
+        while written < len(block):
+            with block[written:] as rest:
+                written += file.write(rest)
+    return write
+
+
+def copy_and_hash(src, dst, algorithms, block_size=DEFAULT_BLOCK_SIZE,
+                  observer=None):
+    """ copy file and calculate hashes and sums at once
+
+    Copy contents of src to dst like shutil.copyfile(), and calculate
+    hashes or sums of the contents while copying. src is read only once,
+    into one buffer which is reused for all blocks.
+    param[in]  src: source file path in str or os.PathLike.
+    param[in]  dst: destination file path in str or os.PathLike. it is
+                    overwritten if it exists.
+    param[in]  algorithms: iterable of algorithm names in str. each name
+                           shall be one of algorithms().
+    param[in]  block_size: buffer size of copying. shall be int.
+    param[in]  observer: Observer, which receives progress and counts this
+                         copy. None means no observation.
+    return     dict whose key is algorithm name and whose value is
+               tuple(value, size), same as the result of multi().
+    raise      OSError: an error involving open(), readinto() or write().
+                        shutil.SameFileError if src and dst are same file.
+               TypeError: an argument is wrong type
+               LookupError: algorithms includes unknown name
+    """
+    rika.check_type('src', locals(), allow=(str, os.PathLike))
+    rika.check_type('dst', locals(), allow=(str, os.PathLike))
+    rika.check_type('algorithms', locals(), not_allow=str)
+    algorithms = list(algorithms)
+    rika.check_type('algorithms', locals(), element_allow=str)
+    rika.check_type('block_size', locals(), allow=int)
+
+    instances = {}
+    for name in algorithms:
+        if name not in instances:
+            instances[name] = _new(name)
+    tracker = _track(observer, tuple(instances))
+
+    with open(src, 'rb', buffering=0) as src_file:
+        try:
+            if os.path.samefile(src, dst):
+                raise shutil.SameFileError(
+                    '{!r} and {!r} are the same file'.format(src, dst))
+        except FileNotFoundError:
+            pass
+        file_stat = os.fstat(src_file.fileno())
+        with open(dst, 'wb', buffering=0) as dst_file:
+            updates = [instance.update for instance in instances.values()]
+            updates.append(_write_all(dst_file))
+            if tracker is not None:
+                tracker.total = file_stat.st_size
+                updates.append(tracker.update)
+            _feed_file(src_file, _buffer_size(max(1, block_size), file_stat),
+                       updates)
+    if tracker is not None:
+        tracker.finish()
+
+    return {name: _result(instance) for name, instance in instances.items()}
+
+
+def _hash_range(path, algorithm, index, offset, length, block_size):
+    """ calculate hash or sum of a range of file
+
+    This function is called in worker thread or worker process. Each call
+    opens the file by itself, so that calls do not share file position.
+    param[in]  path: appointed file path.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  index: index of the range. returned as it is.
+    param[in]  offset: start position of the range in bytes.
+    param[in]  length: length of the range in bytes.
+    param[in]  block_size: buffer size of reading file. shall be positive.
+    return     tuple(index, digest). digest is value in bytes.
+    """
+    instance = _new(algorithm)
+    update = instance.update
+    block_size = min(block_size, max(1, length))
+    buffer = bytearray(block_size)
+    with open(path, 'rb', buffering=0) as file, memoryview(buffer) as view:
+        file.seek(offset)
+        while length > 0:
+            size = file.readinto(view[:min(length, block_size)])
+            if not size:  # file is truncated
+                break
+            update(view[:size])
+            length -= size
+    return (index, instance.digest())
+
+
+def _merkle_root(digests, algorithm):
+    """ calculate Merkle root
+
+    like RFC 6962, a leaf node is hash of b'\\x00' + digest of chunk, and a
+    parent node is hash of b'\\x01' + left + right, so that a leaf never
+    equals a parent. a node without pair is carried to upper level as it is.
+    param[in]  digests: list of digests of chunks in bytes. shall not be
+                        empty.
+    param[in]  algorithm: algorithm name in str.
+    return     root digest in bytes.
+    """
+    leaves = []
+    for digest in digests:
+        instance = _new(algorithm)
+        instance.update(b'\x00' + digest)
+        leaves.append(instance.digest())
+    digests = leaves
+    while len(digests) > 1:
+        parents = []
+        for i in range(0, len(digests) - 1, 2):
+            instance = _new(algorithm)
+            instance.update(b'\x01' + digests[i] + digests[i + 1])
+            parents.append(instance.digest())
+        if len(digests) % 2:
+            parents.append(digests[-1])
+        digests = parents
+    return digests[0]
+
+
+def _hash_chunks(path, algorithm, chunk_size, workers, executor,
+                 block_size):
+    """ calculate hash or sum of each chunk of file in parallel
+
+    arguments are same as chunked().
+    return     tuple(digests, lengths). digests is list of value of each
+               chunk in bytes, lengths is list of length of each chunk.
+               empty file has one empty chunk.
+    """
+    rika.check_type('path', locals(), allow=(str, os.PathLike))
+    rika.check_type('chunk_size', locals(), allow=int, not_allow=bool)
+    rika.check_type('block_size', locals(), allow=int)
+    if chunk_size < 1:
+        raise ValueError('chunk_size shall be 1 or more')
+    _new(algorithm)  # check algorithm before starting workers
+    block_size = max(1, block_size)
+
+    file_size = os.stat(path).st_size
+    count = max(1, -(-file_size // chunk_size))
+    lengths = [min(chunk_size, file_size - i * chunk_size)
+               for i in range(count)]
+    args_list = (
+        (path, algorithm, i, i * chunk_size, lengths[i], block_size)
+        for i in range(count)
+    )
+    digests = [None] * count
+    for index, digest in _map_unordered(_hash_range, args_list, workers,
+                                        executor):
+        digests[index] = digest
+    return (digests, lengths)
+
+
+def chunked(path, algorithm='sha256', chunk_size=DEFAULT_CHUNK_SIZE,
+            workers=None, executor='thread', block_size=DEFAULT_BLOCK_SIZE):
+    """ hash or sum of chunks and Merkle root
+
+    Split file into fixed-size chunks, and calculate hash or sum of each
+    chunk in parallel. Merkle root of them is also calculated, so that one
+    value represents whole file. Comparing chunk values tells which chunks
+    are changed.
+    param[in]  path: appointed file path in str or os.PathLike.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  chunk_size: size of chunk in bytes. shall be int. the last
+                           chunk may be shorter.
+    param[in]  workers: number of workers in int. None means
+                        os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    return     tuple(chunks, root). chunks is list of tuple(value, size) of
+               each chunk in order of position, root is tuple(value, size)
+               of Merkle root. empty file has one empty chunk. root is
+               never same as value of a chunk, even if file has only one
+               chunk.
+    raise      OSError: an error involving os.stat(), open() or
+                        file.readinto()
+               TypeError: an argument is wrong type
+               ValueError: chunk_size or workers is less than 1, or executor
+                           is unknown
+               LookupError: algorithm is unknown name
+    """
+    digests, _ = _hash_chunks(path, algorithm, chunk_size, workers,
+                              executor, block_size)
+    digest_size = len(digests[0])
+
+    chunks = [(int.from_bytes(i, byteorder='big'), digest_size)
+              for i in digests]
+    root = _merkle_root(digests, algorithm)
+    return (chunks, (int.from_bytes(root, byteorder='big'), digest_size))
+
+
+def _crc32_multiply(a, b):
+    """ multiply polynomials a and b modulo CRC32 polynomial
+
+    polynomials are in reflected bit order, same as CRC32 value.
+    param[in]  a: polynomial in int.
+    param[in]  b: polynomial in int.
+    return     a * b modulo CRC32 polynomial in int.
+    """
+    product = 0
+    mask = 1 << 31
+    while a & ((mask << 1) - 1):
+        if a & mask:
+            product ^= b
+            a ^= mask
+        mask >>= 1
+        b = (b >> 1) ^ _CRC32_POLYNOMIAL if b & 1 else b >> 1
+    return product
+
+
+def _crc32_x8n_table():
+    """ create table of x^(8 * 2^k) modulo CRC32 polynomial
+
+    return     list of 64 polynomials. [k] is x^(8 * 2^k), i.e. the operator
+               which appends 2^k zero bytes.
+    """
+    table = [1 << 23]  # x^8 in reflected bit order
+    for _ in range(63):
+        table.append(_crc32_multiply(table[-1], table[-1]))
+    return table
+
+
+_CRC32_X8N = _crc32_x8n_table()
+
+
+def crc32_combine(crc1, crc2, len2):
+    """ combine CRC32 values
+
+    Same as crc32_combine() of zlib in C. If crc1 is CRC32 of data1 and
+    crc2 is CRC32 of data2, then the result is CRC32 of data1 + data2.
+    param[in]  crc1: CRC32 value of first data in int.
+    param[in]  crc2: CRC32 value of second data in int.
+    param[in]  len2: length of second data in bytes. shall be int less
+                     than 2 ** 64.
+    return     CRC32 value of concatenated data in int.
+    raise      TypeError: an argument is not int
+               ValueError: len2 is out of range
+
+    doctest ---
+    >>> crc1, crc2 = crc32(b'abc')[0], crc32(b'def')[0]
+    >>> crc32_combine(crc1, crc2, 3) == crc32(b'abcdef')[0]
+    True
+    """
+    rika.check_type('crc1', locals(), allow=int)
+    rika.check_type('crc2', locals(), allow=int)
+    rika.check_type('len2', locals(), allow=int)
+    if not 0 <= len2 < 1 << 64:
+        raise ValueError('len2 shall be 0 or more, and less than 2 ** 64')
+
+    # append len2 zero bytes to crc1 by multiplying x^(8 * len2)
+    crc1 &= 0xffffffff
+    k = 0
+    while len2 and crc1:
+        if len2 & 1:
+            crc1 = _crc32_multiply(_CRC32_X8N[k], crc1)
+        len2 >>= 1
+        k += 1
+    return crc1 ^ (crc2 & 0xffffffff)
+
+
+def adler32_combine(adler1, adler2, len2):
+    """ combine Adler-32 values
+
+    Same as adler32_combine() of zlib in C. If adler1 is Adler-32 of data1
+    and adler2 is Adler-32 of data2, then the result is Adler-32 of
+    data1 + data2.
+    param[in]  adler1: Adler-32 value of first data in int.
+    param[in]  adler2: Adler-32 value of second data in int.
+    param[in]  len2: length of second data in bytes. shall be int.
+    return     Adler-32 value of concatenated data in int.
+    raise      TypeError: an argument is not int
+               ValueError: len2 is negative
+
+    doctest ---
+    >>> adler1, adler2 = adler32(b'abc')[0], adler32(b'def')[0]
+    >>> adler32_combine(adler1, adler2, 3) == adler32(b'abcdef')[0]
+    True
+    """
+    rika.check_type('adler1', locals(), allow=int)
+    rika.check_type('adler2', locals(), allow=int)
+    rika.check_type('len2', locals(), allow=int)
+    if len2 < 0:
+        raise ValueError('len2 shall be 0 or more')
+
+    remainder = len2 % _ADLER32_BASE
+    low1, high1 = adler1 & 0xffff, (adler1 >> 16) & 0xffff
+    low2, high2 = adler2 & 0xffff, (adler2 >> 16) & 0xffff
+    low = (low1 + low2 - 1) % _ADLER32_BASE
+    high = (remainder * low1 + high1 + high2 - remainder) % _ADLER32_BASE
+    return low | (high << 16)
+
+
+_COMBINES = {
+    'adler32': adler32_combine,
+    'crc32': crc32_combine,
+}
+
+
+def parallel_sum(path, algorithm='crc32', chunk_size=DEFAULT_CHUNK_SIZE,
+                 workers=None, executor='thread',
+                 block_size=DEFAULT_BLOCK_SIZE):
+    """ CRC32 or Adler-32 of file in parallel
+
+    Calculate sum of each chunk in parallel, and combine them. The result
+    is exactly same as crc32(path) or adler32(path).
+    param[in]  path: appointed file path in str or os.PathLike.
+    param[in]  algorithm: 'crc32' or 'adler32'.
+    param[in]  chunk_size: size of chunk in bytes. shall be int.
+    param[in]  workers: number of workers in int. None means
+                        os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    return     tuple(value, size). same as crc32() or adler32().
+    raise      OSError: an error involving os.stat(), open() or
+                        file.readinto()
+               TypeError: an argument is wrong type
+               ValueError: chunk_size or workers is less than 1, or executor
+                           is unknown
+               LookupError: algorithm is neither 'crc32' nor 'adler32'
+    """
+    rika.check_type('algorithm', locals(), allow=str)
+    if algorithm not in _COMBINES:
+        raise LookupError('algorithm cannot be combined: ' + algorithm)
+    combine = _COMBINES[algorithm]
+
+    digests, lengths = _hash_chunks(path, algorithm, chunk_size, workers,
+                                    executor, block_size)
+
+    value = int.from_bytes(digests[0], byteorder='big')
+    for digest, length in zip(digests[1:], lengths[1:]):
+        value = combine(value, int.from_bytes(digest, byteorder='big'),
+                        length)
+    return (value, len(digests[0]))
+
+
+class RollingAdler32(object):
+    """ rolling Adler-32 over fixed-size window
+
+    checksum is always same as zlib.adler32() of the current window, and
+    roll() slides the window by one byte in constant time. It is the weak
+    checksum of rsync-like delta-sync.
+
+    typical usage is,
+    rolling = RollingAdler32(data[:window])
+    for i in range(len(data) - window):
+        checksum = rolling.roll(data[i], data[i + window])
+    """
+    __slots__ = ('__a', '__b', '__window')
+
+    def __init__(self, window_data):
+        """ initialize.
+
+        param[in]  window_data: byte data of the first window. its length
+                                is the window size.
+        raise      TypeError: window_data is not bytes, bytearray or
+                              memoryview
+                   ValueError: window_data is empty
+        """
+        rika.check_type('window_data', locals(),
+                        allow=(bytes, bytearray, memoryview))
+        if not len(window_data):
+            raise ValueError('window_data shall not be empty')
+
+        checksum = zlib.adler32(window_data)
+        self.__a = checksum & 0xffff
+        self.__b = checksum >> 16
+        self.__window = len(window_data)
+
+    @property
+    def window(self):
+        """ getter of window size in bytes """
+        return self.__window
+
+    @property
+    def checksum(self):
+        """ getter of Adler-32 of the current window in int """
+        return (self.__b << 16) | self.__a
+
+    def roll(self, out_byte, in_byte):
+        """ slide window by one byte
+
+        param[in]  out_byte: the first byte of the current window in int.
+        param[in]  in_byte: the byte next to the current window in int.
+        return     Adler-32 of the new window in int.
+        """
+        a = (self.__a - out_byte + in_byte) % _ADLER32_BASE
+        b = (self.__b - self.__window * out_byte + a - 1) % _ADLER32_BASE
+        self.__a = a
+        self.__b = b
+        return (b << 16) | a
+
+
+def _rolling_adler32_numpy(data, window):
+    """ rolling Adler-32 by numpy
+
+    prefix sums give the sums of every window at once.
+    a = 1 + sum(x[i]), b = window + sum((k + window - i) * x[i]) for the
+    window starting at k, both modulo _ADLER32_BASE. positions are split
+    into spans, so that work arrays stay in cache and prefix sums do not
+    overflow int64.
+    param[in]  data: byte data.
+    param[in]  window: window size. shall be 1 or more, and len(data) or
+                       less.
+    return     numpy array of Adler-32 in unsigned long.
+    """
+    x = _numpy.frombuffer(data, dtype=_numpy.uint8)
+    count = len(x) - window + 1
+    result = _numpy.empty(count, dtype=_numpy.dtype('L'))
+    length = min(_ROLLING_SPAN, count) + window - 1
+    sums = _numpy.zeros(length + 1, dtype=_numpy.int64)
+    weighted = _numpy.zeros(length + 1, dtype=_numpy.int64)
+    index = _numpy.arange(length, dtype=_numpy.int64)
+    for start in range(0, count, _ROLLING_SPAN):
+        stop = min(start + _ROLLING_SPAN, count)
+        span = stop - start
+        part = x[start:stop + window - 1]
+        # prefix sums of x[i] and i * x[i] (i is local in this span)
+        _numpy.cumsum(part, out=sums[1:len(part) + 1])
+        _numpy.multiply(index[:len(part)], part,
+                        out=weighted[1:len(part) + 1])
+        _numpy.cumsum(weighted[1:len(part) + 1],
+                      out=weighted[1:len(part) + 1])
+        # in-place operations avoid temporary arrays
+        a = sums[window:window + span] - sums[:span]
+        b = index[:span] + window
+        b *= a
+        b -= weighted[window:window + span]
+        b += weighted[:span]
+        b += window
+        b %= _ADLER32_BASE
+        a += 1
+        a %= _ADLER32_BASE
+        b <<= 16
+        b |= a
+        result[start:stop] = b
+    return result
+
+
+def rolling_adler32(data, window):
+    """ Adler-32 of every window
+
+    Calculate Adler-32 of data[k:k + window] for every k at once. It is
+    vectorized by numpy if it is installed, otherwise RollingAdler32 is used
+    (much slower).
+    e.g. rolling_adler32(data, 16)[k] == zlib.adler32(data[k:k + 16])
+    param[in]  data: byte data (bytes, bytearray or memoryview).
+    param[in]  window: window size in bytes. shall be int.
+    return     array('L') of Adler-32, whose length is
+               len(data) - window + 1. empty if data is shorter than window.
+    raise      TypeError: an argument is wrong type
+               ValueError: window is less than 1
+    """
+    rika.check_type('data', locals(), allow=(bytes, bytearray, memoryview))
+    rika.check_type('window', locals(), allow=int, not_allow=bool)
+    if window < 1:
+        raise ValueError('window shall be 1 or more')
+
+    data = memoryview(data).cast('B')
+    if len(data) < window:
+        return array.array('L')
+    if _numpy is not None:
+        result = array.array('L')
+        result.frombytes(_rolling_adler32_numpy(data, window).tobytes())
+        return result
+
+    rolling = RollingAdler32(data[:window])
+    roll = rolling.roll
+    result = array.array('L', [rolling.checksum])
+    result.extend(map(roll, data[:len(data) - window],
+                      data[window:]))
+    return result
+
+
+def _gear_numpy(context, block):
+    """ gear hash of each byte of block by numpy
+
+    gear hash is h = (h << 1) + _GEAR[byte] in 32 bits. it depends only on
+    the last _GEAR_WINDOW bytes, so it is sum of _GEAR[x[i - j]] << j for
+    j < 32, which is built by doubling j in 5 steps.
+    param[in]  context: bytes before block. the last _GEAR_WINDOW - 1 bytes
+                        are used.
+    param[in]  block: byte data in bytes.
+    return     numpy array of gear hash in uint32 for each byte of block.
+    """
+    context = context[-(_GEAR_WINDOW - 1):]
+    data = _numpy.frombuffer(context + block, dtype=_numpy.uint8)
+    h = _numpy.array(_GEAR, dtype=_numpy.uint32)[data]
+    shift = 1
+    while shift < _GEAR_WINDOW:
+        h[shift:] += h[:-shift] << _numpy.uint32(shift)
+        shift *= 2
+    return h[len(context):]
+
+
+def _gear_candidates(context, block, base, masks):
+    """ find candidates of chunk boundary in block
+
+    param[in]  context: bytes before block.
+    param[in]  block: byte data in bytes.
+    param[in]  base: offset of block in whole data.
+    param[in]  masks: tuple(strict mask, loose mask). bits of loose mask
+                      shall be a subset of bits of strict mask.
+    return     list of tuple(cut, strict). cut is offset just after the byte
+               where gear hash & loose mask is 0, strict is True if also
+               gear hash & strict mask is 0.
+    """
+    strict_mask, loose_mask = masks
+    if _numpy is not None:
+        h = _gear_numpy(context, block)
+        index = _numpy.flatnonzero((h & _numpy.uint32(loose_mask)) == 0)
+        strict = (h[index] & _numpy.uint32(strict_mask)) == 0
+        return list(zip((index + (base + 1)).tolist(), strict.tolist()))
+
+    gear = _GEAR
+    h = 0
+    for byte in context[-(_GEAR_WINDOW - 1):]:
+        h = ((h << 1) + gear[byte]) & 0xffffffff
+    candidates = []
+    for i, byte in enumerate(block, base + 1):
+        h = ((h << 1) + gear[byte]) & 0xffffffff
+        if not h & loose_mask:
+            candidates.append((i, not h & strict_mask))
+    return candidates
+
+
+def _iter_blocks(path_or_bytes, block_size):
+    """ yield blocks of data
+
+    param[in]  path_or_bytes: file path in str or os.PathLike, binary file
+                              object, or byte buffer.
+    param[in]  block_size: size of each block. shall be positive.
+    yield      bytes or memoryview. only the last one may be shorter.
+    raise      OSError: an error involving open() or file.read()
+               TypeError: path_or_bytes is not supported type
+    """
+    if isinstance(path_or_bytes, (str, os.PathLike)):
+        with open(path_or_bytes, 'rb', buffering=0) as file:
+            yield from _iter_blocks(file, block_size)
+    elif hasattr(path_or_bytes, 'read'):
+        block = path_or_bytes.read(block_size)
+        while block:
+            yield block
+            block = path_or_bytes.read(block_size)
+    else:
+        try:
+            view = memoryview(path_or_bytes).cast('B')
+        except TypeError:
+            raise TypeError('path_or_bytes: ' + repr(type(path_or_bytes)) +
+                            ' not allowed') from None
+        for i in range(0, len(view), block_size):
+            yield view[i:i + block_size]
+
+
+def _cdc_split(blocks, min_size, avg_size, max_size):
+    """ split data into content-defined chunks
+
+    FastCDC-like normalized chunking on gear hash. the boundary is the
+    first strict candidate in [min_size, avg_size), otherwise the first
+    candidate in [avg_size, max_size), otherwise max_size.
+    param[in]  blocks: iterable of byte data.
+    param[in]  min_size: minimum size of chunk.
+    param[in]  avg_size: expected size of chunk. the number of mask bits is
+                         log2 of it.
+    param[in]  max_size: maximum size of chunk.
+    yield      tuple(offset, chunk). chunk is bytes or memoryview.
+    """
+    bits = avg_size.bit_length() - 1
+    masks = tuple(((1 << n) - 1) << (32 - n) for n in (bits + 2, bits - 2))
+
+    pending = b''  # data from start
+    context = b''  # the last bytes of data, which affect gear hash
+    start = 0  # offset of the first byte of pending
+    end = 0  # offset just after the last byte of pending
+    candidates = []
+    blocks = iter(blocks)
+    eof = False
+    while not eof:
+        block = next(blocks, None)
+        if block is None:
+            eof = True
+        else:
+            block = bytes(block)
+            candidates.extend(_gear_candidates(context, block, end, masks))
+            context = (context + block)[-(_GEAR_WINDOW - 1):]
+            pending = pending + block if pending else block
+            end += len(block)
+
+        head = 0  # index of the first remaining candidate
+        used = 0  # bytes of pending already output
+        with memoryview(pending) as view:
+            while end - start >= max_size or (eof and end > start):
+                cut = min(start + max_size, end)
+                for i in range(head, len(candidates)):
+                    position, strict = candidates[i]
+                    if position >= cut:
+                        break
+                    if position < start + min_size:
+                        continue
+                    if strict or position >= start + avg_size:
+                        cut = position
+                        break
+                while head < len(candidates) and candidates[head][0] <= cut:
+                    head += 1
+                yield (start, view[used:used + cut - start])
+                used += cut - start
+                start = cut
+        del candidates[:head]
+        if used:
+            pending = pending[used:]
+
+
+def cdc_chunks(path_or_bytes, algorithm='sha256', min_size=CDC_MIN_SIZE,
+               avg_size=CDC_AVG_SIZE, max_size=CDC_MAX_SIZE,
+               block_size=DEFAULT_BLOCK_SIZE):
+    """ content-defined chunks and their hashes
+
+    Split data into chunks whose boundaries are decided by content (gear
+    hash with normalized chunking, like FastCDC), and calculate hash or sum
+    of each chunk. Inserting or removing bytes changes only chunks near the
+    change, so that unchanged chunks can be deduplicated.
+    Data is streamed by block_size, and at most max_size + block_size bytes
+    are kept in memory. Gear hash is vectorized by numpy if it is
+    installed, otherwise it is calculated byte by byte (much slower).
+    Both give same chunks.
+    param[in]  path_or_bytes: appointed file path, binary file object, or
+                              byte data.
+    param[in]  algorithm: algorithm name of chunk hash in str.
+    param[in]  min_size: minimum size of chunk in bytes. shall be int.
+    param[in]  avg_size: expected size of chunk in bytes. shall be int.
+    param[in]  max_size: maximum size of chunk in bytes. shall be int.
+    param[in]  block_size: buffer size of reading data. shall be int.
+    yield      tuple(offset, length, value, size) in order of offset.
+               [2] and [3] are same as the result of each function. empty
+               data yields nothing.
     raise      OSError: an error involving open() or file.read()
-               TypeError: path_or_bytes is neither str nor byte buffer, or
-                          block_size is not int
+               TypeError: an argument is wrong type
+               ValueError: 1 <= min_size <= avg_size <= max_size is not
+                           satisfied, or avg_size is less than 16
+               LookupError: algorithm is unknown name
+    """
+    rika.check_type('min_size', locals(), allow=int, not_allow=bool)
+    rika.check_type('avg_size', locals(), allow=int, not_allow=bool)
+    rika.check_type('max_size', locals(), allow=int, not_allow=bool)
+    rika.check_type('block_size', locals(), allow=int)
+    if not 1 <= min_size <= avg_size <= max_size:
+        raise ValueError('1 <= min_size <= avg_size <= max_size is required')
+    if avg_size < 16:
+        raise ValueError('avg_size shall be 16 or more')
+    prototype = _new(algorithm)
+
+    blocks = _iter_blocks(path_or_bytes, max(1, block_size))
+    for offset, chunk in _cdc_split(blocks, min_size, avg_size, max_size):
+        instance = prototype.copy()
+        instance.update(chunk)
+        length = len(chunk)
+        chunk.release()
+        yield (offset, length) + _result(instance)
+
+
+def _partial_digest(path, size, edge_size):
+    """ calculate CRC32 of the first and last edge_size bytes of file
+
+    This function is called in worker thread or worker process.
+    param[in]  path: appointed file path.
+    param[in]  size: file size in bytes.
+    param[in]  edge_size: number of bytes of each edge.
+    return     tuple(path, digest, read bytes). digest is None if error.
+    """
+    instance = _WrapZlib('crc32')
+    try:
+        with open(path, 'rb', buffering=0) as file:
+            head = file.read(edge_size)
+            instance.update(head)
+            read_bytes = len(head)
+            if size > edge_size:
+                file.seek(max(edge_size, size - edge_size))
+                tail = file.read(edge_size)
+                instance.update(tail)
+                read_bytes += len(tail)
+    except OSError:
+        return (path, None, 0)
+    return (path, instance.digest(), read_bytes)
+
+
+def _full_digest(path, algorithm, size, block_size):
+    """ calculate hash of whole file
+
+    This function is called in worker thread or worker process.
+    return     tuple(path, digest, read bytes). digest is None if error.
+    """
+    instance = _new(algorithm)
+    try:
+        _feed(path, block_size, (instance,))
+    except OSError:
+        return (path, None, 0)
+    return (path, instance.digest(), size)
+
+
+def _regroup(groups, function, args_of, workers, executor, stats):
+    """ split each group by digest calculated in parallel
+
+    param[in]  groups: list of list of paths.
+    param[in]  function: worker returning tuple(path, digest, read bytes).
+    param[in]  args_of: function which returns arguments of function from
+                        path.
+    param[in]  stats: dict of statistics. 'bytes_read' is added.
+    return     list of list of paths, whose length is 2 or more.
+    """
+    key_of = {}
+    for index, paths in enumerate(groups):
+        for path in paths:
+            key_of[path] = index
+    buckets = {}
+    args_list = (args_of(path) for paths in groups for path in paths)
+    for path, digest, read_bytes in _map_unordered(function, args_list,
+                                                   workers, executor):
+        stats['bytes_read'] += read_bytes
+        if digest is not None:
+            buckets.setdefault((key_of[path], digest), []).append(path)
+    return [sorted(i) for i in buckets.values() if len(i) > 1]
+
+
+def find_duplicates(root_dir='.', pattern='*', recursive=True,
+                    algorithm='sha256', edge_size=4096, workers=None,
+                    executor='thread', block_size=DEFAULT_BLOCK_SIZE):
+    """ find files of same content
+
+    Files are compared in three stages, so that most files are not read
+    wholly.
+    1. group by file size (os.stat() only).
+    2. group by CRC32 of the first and last edge_size bytes.
+    3. group by hash of whole file (algorithm).
+    Stage 2 and 3 are calculated in parallel, only for files which still
+    have same candidates. Files which cannot be read are ignored.
+    param[in]  root_dir: root directory name in str.
+    param[in]  pattern: pattern for filtering file name. shall be str.
+    param[in]  recursive: recursive or not. shall be bool.
+    param[in]  algorithm: algorithm name for stage 3 in str.
+    param[in]  edge_size: number of bytes read in stage 2 from each of the
+                          head and the tail. shall be int.
+    param[in]  workers: number of workers in int. None means
+                        os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    return     tuple(groups, stats). groups is list of list of paths of
+               same content. each list is sorted, and has 2 or more paths.
+               stats is dict which has 'files' (number of files),
+               'size_candidates', 'partial_candidates' (number of files
+               which remain after stage 1 and stage 2), 'bytes_read' and
+               'bytes_total' (sum of file sizes).
+    raise      TypeError: an argument is wrong type
+               ValueError: edge_size or workers is less than 1, or executor
+                           is unknown
+               LookupError: algorithm is unknown name
     """
-    return _skeleton(path_or_bytes, block_size, hashlib.sha512())
+    rika.check_type('edge_size', locals(), allow=int, not_allow=bool)
+    if edge_size < 1:
+        raise ValueError('edge_size shall be 1 or more')
+    _new(algorithm)  # check algorithm before searching
+
+    # stage 1: file size
+    by_size = {}
+    for path in rika.my_glob(root_dir, pattern, recursive):
+        try:
+            by_size.setdefault(os.stat(path).st_size, []).append(path)
+        except OSError:
+            pass
+    stats = {
+        'files': sum(len(i) for i in by_size.values()),
+        'size_candidates': 0,
+        'partial_candidates': 0,
+        'bytes_read': 0,
+        'bytes_total': sum(k * len(v) for k, v in by_size.items()),
+    }
+    size_of = {path: size for size, paths in by_size.items()
+               for path in paths}
+    groups = [paths for paths in by_size.values() if len(paths) > 1]
+    stats['size_candidates'] = sum(len(i) for i in groups)
+
+    # stage 2: CRC32 of head and tail. skipped if it covers whole file.
+    small = [i for i in groups if size_of[i[0]] <= edge_size * 2]
+    large = [i for i in groups if size_of[i[0]] > edge_size * 2]
+    groups = small + _regroup(large, _partial_digest,
+                              lambda path: (path, size_of[path], edge_size),
+                              workers, executor, stats)
+    stats['partial_candidates'] = sum(len(i) for i in groups)
+
+    # stage 3: hash of whole file
+    groups = _regroup(groups, _full_digest,
+                      lambda path: (path, algorithm, size_of[path],
+                                    block_size),
+                      workers, executor, stats)
+    return (sorted(groups), stats)
+
+
+_MANIFEST_PLAIN = re.compile(r'^(\\?)([0-9a-fA-F]+) [ *](.+)$')
+_MANIFEST_SIZED = re.compile(r'^ *([0-9a-fA-F]+) +(\d+) (.+)$')
+_MANIFEST_TAG = re.compile(r'^(\\?)(\w+) ?\((.+)\) ?= ?([0-9a-fA-F]+)$')
+_ESCAPES = {'\\': '\\\\', '\n': '\\n', '\r': '\\r'}
+_UNESCAPES = {'\\': '\\', 'n': '\n', 'r': '\r'}
+_ESCAPE = re.compile(r'[\\\n\r]')
+_UNESCAPE = re.compile(r'\\(.)')
+_HEX_LENGTHS = {  # the first one is the most common
+    8: ('crc32', 'adler32'),
+    16: ('xxh64',),
+    32: ('md5',),
+    40: ('sha1',),
+    56: ('sha224', 'sha3_224'),
+    64: ('sha256', 'blake2s', 'sha3_256', 'shake_128'),
+    96: ('sha384', 'sha3_384'),
+    128: ('sha512', 'blake2b', 'sha3_512', 'shake_256'),
+}
+
+
+def _escape_name(path):
+    """ escape file name like coreutils
+
+    backslash, newline and carriage return in path are escaped, so that
+    a line of manifest is kept one line.
+    param[in]  path: file name in str.
+    return     tuple(prefix, name). prefix is '\\' if name is escaped,
+               otherwise ''. it shall be put at the head of the line.
+    """
+    if _ESCAPE.search(path) is None:
+        return ('', path)
+    return ('\\', _ESCAPE.sub(lambda match: _ESCAPES[match.group()], path))
+
+
+def _unescape_name(name):
+    """ unescape file name escaped by _escape_name() or coreutils
+
+    param[in]  name: escaped file name in str.
+    return     original file name in str. unknown escape is kept as it is.
+    """
+    return _UNESCAPE.sub(
+        lambda match: _UNESCAPES.get(match.group(1), match.group()), name)
+
+
+def _parse_manifest_line(line, algorithm=None):
+    """ parse one line of manifest
+
+    '<hex>  <path>' (coreutils), 'NAME (<path>) = <hex>' (BSD) and
+    '<hex> <size> <path>' (e.g. Release file of Debian) are supported.
+    '<hex>  <path>' is prior to '<hex> <size> <path>', if both match.
+    path of the line starting with '\\' is unescaped like coreutils.
+    param[in]  line: one line of manifest without newline.
+    param[in]  algorithm: algorithm name for coreutils style. None means
+                          guessing it from length of hex.
+    return     tuple(algorithms, value, path, size). algorithms is tuple of
+               candidate algorithm names, which has two or more names if
+               length of hex is ambiguous (e.g. sha512 and blake2b). value
+               is in int. size is file size in int, or None if line does
+               not have it. None if the line is not supported format.
+    """
+    size = None
+    match = _MANIFEST_TAG.match(line)
+    if match:
+        escaped, name, path, hex_value = match.groups()
+        names = (name.lower(),)
+    else:
+        match = _MANIFEST_PLAIN.match(line)
+        if match:
+            escaped, hex_value, path = match.groups()
+        else:
+            escaped = ''
+            match = _MANIFEST_SIZED.match(line)
+            if not match:
+                return None
+            hex_value, size, path = match.groups()
+            size = int(size)
+        if algorithm is not None:
+            names = (algorithm,)
+        else:
+            names = _HEX_LENGTHS.get(len(hex_value), ())
+    names = tuple(i for i in names if i in _FACTORIES)
+    if not names:
+        return None
+    if escaped:
+        path = _unescape_name(path)
+    return (names, int(hex_value, 16), path, size)
+
+
+def _verify_file(index, path, algorithms, value, block_size, hints=None):
+    """ calculate hash or sum of file, and compare it with value
+
+    This function is called in worker thread or worker process.
+    algorithms are tried in order until one matches, so that file is read
+    again only if the first one does not match.
+    return     tuple(index, status). status is 'OK', 'FAILED' or 'ERROR'.
+    """
+    for name in algorithms:
+        instance = _new(name)
+        try:
+            _feed(path, block_size, (instance,), hints=hints)
+        except OSError:
+            return (index, 'ERROR')
+        if _result(instance)[0] == value:
+            return (index, 'OK')
+    return (index, 'FAILED')
+
+
+def _verify_entries(entries, root_dir, workers, executor, fail_fast,
+                    block_size, hints=None):
+    """ verify entries of manifest
+
+    all files are checked by os.stat() at first. only files which exist and
+    have right size are read, in parallel.
+    param[in]  entries: list of return value of _parse_manifest_line().
+    note       other arguments are same as verify_manifest().
+    yield      tuple(index, status). index is of entries. status is same as
+               verify_manifest().
+    """
+    args_list = []
+    for index, (algorithms, value, path, size) in enumerate(entries):
+        if root_dir is not None:
+            path = os.path.join(root_dir, path)
+        try:
+            file_size = os.stat(path).st_size
+        except OSError:
+            status = 'MISSING'
+        else:
+            if size is None or size == file_size:
+                args_list.append((index, path, algorithms, value,
+                                  block_size, hints))
+                continue
+            status = 'SIZE'
+        yield (index, status)
+        if fail_fast:
+            return
+
+    for index, status in _map_unordered(_verify_file, args_list, workers,
+                                        executor):
+        yield (index, status)
+        if fail_fast and status != 'OK':
+            return
+
+
+def verify_manifest(manifest_path, root_dir=None, algorithm=None,
+                    workers=None, executor='thread', fail_fast=False,
+                    block_size=DEFAULT_BLOCK_SIZE, hints=None):
+    """ verify files listed in manifest
+
+    Manifest is like output of sha256sum. '<hex>  <path>' (coreutils),
+    'NAME (<path>) = <hex>' (BSD) and '<hex> <size> <path>' (e.g. Release
+    file of Debian) are supported. Blank lines are ignored.
+    At first, all files are checked by os.stat(), so that missing files and
+    files of wrong size (if manifest has size) are found without reading.
+    Then the others are read and calculated in parallel.
+    param[in]  manifest_path: appointed manifest file path.
+    param[in]  root_dir: directory which paths in manifest are relative to.
+                         None means current directory.
+    param[in]  algorithm: algorithm name for '<hex>  <path>' lines. None
+                          means guessing it from length of hex. if the
+                          length is ambiguous (e.g. 128 hex digits is
+                          'sha512', 'blake2b', 'sha3_512' or 'shake_256'),
+                          the most common one is tried at first, and the
+                          file is read again for the others only if it
+                          does not match.
+    param[in]  workers: number of workers in int. None means
+                        os.cpu_count().
+    param[in]  executor: 'thread' or 'process'.
+    param[in]  fail_fast: True stops at the first file which is not 'OK'.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    param[in]  hints: IOHints for reading files, e.g. BULK_HINTS. None means
+                      no hint.
+    yield      tuple(path, status) in completion order. path is as written
+               in manifest, but unescaped if the line starts with '\\'
+               (coreutils escapes backslash and newline). status is 'OK',
+               'FAILED' (value is different), 'SIZE' (size is different),
+               'MISSING' (os.stat() failed), or 'ERROR' (open() or reading
+               failed).
+    raise      OSError: an error involving reading manifest
+               TypeError: an argument is wrong type
+               ValueError: manifest has improperly formatted line, workers
+                           is less than 1, or executor is unknown
+               LookupError: algorithm is unknown name
+    """
+    if algorithm is not None:
+        _new(algorithm)  # check algorithm before reading manifest
+    rika.check_type('root_dir', locals(), allow=(str, os.PathLike, type(None)))
+    rika.check_type('hints', locals(), allow=(IOHints, type(None)))
+
+    entries = []
+    with open(manifest_path, 'r') as file:
+        for number, line in enumerate(file.read().splitlines(), 1):
+            entry = _parse_manifest_line(line, algorithm)
+            if entry is not None:
+                entries.append(entry)
+            elif line.strip():
+                msg = '{0}:{1}: improperly formatted line'.format(
+                    manifest_path, number)
+                raise ValueError(msg)
+
+    for index, status in _verify_entries(entries, root_dir, workers, executor,
+                                         fail_fast, block_size, hints):
+        yield (entries[index][2], status)
+
+
+def _to_hex(result):
+    """ convert tuple(value, size) into hex str of lower case """
+    return '{0:0{1}x}'.format(result[0], result[1] * 2)
+
+
+def _indexed(function, index, *args):
+    """ call function(*args), and return tuple(index, return value) """
+    return (index, function(*args))
+
+
+def _map_ordered(function, args_list, workers, executor):
+    """ same as _map_unordered(), but yield in order of args_list
+
+    a result which completes early is kept until former ones complete.
+    """
+    indexed_args = ((function, i) + tuple(args)
+                    for i, args in enumerate(args_list))
+    waiting = {}
+    next_index = 0
+    for index, result in _map_unordered(_indexed, indexed_args, workers,
+                                        executor):
+        waiting[index] = result
+        while next_index in waiting:
+            yield waiting.pop(next_index)
+            next_index += 1
+
+
+def _multi_or_error(path, algorithms, block_size, hints=None):
+    """ call multi(), and return OSError instead of raising it """
+    try:
+        if path == '-':
+            return multi(sys.stdin.buffer, algorithms, block_size)
+        return multi(path, algorithms, block_size, hints=hints)
+    except OSError as error:
+        return error
+
+
+def _expand(patterns):
+    """ expand glob patterns
+
+    param[in]  patterns: iterable of file path or glob pattern in str.
+    return     list of file path. pattern which matches nothing is kept as
+               it is, so that error is reported for it.
+    """
+    import glob
+    paths = []
+    for pattern in patterns:
+        matched = []
+        if glob.has_magic(pattern):
+            matched = sorted(glob.glob(pattern, recursive=True))
+        paths.extend(i for i in matched if not os.path.isdir(i))
+        if not matched:
+            paths.append(pattern)
+    return paths
+
+
+def _error(message):
+    """ print message to stderr """
+    print('hashsum: ' + message, file=sys.stderr)
+
+
+def _print_sums(paths, algorithms, tag, workers, hints=None):
+    """ print hash or sum of paths, and return exit status """
+    status = 0
+    args_list = ((path, algorithms, DEFAULT_BLOCK_SIZE, hints)
+                 for path in paths)
+    for path, result in zip(paths, _map_ordered(_multi_or_error, args_list,
+                                                workers, 'thread')):
+        if isinstance(result, OSError):
+            _error('{0}: {1}'.format(path, result.strerror or result))
+            status = 1
+            continue
+        prefix, name_of_path = _escape_name(path)
+        for name in algorithms:
+            if tag:
+                print('{0}{1} ({2}) = {3}'.format(
+                    prefix, name.upper(), name_of_path,
+                    _to_hex(result[name])))
+            else:
+                print('{0}{1}  {2}'.format(prefix, _to_hex(result[name]),
+                                           name_of_path))
+    return status
+
+
+def _check_sums(manifests, algorithm, quiet, workers, hints=None):
+    """ check hash or sum listed in manifests, and return exit status """
+    entries = []
+    bad_lines = 0
+    for manifest in manifests:
+        try:
+            if manifest == '-':
+                lines = sys.stdin.read().splitlines()
+            else:
+                with open(manifest, 'r') as file:
+                    lines = file.read().splitlines()
+        except OSError as error:
+            _error('{0}: {1}'.format(manifest, error.strerror or error))
+            return 1
+        for line in lines:
+            entry = _parse_manifest_line(line, algorithm)
+            if entry is None:
+                bad_lines += line.strip() != ''
+            else:
+                entries.append(entry)
+
+    statuses = dict(_verify_entries(entries, None, workers, 'thread', False,
+                                    DEFAULT_BLOCK_SIZE, hints))
+    failed = unreadable = 0
+    for index, (_, _, path, _) in enumerate(entries):
+        status = statuses[index]
+        path = ''.join(_escape_name(path))
+        if status in ('MISSING', 'ERROR'):
+            print('{0}: FAILED open or read'.format(path))
+            unreadable += 1
+        elif status != 'OK':
+            print('{0}: FAILED'.format(path))
+            failed += 1
+        elif not quiet:
+            print('{0}: OK'.format(path))
+
+    for count, message in ((bad_lines, 'line is improperly formatted'),
+                           (unreadable, 'listed file could not be read'),
+                           (failed, 'computed checksum did NOT match')):
+        if count:
+            _error('WARNING: {0} {1}'.format(count, message))
+    return 1 if failed or unreadable or bad_lines else 0
+
+
+def main():
+    """ Print or check hash or sum of files via argparse.
+
+    A command line interface like sha256sum of coreutils.
+    files (or glob patterns) are calculated in parallel by -j workers, and
+    printed in order of arguments.
+
+    $python -m rika.hashsum -a md5 -a sha256 'dist/**/*.tar.gz'
+    is a good way to use this program.
+    return     exit status. 0 is success, 1 is error or mismatch.
+    """
+    # parse args using argparse
+    import argparse
+    parser = argparse.ArgumentParser(prog='hashsum',
+                                     description=ARGPARSE_DESCRIPTION)
+    parser.add_argument('-v', '--version', action='version',
+                        version=('%(prog)s ' + __version__))
+    parser.add_argument('files', nargs='*', metavar='file', default=['-'],
+                        help='file path or glob pattern. - is stdin')
+    parser.add_argument('-a', '--algorithm', action='append',
+                        choices=algorithms(),
+                        help='algorithm. can be repeated. default is sha256')
+    parser.add_argument('-c', '--check', action='store_true',
+                        help='read sums from files and check them')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int, default=None,
+                        help='number of workers. default is cpu count')
+    parser.add_argument('--tag', action='store_true',
+                        help='output BSD style')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='do not print OK for each file in --check')
+    parser.add_argument('--nocache', action='store_true',
+                        help='do not keep files in page cache (posix_fadvise)')
+    parser.add_argument('--direct', action='store_true',
+                        help='read files with O_DIRECT if possible')
+
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('-j shall be 1 or more')
+
+    hints = None
+    if args.nocache or args.direct:
+        hints = IOHints(dont_need=args.nocache, direct=args.direct)
+
+    # call calculation or check, and output
+    if args.check:
+        algorithm = args.algorithm[0] if args.algorithm else None
+        return _check_sums(args.files, algorithm, args.quiet, args.jobs,
+                           hints)
+    names = list(dict.fromkeys(args.algorithm or ['sha256']))
+    tag = args.tag or len(names) > 1
+    return _print_sums(_expand(args.files), names, tag, args.jobs, hints)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# -*- coding:utf-8 -*-
+""" asyncio interface of hashsum.
+
+Defines coroutine functions, which calculate hash or sum like rika.hashsum.
+adler32, crc32, md5, sha1, sha224, sha256, sha384, and sha512 are supported.
+Blocking calculation is offloaded to a bounded executor, so that the event
+loop is not blocked by large files or large byte buffers.
+from_stream() calculates hash or sum of asyncio.StreamReader or async
+iterable of bytes, and other functions also accept them by path_or_bytes.
+gather() calculates hash or sum of many inputs concurrently with a limit.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import os
+import rika
+import rika.hashsum
+
+__author__ = 'suomesta'
+__version__ = '1.0.0'
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_LIMIT = 64
+INLINE_THRESHOLD = 64 * 1024
+
+_executor = None
+
+
+def _get_executor(executor):
+    """ get executor
+
+    param[in]  executor: appointed executor or None.
+    return     executor itself, or shared ThreadPoolExecutor if None. the
+               shared one is created at first call, and it has
+               DEFAULT_WORKERS threads.
+    """
+    global _executor
+    if executor is not None:
+        return executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=DEFAULT_WORKERS, thread_name_prefix='hashsum_aio')
+    return _executor
+
+
+def _is_async_stream(path_or_bytes):
+    """ check whether path_or_bytes is async byte stream
+
+    param[in]  path_or_bytes: appointed input.
+    return     True if it has coroutine read(n) (e.g. asyncio.StreamReader)
+               or it is async iterable.
+    """
+    return inspect.iscoroutinefunction(getattr(path_or_bytes, 'read', None)) \
+        or hasattr(path_or_bytes, '__aiter__')
+
+
+async def _run(executor, function, *args):
+    """ call function in executor
+
+    small byte buffer is calculated directly, because it is faster than
+    switching thread.
+    param[in]  executor: appointed executor or None.
+    param[in]  function: called function.
+    param[in]  args: arguments of function. args[0] shall be path_or_bytes.
+    return     return value of function.
+    """
+    if isinstance(args[0], (bytes, bytearray)) and \
+            len(args[0]) < INLINE_THRESHOLD:
+        return function(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(executor),
+                                      functools.partial(function, *args))
+
+
+async def calculate(path_or_bytes, algorithm,
+                    block_size=rika.hashsum.DEFAULT_BLOCK_SIZE, mmap=False,
+                    executor=None):
+    """ hash or sum by algorithm name
+
+    param[in]  path_or_bytes: appointed file path or byte data, or async
+                              byte stream, which is given to
+                              from_stream().
+    param[in]  algorithm: algorithm name. shall be one of
+                          rika.hashsum.algorithms().
+    param[in]  block_size: buffer size of reading file. shall be int.
+                           if path_or_bytes is byte buffer, then ignored.
+    param[in]  mmap: same as mmap of rika.hashsum functions.
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    return     tuple(value, size). same as the result of rika.hashsum.
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: an argument is wrong type
+               LookupError: algorithm is unknown name
+    """
+    rika.check_type('algorithm', locals(), allow=str)
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, algorithm, block_size,
+                                 executor)
+    function = functools.partial(rika.hashsum.multi, algorithms=(algorithm,),
+                                 block_size=block_size, mmap=mmap)
+    result = await _run(executor, function, path_or_bytes)
+    return result[algorithm]
+
+
+async def from_stream(stream, algorithm,
+                      block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                      executor=None):
+    """ hash or sum of byte stream
+
+    param[in]  stream: asyncio.StreamReader (or object which has coroutine
+                       read(n)), or async iterable of bytes.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  block_size: size of read(n) for StreamReader. shall be int.
+    param[in]  executor: executor for calculating large chunk. None means
+                         shared ThreadPoolExecutor.
+    return     tuple(value, size). same as the result of rika.hashsum.
+    raise      TypeError: an argument is wrong type
+               LookupError: algorithm is unknown name
+    """
+    rika.check_type('block_size', locals(), allow=int)
+    hasher = rika.hashsum.new(algorithm)
+    block_size = max(1, block_size)
+
+    async def chunks():
+        """ inner function to yield chunks of stream """
+        if hasattr(stream, 'read'):
+            chunk = await stream.read(block_size)
+            while chunk:
+                yield chunk
+                chunk = await stream.read(block_size)
+        else:
+            async for chunk in stream:
+                yield chunk
+
+    async for chunk in chunks():
+        await _run(executor, hasher.update, chunk)
+
+    return hasher.value()
+
+
+async def gather(inputs, algorithm, limit=DEFAULT_LIMIT,
+                 block_size=rika.hashsum.DEFAULT_BLOCK_SIZE, mmap=False,
+                 executor=None):
+    """ hash or sum of many inputs concurrently
+
+    param[in]  inputs: iterable of file path or byte data.
+    param[in]  algorithm: algorithm name in str.
+    param[in]  limit: maximum number of inputs calculated at the same time.
+                      shall be int.
+    param[in]  block_size: buffer size of reading file. shall be int.
+    param[in]  mmap: same as mmap of rika.hashsum functions.
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    return     list of tuple(value, size) in order of inputs.
+    raise      OSError: an error involving open(), file.readinto() or mmap
+               TypeError: an argument is wrong type
+               ValueError: limit is less than 1
+               LookupError: algorithm is unknown name
+    """
+    rika.check_type('limit', locals(), allow=int, not_allow=bool)
+    if limit < 1:
+        raise ValueError('limit shall be 1 or more')
+    rika.hashsum.new(algorithm)  # check algorithm before starting tasks
+    semaphore = asyncio.Semaphore(limit)
+
+    async def one(path_or_bytes):
+        """ inner function to calculate one input under the limit """
+        async with semaphore:
+            return await calculate(path_or_bytes, algorithm, block_size,
+                                   mmap, executor)
+
+    return await asyncio.gather(*(one(i) for i in inputs))
+
+
+async def adler32(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                  mmap=False, executor=None):
+    """ Adler-32
+
+    Coroutine version of rika.hashsum.adler32().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.adler32(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'adler32', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.adler32, path_or_bytes,
+                      block_size, mmap)
+
+
+async def crc32(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                mmap=False, executor=None):
+    """ CRC32
+
+    Coroutine version of rika.hashsum.crc32().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.crc32(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'crc32', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.crc32, path_or_bytes,
+                      block_size, mmap)
+
+
+async def md5(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+              mmap=False, executor=None):
+    """ MD5
+
+    Coroutine version of rika.hashsum.md5().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.md5(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'md5', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.md5, path_or_bytes,
+                      block_size, mmap)
+
+
+async def sha1(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+               mmap=False, executor=None):
+    """ SHA-1
+
+    Coroutine version of rika.hashsum.sha1().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.sha1(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'sha1', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.sha1, path_or_bytes,
+                      block_size, mmap)
+
+
+async def sha224(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                 mmap=False, executor=None):
+    """ SHA-224
+
+    Coroutine version of rika.hashsum.sha224().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.sha224(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'sha224', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.sha224, path_or_bytes,
+                      block_size, mmap)
+
+
+async def sha256(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                 mmap=False, executor=None):
+    """ SHA-256
+
+    Coroutine version of rika.hashsum.sha256().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.sha256(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'sha256', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.sha256, path_or_bytes,
+                      block_size, mmap)
+
+
+async def sha384(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                 mmap=False, executor=None):
+    """ SHA-384
+
+    Coroutine version of rika.hashsum.sha384().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.sha384(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'sha384', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.sha384, path_or_bytes,
+                      block_size, mmap)
+
+
+async def sha512(path_or_bytes, block_size=rika.hashsum.DEFAULT_BLOCK_SIZE,
+                 mmap=False, executor=None):
+    """ SHA-512
+
+    Coroutine version of rika.hashsum.sha512().
+    param[in]  executor: executor for calculation. None means shared
+                         ThreadPoolExecutor.
+    note       other arguments, return and raise are same as
+               rika.hashsum.sha512(), but path_or_bytes may be also async
+               byte stream, which is given to from_stream().
+    """
+    if _is_async_stream(path_or_bytes):
+        return await from_stream(path_or_bytes, 'sha512', block_size,
+                                 executor)
+    return await _run(executor, rika.hashsum.sha512, path_or_bytes,
+                      block_size, mmap)
@@ -1,18 +1,32 @@
 """Convert RGBA data into HTML string.
 
-create_table() converts RGB data into HTML table string.
-create_canvas() converts RGBA data into HTML canvas string.
+create_table() converts RGB data into HTML table string. colspan and rowspan
+merge runs of same color into one cell.
+create_canvas() converts RGBA data into HTML canvas string. numpy array
+(height x width x 3 or 4 in uint8) is encoded by vectorized lookup table, if
+NumPy is installed. payload='base64' or 'deflate' embeds raw RGBA in base64
+instead of JavaScript array, which is much smaller and faster.
 create_table_by_pil() is wrapper of create_table(), it converts image file
 name into HTML table string using PIL.
 create_canvas_by_pil() is wrapper of create_canvas(), it converts image file
 name into HTML canvas string using PIL.
+write_table() and write_canvas() write the same string into file object in
+chunks of bounded size, without joining whole string in memory.
 
 You can try with,
-$python html_image.py imagename --id canvas_id > sample.html
+$python html_image.py imagename --id canvas_id -o sample.html
 """
 
-from itertools import islice
+import base64
+import io
+from itertools import groupby, islice
 import sys
+import zlib
+
+try:
+    import numpy as _numpy
+except ImportError:  # pure python encoder is used
+    _numpy = None
 
 __author__ = 'suomesta'
 __version__ = '1.0.0'
@@ -27,6 +41,8 @@ Output image string in HTML.
 If --id is set, then <canvas> image string is output.
 Otherwise, <table> is output."""
 
+PAYLOADS = ('array', 'base64', 'deflate')
+
 TABLE_START = """\
 <table border=0 cellpadding=0 cellspacing=0 width={0} height={1}>"""
 
@@ -39,6 +55,13 @@ TD_WITH_WIDTH = """\
 TD_NO_WIDTH = """\
 <td bgcolor=#{0:02x}{1:02x}{2:02x}></td>"""
 
+TD_MERGED = """\
+<td{0} bgcolor=#{1:02x}{2:02x}{3:02x}></td>"""
+
+COLSPAN = ' colspan={0}'
+
+ROWSPAN = ' rowspan={0}'
+
 TR_END = """\
 </tr>"""
 
@@ -54,6 +77,45 @@ CANVAS_1_HALF = (
     'let tmp = ['
 )
 
+CANVAS_PAYLOAD_1_HALF = (
+    '<canvas id="{0}" width="{1}" height="{2}"></canvas>'
+    '<script>'
+    'let canvas = document.getElementById("{0}");'
+    'let context = canvas.getContext("2d");'
+    'fetch("data:application/octet-stream;base64,'
+)
+
+CANVAS_BASE64_2_HALF = (
+    '")'
+    '.then(response => response.arrayBuffer())'
+    '.then(buffer => context.putImageData(new ImageData('
+    'new Uint8ClampedArray(buffer), canvas.width, canvas.height), 0, 0));'
+    '</script>'
+)
+
+CANVAS_DEFLATE_2_HALF = (
+    '")'
+    '.then(response => new Response(response.body.pipeThrough('
+    'new DecompressionStream("deflate"))).arrayBuffer())'
+    '.then(buffer => context.putImageData(new ImageData('
+    'new Uint8ClampedArray(buffer), canvas.width, canvas.height), 0, 0));'
+    '</script>'
+)
+
+ENCODE_PIXELS = 16 * 1024  # pixels encoded at once
+
+ENCODE_BYTES = 3 * 64 * 1024  # bytes encoded into base64 at once
+
+WRITE_CHUNK = 64 * 1024  # characters written at once by write_*()
+
+HTML_START = """\
+<html><head></head><body>
+"""
+
+HTML_END = """
+</body></html>
+"""
+
 CANVAS_2_HALF = (
     '];'
     'for (let i = 0; i < tmp.length; i++) {'
@@ -63,21 +125,132 @@ CANVAS_2_HALF = (
     '</script>'
 )
 
+_PAIR_TABLE = None  # cache of _pair_table()
+
 # -------->>-------->>-------->>-------->>-------->> private
 
 
-def _create_td(j, width, rgb_obj):
+def _iter_rows(width, height, rgb_obj):
+    """Do yield list of RGB of each row, reading rgb_obj only once.
+
+    rgb_obj is same as create_table(). raw bytes is sliced into rows by
+    memoryview, numpy array is reshaped into rows, and others are read by
+    single iterator, so that whole rows are read in linear time.
+    raise      ValueError: size of raw bytes is wrong
+    """
+    rgb_obj = _from_pil(rgb_obj, 'RGB')
+    if isinstance(rgb_obj, (bytes, bytearray, memoryview)):
+        view = memoryview(rgb_obj).cast('B')
+        channels = len(view) // (width * height) if width * height else 3
+        if channels not in (3, 4) or len(view) != width * height * channels:
+            raise ValueError('size of bytes shall be width * height * 3 or 4')
+        size = width * channels
+        for j in range(height):
+            row = view[j * size:(j + 1) * size]
+            yield list(zip(*[iter(row)] * channels))
+        return
+    if _is_array(rgb_obj):
+        rows = _numpy.asarray(rgb_obj).reshape(height, width, -1)
+        yield from (row.tolist() for row in rows)
+        return
+    pixels = iter(rgb_obj)
+    for _ in range(height):
+        yield list(islice(pixels, width))
+
+
+def _create_td(j, row):
     """Do yield <td>...</td> string data."""
     td_str = TD_WITH_WIDTH if j == 0 else TD_NO_WIDTH
-    rgbs = islice(rgb_obj, j * width, (j + 1) * width)
-    yield from (td_str.format(*rgb) for rgb in rgbs)
+    yield from (td_str.format(*rgb) for rgb in row)
 
 
 def _create_tr(width, height, rgb_obj):
     """Do yield <tr>...</tr> string data."""
-    for j in range(height):
+    for j, row in enumerate(_iter_rows(width, height, rgb_obj)):
         yield TR_START
-        yield from _create_td(j, width, rgb_obj)
+        yield from _create_td(j, row)
+        yield TR_END
+
+
+def _runs(row, colspan):
+    """Return list of (start, length, (r, g, b)) of runs in row.
+
+    If colspan is False, every run has length 1.
+    """
+    colors = (tuple(rgb[:3]) for rgb in row)
+    runs = []
+    start = 0
+    if colspan:
+        for color, group in groupby(colors):
+            length = sum(1 for _ in group)
+            runs.append((start, length, color))
+            start += length
+    else:
+        runs.extend((i, 1, color) for i, color in enumerate(colors))
+    return runs
+
+
+def _create_merged_td(cells):
+    """Do yield <td colspan rowspan>...</td> string data.
+
+    cells is list of [length, (r, g, b), rowspan].
+    """
+    for length, color, rows in cells:
+        spans = (COLSPAN.format(length) if length > 1 else '') + \
+            (ROWSPAN.format(rows) if rows > 1 else '')
+        yield TD_MERGED.format(spans, *color)
+
+
+def _create_merged_tr(width, height, rgb_obj, colspan, rowspan):
+    """Do yield <tr>...</tr> string data, merging cells of same color.
+
+    The first row is not merged, because its <td width=1> decides width of
+    each column. Runs of other rows are merged into colspan if colspan is
+    True. If rowspan is True, a run of same start, length and color as the
+    run just above it is merged into the cell above by rowspan. rowspan
+    requires all runs before output, so that the first row is output after
+    reading whole rgb_obj.
+    """
+    rows = _iter_rows(width, height, rgb_obj)
+    first = next(rows, None)
+    if first is None:
+        return
+
+    def first_tr():
+        """Do yield the first <tr>...</tr>."""
+        yield TR_START
+        yield from (TD_WITH_WIDTH.format(*rgb) for rgb in first)
+        yield TR_END
+
+    if not rowspan:
+        yield from first_tr()
+        for row in rows:
+            yield TR_START
+            yield from _create_merged_td(
+                [length, color, 1] for _, length, color in _runs(row, colspan))
+            yield TR_END
+        return
+
+    table = []  # cells to output in each row
+    above = {}  # run -> cell, for runs of the previous row
+    for row in rows:
+        cells = []
+        current = {}
+        for run in _runs(row, colspan):
+            cell = above.get(run)
+            if cell is None:
+                cell = [run[1], run[2], 1]
+                cells.append(cell)
+            else:  # covered by the cell above
+                cell[2] += 1
+            current[run] = cell
+        table.append(cells)
+        above = current
+
+    yield from first_tr()
+    for cells in table:
+        yield TR_START
+        yield from _create_merged_td(cells)
         yield TR_END
 
 
@@ -86,10 +259,211 @@ def _create_pixels(size, rgba_obj, has_alpha):
     fmt = '{0},{1},{2},{3}' if has_alpha else '{0},{1},{2},255'
     yield from (fmt.format(*i) for i in rgba_obj)
 
+
+def _join_pixels(pixels):
+    """Do yield 'r,g,b,a,...' joined by ENCODE_PIXELS in pieces."""
+    separator = ''
+    piece = ','.join(islice(pixels, ENCODE_PIXELS))
+    while piece:
+        yield separator + piece
+        separator = ','
+        piece = ','.join(islice(pixels, ENCODE_PIXELS))
+
+
+def _encode_base64(chunks):
+    """Do yield base64 string of chunks of bytes in pieces.
+
+    Bytes are encoded by multiple of 3 bytes, so that ''.join() of pieces
+    is same as base64 of whole bytes.
+    """
+    rest = b''
+    for chunk in chunks:
+        data = rest + chunk
+        size = len(data) - len(data) % 3
+        rest = data[size:]
+        if size:
+            yield base64.b64encode(data[:size]).decode('ascii')
+    if rest:
+        yield base64.b64encode(rest).decode('ascii')
+
+
+def _split_bytes(data):
+    """Do yield memoryview of data by ENCODE_BYTES."""
+    view = memoryview(data)
+    for start in range(0, len(view), ENCODE_BYTES):
+        yield view[start:start + ENCODE_BYTES]
+
+
+def _deflate(chunks):
+    """Do yield deflate-compressed chunks, same as zlib.compress()."""
+    compressor = zlib.compressobj()
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+
+def _writer(fp):
+    """Return function which writes str into fp.
+
+    Text file is written in str. Binary file is written in UTF-8, retrying
+    short writes of unbuffered file. socket is written by sendall().
+    """
+    if isinstance(fp, io.TextIOBase):
+        return fp.write
+    if not hasattr(fp, 'write'):
+        return lambda text: fp.sendall(text.encode('utf-8'))
+
+    def write(text):
+        """Inner function to write whole text in bytes."""
+        with memoryview(text.encode('utf-8')) as block:
+            written = fp.write(block)
+            while written is not None and written < len(block):
+                written += fp.write(block[written:])
+    return write
+
+
+def _write(fp, pieces, chunk_size):
+    """Write pieces of string into fp by chunk_size, and return its length.
+
+    Small pieces are joined until chunk_size, large pieces are split into
+    chunk_size, so that each write has bounded size.
+    """
+    write = _writer(fp)
+    buffer = []
+    buffered = 0
+    length = 0
+    for piece in pieces:
+        length += len(piece)
+        if buffered + len(piece) < chunk_size:
+            buffer.append(piece)
+            buffered += len(piece)
+            continue
+        buffer.append(piece)
+        text = ''.join(buffer)
+        for start in range(0, len(text) - chunk_size + 1, chunk_size):
+            write(text[start:start + chunk_size])
+        buffered = len(text) % chunk_size
+        buffer = [text[len(text) - buffered:]] if buffered else []
+    if buffer:
+        write(''.join(buffer))
+    return length
+
+
+def _pair_table():
+    """Return lookup tables of 'u,v,' for pair of byte values in numpy.
+
+    The index of pair (u, v) is u | v << 8, i.e. 2 bytes in little endian.
+    [0] is little endian uint64 array, whose item is ASCII of 'u,v,' padded
+    by zero to 8 bytes. [1] is same shape array, whose byte is 1 if the
+    same byte of [0] is used, otherwise 0.
+    tables are created at the first call, and reused.
+    """
+    global _PAIR_TABLE
+    if _PAIR_TABLE is None:
+        chars = _numpy.zeros((256, 4), dtype=_numpy.uint8)
+        used = _numpy.zeros((256, 4), dtype=_numpy.uint8)
+        for i in range(256):
+            text = (str(i) + ',').encode('ascii')
+            chars[i, :len(text)] = list(text)
+            used[i, :len(text)] = 1
+        low = _numpy.arange(65536) & 0xff
+        high = _numpy.arange(65536) >> 8
+        _PAIR_TABLE = tuple(
+            _numpy.ascontiguousarray(
+                _numpy.concatenate((i[low], i[high]), axis=1)
+            ).view('<u8').reshape(-1)
+            for i in (chars, used))
+    return _PAIR_TABLE
+
+
+def _from_pil(rgba_obj, mode):
+    """Return raw bytes of PIL image converted into mode.
+
+    If rgba_obj is not PIL image, then rgba_obj itself is returned. So that
+    PIL image is handled without NumPy, via raw bytes.
+    """
+    if hasattr(rgba_obj, 'convert') and hasattr(rgba_obj, 'tobytes') and \
+            hasattr(rgba_obj, 'mode'):
+        return rgba_obj.convert(mode).tobytes()
+    return rgba_obj
+
+
+def _is_array(rgba_obj):
+    """Return True if rgba_obj is encoded by numpy."""
+    return _numpy is not None and (isinstance(rgba_obj, _numpy.ndarray) or
+                                   hasattr(rgba_obj, '__array_interface__'))
+
+
+def _encode_pixels(rgba_array, has_alpha):
+    """Do yield 'r,g,b,a,r,g,b,a,...' in pieces using numpy.
+
+    Each pair of values is converted into 8 bytes of 'u,v,' padded by zero
+    via lookup table, then padding is removed by boolean mask. Pixels are
+    encoded by ENCODE_PIXELS, so that temporary arrays stay small.
+    param[in]  rgba_array: array of (height, width, 3 or 4) or
+                           (pixels, 3 or 4) in uint8. PIL image is also
+                           allowed.
+    param[in]  has_alpha: True uses alpha values. False uses 255.
+    yield      pieces of string. ''.join() of them is whole pixels.
+    raise      ValueError: shape of rgba_array is wrong
+    """
+    rgba_array = _numpy.asarray(rgba_array)
+    if rgba_array.ndim not in (2, 3) or rgba_array.shape[-1] not in (3, 4):
+        raise ValueError('shape of array shall be (height, width, 3 or 4)')
+    if has_alpha and rgba_array.shape[-1] != 4:
+        raise ValueError('has_alpha requires 4 channels')
+    pixels = rgba_array.reshape(-1, rgba_array.shape[-1])
+    chars, used = _pair_table()
+
+    values = _numpy.empty((min(len(pixels), ENCODE_PIXELS), 4),
+                          dtype=_numpy.uint8)
+    for start in range(0, len(pixels), ENCODE_PIXELS):
+        part = pixels[start:start + ENCODE_PIXELS]
+        if len(part) < len(values):
+            values = values[:len(part)]
+        values[:, :3] = part[:, :3]
+        values[:, 3] = part[:, 3] if has_alpha else 255
+        pairs = values.reshape(-1).view('<u2')
+        text = chars[pairs].view(_numpy.uint8)[
+            used[pairs].view(_numpy.bool_)].tobytes().decode('ascii')
+        # separator of pieces is the trailing ',' of the previous one
+        yield text if start + ENCODE_PIXELS < len(pixels) else text[:-1]
+
+
+def _rgba_bytes(rgba_obj, has_alpha):
+    """Convert RGBA (or RGB) object into raw RGBA bytes.
+
+    param[in]  rgba_obj: same as create_canvas().
+    param[in]  has_alpha: True uses alpha values. False uses 255.
+    return     bytes of 4 bytes per pixel.
+    """
+    if isinstance(rgba_obj, (bytes, bytearray, memoryview)):
+        if has_alpha:
+            return bytes(rgba_obj)
+        rgba = bytearray(rgba_obj)
+        rgba[3::4] = b'\xff' * (len(rgba) // 4)
+        return bytes(rgba)
+    if _is_array(rgba_obj):
+        rgba_array = _numpy.asarray(rgba_obj)
+        if rgba_array.ndim not in (2, 3) or \
+                rgba_array.shape[-1] not in (3, 4):
+            raise ValueError(
+                'shape of array shall be (height, width, 3 or 4)')
+        pixels = rgba_array.reshape(-1, rgba_array.shape[-1])
+        values = _numpy.full((len(pixels), 4), 255, dtype=_numpy.uint8)
+        values[:, :3] = pixels[:, :3]
+        if has_alpha:
+            values[:, 3] = pixels[:, 3]
+        return values.tobytes()
+    if has_alpha:
+        return bytes(i for rgba in rgba_obj for i in rgba[:4])
+    return bytes(i for rgba in rgba_obj for i in (rgba[0], rgba[1], rgba[2],
+                                                  255))
+
 # -------->>-------->>-------->>-------->>-------->> public
 
 
-def create_table(width, height, rgb_obj):
+def create_table(width, height, rgb_obj, colspan=False, rowspan=False):
     """Convert RGB data into HTML table string.
 
     param[in]  width: Width of image. in int.
@@ -98,15 +472,29 @@ def create_table(width, height, rgb_obj):
                         rgb_obj[i][0] should be red value,
                         rgb_obj[i][1] should be green value,
                         rgb_obj[i][2] should be blue value.
+                        it is read only once from the top, so that
+                        iterator is also allowed. numpy array of
+                        (height, width, 3 or 4), PIL image and raw RGB
+                        (or RGBA) bytes are also allowed.
+    param[in]  colspan: True merges horizontal runs of same color into one
+                        <td colspan>. the first row is never merged.
+    param[in]  rowspan: True merges vertical runs of same color (same start
+                        and length) into one <td rowspan>.
     yield      created string '<table>...</table>'.
                ''.join(create_table(...)) is a good way to use output.
+    raise      ValueError: size of raw bytes is wrong
     """
     yield TABLE_START.format(width, height)
-    yield from _create_tr(width, height, rgb_obj)
+    if colspan or rowspan:
+        yield from _create_merged_tr(width, height, rgb_obj, colspan,
+                                     rowspan)
+    else:
+        yield from _create_tr(width, height, rgb_obj)
     yield TABLE_END
 
 
-def create_canvas(canvas_id, width, height, rgba_obj, has_alpha):
+def create_canvas(canvas_id, width, height, rgba_obj, has_alpha,
+                  payload='array'):
     """Convert RGBA data into HTML5 canvas string.
 
     param[in]  canvas_id: Id of canvas tag. in str.
@@ -118,19 +506,92 @@ def create_canvas(canvas_id, width, height, rgba_obj, has_alpha):
                          rgba_obj[i][1] should be green value,
                          rgba_obj[i][2] should be blue value,
                          optional rgba_obj[i][3] should be alpha value.
+                         numpy array of (height, width, 3 or 4) in uint8
+                         is also allowed. it is encoded much faster if
+                         NumPy is installed. PIL image is also allowed,
+                         with or without NumPy.
+                         raw RGBA bytes (4 bytes per pixel) is also allowed.
     param[in]  has_alpha: True indicates to support RGB and A.
+    param[in]  payload: how to embed pixels. one of PAYLOADS.
+                        'array' is JavaScript array of decimal values.
+                        'base64' is raw RGBA in base64, about 1/3 of 'array'.
+                        'deflate' is deflate-compressed raw RGBA in base64,
+                        which requires DecompressionStream of browser.
     yield      created string '<canvas>...</canvas><script>...</script>'.
                ''.join(create_table(...)) is a good way to use output.
+    raise      ValueError: payload is unknown
+    """
+    if payload not in PAYLOADS:
+        raise ValueError('unknown payload: {0}'.format(payload))
+    rgba_obj = _from_pil(rgba_obj, 'RGBA')
+
+    if payload == 'array':
+        yield CANVAS_1_HALF.format(canvas_id, width, height)
+        if isinstance(rgba_obj, (bytes, bytearray, memoryview)):
+            if _numpy is not None:
+                rgba_obj = _numpy.frombuffer(rgba_obj, dtype=_numpy.uint8)
+                rgba_obj = rgba_obj.reshape(-1, 4)
+            else:
+                rgba_obj = zip(*[iter(bytes(rgba_obj))] * 4)
+        if _is_array(rgba_obj):
+            yield from _encode_pixels(rgba_obj, has_alpha)
+        else:
+            yield from _join_pixels(_create_pixels(width * height, rgba_obj,
+                                                   has_alpha))
+        yield CANVAS_2_HALF
+        return
+
+    rgba = _rgba_bytes(rgba_obj, has_alpha)
+    yield CANVAS_PAYLOAD_1_HALF.format(canvas_id, width, height)
+    if payload == 'deflate':
+        yield from _encode_base64(_deflate(_split_bytes(rgba)))
+        yield CANVAS_DEFLATE_2_HALF
+    else:
+        yield from _encode_base64(_split_bytes(rgba))
+        yield CANVAS_BASE64_2_HALF
+
+
+def write_table(fp, width, height, rgb_obj, colspan=False, rowspan=False,
+                chunk_size=WRITE_CHUNK):
+    """Write HTML table string of RGB data into file object.
+
+    Same string as create_table() is written in chunks, so that memory does
+    not grow with size of image (except rowspan, which keeps runs of cells).
+    param[in]  fp: writable object. text file, binary file (e.g.
+                   sys.stdout.buffer) written in UTF-8, or socket.
+    param[in]  width, height, rgb_obj, colspan, rowspan: same as
+               create_table().
+    param[in]  chunk_size: maximum characters of one write.
+    return     number of written characters.
+    """
+    return _write(fp, create_table(width, height, rgb_obj, colspan, rowspan),
+                  chunk_size)
+
+
+def write_canvas(fp, canvas_id, width, height, rgba_obj, has_alpha,
+                 payload='array', chunk_size=WRITE_CHUNK):
+    """Write HTML5 canvas string of RGBA data into file object.
+
+    Same string as create_canvas() is written in chunks, so that memory does
+    not grow with size of output string.
+    param[in]  fp: writable object. text file, binary file (e.g.
+                   sys.stdout.buffer) written in UTF-8, or socket.
+    param[in]  canvas_id, width, height, rgba_obj, has_alpha, payload: same
+               as create_canvas().
+    param[in]  chunk_size: maximum characters of one write.
+    return     number of written characters.
+    raise      ValueError: payload is unknown
     """
-    yield CANVAS_1_HALF.format(canvas_id, width, height)
-    yield ','.join(_create_pixels(width * height, rgba_obj, has_alpha))
-    yield CANVAS_2_HALF
+    return _write(fp, create_canvas(canvas_id, width, height, rgba_obj,
+                                    has_alpha, payload), chunk_size)
 
 
-def create_table_by_pil(filename):
+def create_table_by_pil(filename, colspan=False, rowspan=False):
     """Convert filename -> RGB data -> HTML table string using PIL.
 
     param[in]  filename: image file path.
+    param[in]  colspan: same as create_table().
+    param[in]  rowspan: same as create_table().
     yield      created string '<table>...</table>'.
                ''.join(create_table(...)) is a good way to use output.
     """
@@ -141,15 +602,16 @@ def create_table_by_pil(filename):
         raise
     with PIL.Image.open(filename) as src:
         width, height = src.size
-        rgb_obj = src.getdata()
-        yield from create_table(width, height, rgb_obj)
+        rgb_obj = src.convert('RGB').tobytes()
+        yield from create_table(width, height, rgb_obj, colspan, rowspan)
 
 
-def create_canvas_by_pil(filename, canvas_id='canvas_id'):
+def create_canvas_by_pil(filename, canvas_id='canvas_id', payload='array'):
     """Convert filename -> RGBA data -> HTML canvas string using PIL.
 
     param[in]  filename: image file path.
     param[in]  canvas_id: Id of canvas tag. in str.
+    param[in]  payload: how to embed pixels. same as create_canvas().
     yield      created string '<canvas>...</canvas><script>...</script>'.
                ''.join(create_table(...)) is a good way to use output.
     """
@@ -160,9 +622,17 @@ def create_canvas_by_pil(filename, canvas_id='canvas_id'):
         raise
     with PIL.Image.open(filename) as src:
         width, height = src.size
-        rgba_obj = src.getdata()
-        has_alpha = src.mode == 'RGBA'
-        yield from create_canvas(canvas_id, width, height, rgba_obj, has_alpha)
+        # 'P', 'L', 'LA' and so on do not give RGB(A) tuple per pixel
+        has_alpha = 'A' in src.getbands() or 'transparency' in src.info
+        rgba_src = src.convert('RGBA')
+        if payload != 'array':
+            rgba_obj = rgba_src.tobytes()
+        elif _numpy is not None:
+            rgba_obj = _numpy.asarray(rgba_src)
+        else:
+            rgba_obj = rgba_src.getdata()
+        yield from create_canvas(canvas_id, width, height, rgba_obj, has_alpha,
+                                 payload)
 
 
 def main():
@@ -172,8 +642,9 @@ def main():
     If --id is set, then <canvas> image string is output.
     Else, <table> image string is output.
 
-    $python html_image.py imagename --id canvas_id > sample.html
-    is a good way to use this program.
+    $python html_image.py imagename --id canvas_id -o sample.html
+    is a good way to use this program. Output is written in chunks by
+    write_table() or write_canvas() manner.
     """
     # parse args using argparse
     import argparse
@@ -184,16 +655,36 @@ def main():
                         type=str, help='image file path')
     parser.add_argument('--id', metavar='id',
                         type=str, help='canvas id. mandatory for canvas')
+    parser.add_argument('-o', '--output', metavar='file',
+                        type=str, help='output file. default is stdout')
+    parser.add_argument('--payload', choices=PAYLOADS, default='array',
+                        help='how to embed pixels of canvas')
+    parser.add_argument('--colspan', action='store_true',
+                        help='merge horizontal runs of table cells')
+    parser.add_argument('--rowspan', action='store_true',
+                        help='merge vertical runs of table cells')
 
     args = parser.parse_args()
 
     # call create_table_by_pil() or  create_canvas_by_pil(), and output
-    print('<html><head></head><body>')
     if args.id:  # <canvas> mode. call create_canvas_by_pil()
-        print(''.join(create_canvas_by_pil(args.file, args.id)))
+        pieces = create_canvas_by_pil(args.file, args.id, args.payload)
     else:  # <table> mode. call create_table_by_pil()
-        print(''.join(create_table_by_pil(args.file)))
-    print('</body></html>')
+        pieces = create_table_by_pil(args.file, args.colspan, args.rowspan)
+
+    def html():
+        """Inner function to yield whole HTML."""
+        yield HTML_START
+        yield from pieces
+        yield HTML_END
+
+    if args.output:
+        with open(args.output, 'wb') as file:
+            _write(file, html(), WRITE_CHUNK)
+    else:
+        sys.stdout.flush()
+        _write(sys.stdout.buffer, html(), WRITE_CHUNK)
+        sys.stdout.buffer.flush()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,93 @@
+# -*- coding:utf-8 -*-
+""" unit test of bench.
+
+Here testing bench_hashsum(), bench_cache() and bench_html_image() in
+rika.bench.py with tiny sizes.
+"""
+
+import unittest
+import os.path
+import sys
+_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(_SCRIPT_DIR, '..', '..'))
+import rika.bench
+
+__author__ = 'suomesta'
+__version__ = '1.0.0'
+
+
+class TestBenchHashsum(unittest.TestCase):
+    """ test bench_hashsum(). """
+    def test_results(self):
+        """ test keys and number of results. """
+        report = rika.bench.bench_hashsum(['crc32', 'md5'], [1024, 4096],
+                                          [100000], 1, cold=False)
+        # (2 block sizes + mmap + bytes) * 2 algorithms
+        self.assertEqual(8, len(report['results']))
+        self.assertEqual(
+            {'algorithm', 'input', 'cache', 'file_size', 'block_size',
+             'seconds', 'mb_per_s', 'peak_alloc_kib'},
+            set(report['results'][0])
+        )
+        # block_size is allocated by the case itself, but data of bytes is not
+        peaks = {(i['input'], i['block_size']): i['peak_alloc_kib']
+                 for i in report['results'] if i['algorithm'] == 'crc32'}
+        self.assertGreaterEqual(peaks[('path', 4096)], 4)
+        self.assertLess(peaks[('bytes', None)], peaks[('path', 4096)])
+        self.assertIn('peak_rss_kib', report)
+        self.assertEqual(
+            ['crc32', 'md5'],
+            [i['algorithm'] for i in report['overhead']]
+        )
+        self.assertEqual(
+            {'algorithm', 'us_per_call', 'us_per_batch_item'},
+            set(report['overhead'][0])
+        )
+
+    def test_parse_size(self):
+        """ test _parse_size(). """
+        self.assertEqual(100, rika.bench._parse_size('100'))
+        self.assertEqual(64 * 1024, rika.bench._parse_size('64K'))
+        self.assertEqual(2 * 1024 ** 3, rika.bench._parse_size('2g'))
+
+
+class TestBenchCache(unittest.TestCase):
+    """ test bench_cache(). """
+    def test_results(self):
+        """ test keys and number of results. """
+        report = rika.bench.bench_cache('md5', 100000, 4096)
+        self.assertEqual(list(rika.bench.CACHE_HINTS),
+                         [i['hints'] for i in report['results']])
+        self.assertEqual(
+            {'hints', 'algorithm', 'file_size', 'block_size', 'seconds',
+             'mb_per_s', 'resident_ratio'},
+            set(report['results'][0])
+        )
+        report = rika.bench.bench_cache(
+            'crc32', 1000, 4096, {'bulk': rika.hashsum.BULK_HINTS})
+        self.assertEqual(['bulk'], [i['hints'] for i in report['results']])
+
+    def test_resident_ratio(self):
+        """ test _resident_ratio() returns ratio or None. """
+        ratio = rika.bench._resident_ratio(__file__)
+        if ratio is not None:
+            self.assertTrue(0.0 <= ratio <= 1.0)
+
+
+class TestBenchHtmlImage(unittest.TestCase):
+    """ test bench_html_image(). """
+    def test_results(self):
+        """ test keys and number of results. """
+        report = rika.bench.bench_html_image(4, [2, 8], 1)
+        inputs = 3 if rika.html_image._numpy is not None else 2
+        self.assertEqual(2 * inputs, len(report['results']))
+        self.assertEqual(
+            {'input', 'width', 'height', 'seconds', 'us_per_pixel'},
+            set(report['results'][0])
+        )
+        self.assertEqual([2] * inputs + [8] * inputs,
+                         [i['height'] for i in report['results']])
+
+
+if __name__ == '__main__':
+    unittest.main()
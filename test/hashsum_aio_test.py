@@ -0,0 +1,191 @@
+# -*- coding:utf-8 -*-
+""" unit test of hashsum_aio.
+
+Here testing coroutine functions in rika.hashsum_aio.py
+Required result is calculated by rika.hashsum.
+"""
+
+import unittest
+import asyncio
+import concurrent.futures
+import os.path
+import sys
+_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(_SCRIPT_DIR, '..', '..'))
+import rika.hashsum
+import rika.hashsum_aio
+
+__author__ = 'suomesta'
+__version__ = '1.0.0'
+
+_PNG = os.path.join('data', 'hashsum', 'python-logo-master-v3-TM.png')
+_EMPTY = os.path.join('data', 'hashsum', 'empty')
+_NOT_FOUND = os.path.join('data', 'hashsum', 'notfound')
+_NAMES = ('adler32', 'crc32', 'md5', 'sha1', 'sha224', 'sha256', 'sha384',
+          'sha512')
+
+
+class _Reader(object):
+    """ imitation of asyncio.StreamReader. """
+    def __init__(self, data):
+        """ initialize with whole data. """
+        self.data = data
+
+    async def read(self, n):
+        """ read at most n bytes. """
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+async def _chunks(data, size):
+    """ async iterable of chunks. """
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+class TestFunctions(unittest.TestCase):
+    """ test adler32(), crc32(), md5(), sha1(), sha224(), sha256(), sha384(),
+    and sha512(). """
+    def test_file_name(self):
+        """ test all functions using file name. """
+        for name in _NAMES:
+            for path in (_PNG, _EMPTY):
+                self.assertEqual(
+                    getattr(rika.hashsum, name)(path),
+                    asyncio.run(getattr(rika.hashsum_aio, name)(path))
+                )
+
+    def test_binary(self):
+        """ test all functions using small and large binary. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        large = b * (rika.hashsum_aio.INLINE_THRESHOLD // len(b) + 1)
+        for name in _NAMES:
+            for data in (b, large):
+                self.assertEqual(
+                    getattr(rika.hashsum, name)(data),
+                    asyncio.run(getattr(rika.hashsum_aio, name)(data))
+                )
+
+    def test_stream(self):
+        """ test all functions using reader and async iterable. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        for name in _NAMES:
+            self.assertEqual(
+                getattr(rika.hashsum, name)(b),
+                asyncio.run(getattr(rika.hashsum_aio, name)(_Reader(b)))
+            )
+            self.assertEqual(
+                getattr(rika.hashsum, name)(b),
+                asyncio.run(getattr(rika.hashsum_aio, name)(_chunks(b, 100)))
+            )
+
+    def test_executor(self):
+        """ test appointed executor. """
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            self.assertEqual(
+                rika.hashsum.md5(_PNG),
+                asyncio.run(rika.hashsum_aio.md5(_PNG, executor=executor))
+            )
+
+    def test_errors(self):
+        """ test not found and wrong path_or_bytes. """
+        self.assertRaises(
+            OSError,
+            asyncio.run, rika.hashsum_aio.crc32(_NOT_FOUND)
+        )
+        self.assertRaises(
+            TypeError,
+            asyncio.run, rika.hashsum_aio.crc32(1.0)
+        )
+
+
+class TestCalculate(unittest.TestCase):
+    """ test calculate(). """
+    def test_calculate(self):
+        """ test calculate() using file name and binary. """
+        self.assertEqual(
+            rika.hashsum.sha256(_PNG),
+            asyncio.run(rika.hashsum_aio.calculate(_PNG, 'sha256'))
+        )
+        self.assertEqual(
+            rika.hashsum.adler32(b'abc'),
+            asyncio.run(rika.hashsum_aio.calculate(b'abc', 'adler32'))
+        )
+        self.assertEqual(
+            rika.hashsum.sha224(b'abc'),
+            asyncio.run(rika.hashsum_aio.calculate(_Reader(b'abc'), 'sha224'))
+        )
+
+    def test_wrong_algorithm(self):
+        """ test calculate() using wrong algorithm. """
+        self.assertRaises(
+            LookupError,
+            asyncio.run, rika.hashsum_aio.calculate(_PNG, 'md4')
+        )
+
+
+class TestFromStream(unittest.TestCase):
+    """ test from_stream(). """
+    def test_reader(self):
+        """ test from_stream() using reader. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        self.assertEqual(
+            rika.hashsum.sha1(b),
+            asyncio.run(rika.hashsum_aio.from_stream(_Reader(b), 'sha1'))
+        )
+        self.assertEqual(
+            rika.hashsum.crc32(b),
+            asyncio.run(rika.hashsum_aio.from_stream(_Reader(b), 'crc32', 7))
+        )
+        self.assertEqual(
+            rika.hashsum.crc32(b''),
+            asyncio.run(rika.hashsum_aio.from_stream(_Reader(b''), 'crc32'))
+        )
+
+    def test_async_iterable(self):
+        """ test from_stream() using async iterable. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        large = b * (rika.hashsum_aio.INLINE_THRESHOLD // len(b) + 1)
+        self.assertEqual(
+            rika.hashsum.md5(large),
+            asyncio.run(rika.hashsum_aio.from_stream(
+                _chunks(large, 100000), 'md5'))
+        )
+
+
+class TestGather(unittest.TestCase):
+    """ test gather(). """
+    def test_gather(self):
+        """ test gather() using file names and binaries. """
+        inputs = [_PNG, _EMPTY, b'abc', _PNG] * 10
+        self.assertEqual(
+            [rika.hashsum.sha512(i) for i in inputs],
+            asyncio.run(rika.hashsum_aio.gather(inputs, 'sha512', limit=3))
+        )
+        self.assertEqual(
+            [],
+            asyncio.run(rika.hashsum_aio.gather([], 'sha512'))
+        )
+
+    def test_wrong_arguments(self):
+        """ test gather() using wrong arguments. """
+        self.assertRaises(
+            ValueError,
+            asyncio.run, rika.hashsum_aio.gather([_PNG], 'md5', limit=0)
+        )
+        self.assertRaises(
+            LookupError,
+            asyncio.run, rika.hashsum_aio.gather([_PNG], 'md4')
+        )
+        self.assertRaises(
+            OSError,
+            asyncio.run, rika.hashsum_aio.gather([_PNG, _NOT_FOUND], 'md5')
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
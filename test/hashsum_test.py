@@ -2,17 +2,34 @@
 """ unit test of hashsum.
 
 Here testing adler32(), crc32(), md5(), sha1(), sha224(), sha256(), sha384(),
-and sha512() in rika.hashsum.py
+sha512(), multi(), hash_tree(), HashCache, new(), from_stream(), chunked(),
+crc32_combine(), adler32_combine(), parallel_sum(), verify_manifest(),
+find_duplicates(), main(), calculate(), algorithms(), register(), batch(),
+copy_and_hash(), RollingAdler32, rolling_adler32(), cdc_chunks(),
+Observer, and IOHints in rika.hashsum.py
 
-All functions are tested by one class.
+Each function is tested by one class.
 Two files are stored to ./data/hashsum folder.
 Main procedure is to calculate hashsum of these files.
 Required result is calculated by Windows free software 'HashSum'.
 """
 
 import unittest
+import doctest
+import array
+import errno
+import hashlib
+import io
+import mmap
 import os.path
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import threading
+import random
 import sys
+import zlib
 _SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
 sys.path.append(os.path.join(_SCRIPT_DIR, '..', '..'))
 import rika.hashsum
@@ -23,6 +40,7 @@ __version__ = '1.0.0'
 _PNG = os.path.join('data', 'hashsum', 'python-logo-master-v3-TM.png')
 _EMPTY = os.path.join('data', 'hashsum', 'empty')
 _NOT_FOUND = os.path.join('data', 'hashsum', 'notfound')
+_TREE = os.path.join('data', 'utilfunc', 'my_glob')
 
 
 def _to_str(result):
@@ -95,7 +113,7 @@ class TestAdler32(unittest.TestCase):
         """ test adler32() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.adler32, 1, 1024
+            rika.hashsum.adler32, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -167,7 +185,7 @@ class TestCrc32(unittest.TestCase):
         """ test crc32() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.crc32, 1, 1024
+            rika.hashsum.crc32, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -239,7 +257,7 @@ class TestMd5(unittest.TestCase):
         """ test md5() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.md5, 1, 1024
+            rika.hashsum.md5, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -311,7 +329,7 @@ class TestSha1(unittest.TestCase):
         """ test sha1() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.sha1, 1, 1024
+            rika.hashsum.sha1, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -383,7 +401,7 @@ class TestSha224(unittest.TestCase):
         """ test sha224() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.sha224, 1, 1024
+            rika.hashsum.sha224, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -455,7 +473,7 @@ class TestSha256(unittest.TestCase):
         """ test sha256() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.sha256, 1, 1024
+            rika.hashsum.sha256, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -527,7 +545,7 @@ class TestSha384(unittest.TestCase):
         """ test sha384() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.sha384, 1, 1024
+            rika.hashsum.sha384, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -599,7 +617,7 @@ class TestSha512(unittest.TestCase):
         """ test sha512() using wrong path_or_bytes. """
         self.assertRaises(
             TypeError,
-            rika.hashsum.sha512, 1, 1024
+            rika.hashsum.sha512, 1.0, 1024
         )
 
     def test_wrong_block_size(self):
@@ -609,5 +627,1543 @@ class TestSha512(unittest.TestCase):
             rika.hashsum.sha512, _EMPTY, 1.0
         )
 
+
+class TestMulti(unittest.TestCase):
+    """ test multi(). """
+    def test_png_file_name(self):
+        """ test multi() using file name to png. """
+        result = rika.hashsum.multi(_PNG, ['crc32', 'md5', 'sha256'])
+        self.assertEqual(['crc32', 'md5', 'sha256'], list(result))
+        self.assertEqual('d5db66c6', _to_str(result['crc32']))
+        self.assertEqual(
+            '3cf229eedc092549277e8859aad2fca5',
+            _to_str(result['md5'])
+        )
+        self.assertEqual(
+            '515d56e5b2bb0ea82350bc42fca54149ca135815a1c7d3fedd8e44615a77d37a',
+            _to_str(result['sha256'])
+        )
+        result = rika.hashsum.multi(_PNG, ['adler32', 'sha1'], 1)
+        self.assertEqual('6191cfb5', _to_str(result['adler32']))
+        self.assertEqual(
+            'c8a756475599e6e3c904b24077b4b0a31983752c',
+            _to_str(result['sha1'])
+        )
+
+    def test_png_binary(self):
+        """ test multi() using binary to png. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        names = ['adler32', 'crc32', 'md5', 'sha1', 'sha224', 'sha256',
+                 'sha384', 'sha512']
+        result = rika.hashsum.multi(b, names)
+        for name in names:
+            self.assertEqual(
+                getattr(rika.hashsum, name)(b),
+                result[name]
+            )
+
+    def test_empty_file_name(self):
+        """ test multi() using file name to empty. """
+        result = rika.hashsum.multi(_EMPTY, ('adler32', 'crc32'))
+        self.assertEqual('00000001', _to_str(result['adler32']))
+        self.assertEqual('00000000', _to_str(result['crc32']))
+        self.assertEqual({}, rika.hashsum.multi(_EMPTY, []))
+
+    def test_duplicated_algorithms(self):
+        """ test multi() using duplicated algorithms. """
+        result = rika.hashsum.multi(_PNG, iter(['md5', 'md5']))
+        self.assertEqual(['md5'], list(result))
+        self.assertEqual(rika.hashsum.md5(_PNG), result['md5'])
+
+    def test_not_found(self):
+        """ test multi() using file name to not found. """
+        self.assertRaises(
+            (OSError, TypeError, ValueError),
+            rika.hashsum.multi, _NOT_FOUND, ['md5']
+        )
+
+    def test_wrong_algorithms(self):
+        """ test multi() using wrong algorithms. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.multi, _PNG, 'md5'
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.multi, _PNG, [1]
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.multi, _PNG, ['md4']
+        )
+
+
+class TestBlockSize(unittest.TestCase):
+    """ test block_size of reading file. """
+    def test_large_file_name(self):
+        """ test file which is larger than DEFAULT_BLOCK_SIZE. """
+        data = bytes(range(256)) * (rika.hashsum.DEFAULT_BLOCK_SIZE // 100)
+        with rika.ScopedFile() as tmp:
+            tmp.write(data, binarymode=True)
+            for block_size in (1000, 4096, rika.hashsum.DEFAULT_BLOCK_SIZE,
+                               len(data) + 1):
+                self.assertEqual(
+                    rika.hashsum.multi(data, ['crc32', 'sha1']),
+                    rika.hashsum.multi(tmp.path, ['crc32', 'sha1'],
+                                       block_size)
+                )
+            self.assertEqual(
+                rika.hashsum.md5(data),
+                rika.hashsum.md5(tmp.path)
+            )
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'requires os.mkfifo')
+    def test_fifo(self):
+        """ test FIFO, whose size is 0, is not read byte by byte. """
+        data = bytes(range(256)) * 4096
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'fifo')
+            os.mkfifo(path)
+            for hints in (None, rika.hashsum.IOHints()):
+                progresses = []
+                observer = rika.hashsum.Observer(progresses.append, 0)
+                writer = threading.Thread(
+                    target=pathlib.Path(path).write_bytes, args=(data,))
+                writer.start()
+                try:
+                    result = rika.hashsum.sha256(
+                        path, observer=observer, hints=hints)
+                finally:
+                    writer.join()
+                self.assertEqual(rika.hashsum.sha256(data), result)
+                # one progress is reported for each block
+                self.assertLess(len(progresses), 1000)
+
+
+class TestMmap(unittest.TestCase):
+    """ test mmap of reading file. """
+    def test_png_file_name(self):
+        """ test mmap using file name to png. """
+        for use_mmap in (True, None):
+            self.assertEqual(
+                'd5db66c6',
+                _to_str(rika.hashsum.crc32(_PNG, mmap=use_mmap))
+            )
+            self.assertEqual(
+                '3cf229eedc092549277e8859aad2fca5',
+                _to_str(rika.hashsum.md5(_PNG, 1000, use_mmap))
+            )
+            self.assertEqual(
+                rika.hashsum.multi(_PNG, ['adler32', 'sha512']),
+                rika.hashsum.multi(_PNG, ['adler32', 'sha512'], mmap=use_mmap)
+            )
+
+    def test_empty_file_name(self):
+        """ test mmap using file name to empty. """
+        self.assertEqual(
+            '00000001',
+            _to_str(rika.hashsum.adler32(_EMPTY, mmap=True))
+        )
+        self.assertEqual(
+            'da39a3ee5e6b4b0d3255bfef95601890afd80709',
+            _to_str(rika.hashsum.sha1(_EMPTY, 0, True))
+        )
+
+    def test_wrong_mmap(self):
+        """ test mmap using wrong type. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.sha256, _EMPTY, mmap=1
+        )
+
+
+class TestHashTree(unittest.TestCase):
+    """ test hash_tree(). """
+    def test_thread(self):
+        """ test hash_tree() using thread. """
+        required = {
+            path: rika.hashsum.sha256(path)
+            for path in rika.my_glob(_TREE, recursive=True)
+        }
+        result = {
+            path: (value, size)
+            for path, value, size in rika.hashsum.hash_tree(_TREE)
+        }
+        self.assertEqual(required, result)
+
+        required = {
+            path: rika.hashsum.crc32(path)
+            for path in rika.my_glob(_TREE, '*.txt')
+        }
+        result = {
+            path: (value, size)
+            for path, value, size in rika.hashsum.hash_tree(
+                _TREE, '*.txt', 'crc32', False, workers=1)
+        }
+        self.assertEqual(required, result)
+
+    def test_process(self):
+        """ test hash_tree() using process. """
+        required = {
+            path: rika.hashsum.md5(path)
+            for path in rika.my_glob(_TREE, recursive=True)
+        }
+        result = {
+            path: (value, size)
+            for path, value, size in rika.hashsum.hash_tree(
+                _TREE, algorithm='md5', workers=2, executor='process')
+        }
+        self.assertEqual(required, result)
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), 'requires os.symlink')
+    def test_error(self):
+        """ test hash_tree() continuing after unreadable file. """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for i in range(50):
+                with open(os.path.join(tmp_dir, str(i)), 'wb') as file:
+                    file.write(bytes([i]))
+            broken = os.path.join(tmp_dir, 'broken')
+            os.symlink(os.path.join(tmp_dir, 'notfound'), broken)
+            for executor in ('thread', 'process'):
+                result = {
+                    path: (value, size)
+                    for path, value, size in rika.hashsum.hash_tree(
+                        tmp_dir, workers=2, executor=executor)
+                }
+                self.assertEqual(51, len(result))
+                self.assertIsInstance(result.pop(broken)[0],
+                                      FileNotFoundError)
+                for path, (value, size) in result.items():
+                    self.assertEqual(rika.hashsum.sha256(path),
+                                     (value, size))
+
+    def test_no_file(self):
+        """ test hash_tree() for no file. """
+        self.assertEqual(
+            [],
+            list(rika.hashsum.hash_tree(_TREE, '*.notfound'))
+        )
+
+    def test_wrong_arguments(self):
+        """ test hash_tree() using wrong arguments. """
+        self.assertRaises(
+            LookupError,
+            list, rika.hashsum.hash_tree(_TREE, algorithm='md4')
+        )
+        self.assertRaises(
+            ValueError,
+            list, rika.hashsum.hash_tree(_TREE, workers=0)
+        )
+        self.assertRaises(
+            ValueError,
+            list, rika.hashsum.hash_tree(_TREE, executor='fiber')
+        )
+        self.assertRaises(
+            TypeError,
+            list, rika.hashsum.hash_tree(_TREE, workers=1.0)
+        )
+
+
+class TestHashCache(unittest.TestCase):
+    """ test HashCache. """
+    def test_get(self):
+        """ test get() using cached and changed file. """
+        with rika.ScopedFile() as tmp:
+            tmp.write(b'abc', binarymode=True)
+            with rika.hashsum.HashCache(':memory:') as cache:
+                self.assertEqual(
+                    rika.hashsum.md5(b'abc'),
+                    cache.get(tmp.path, 'md5')
+                )
+                self.assertEqual(
+                    rika.hashsum.crc32(b'abc'),
+                    cache.get(tmp.path, 'crc32')
+                )
+                # cached value is returned while the file is not changed
+                self.assertEqual(
+                    rika.hashsum.md5(b'abc'),
+                    cache.get(tmp.path, 'md5', mmap=True)
+                )
+                tmp.write(b'abcd', binarymode=True)
+                self.assertEqual(
+                    rika.hashsum.md5(b'abcd'),
+                    cache.get(tmp.path, 'md5')
+                )
+
+    def test_stored(self):
+        """ test values stored in database file. """
+        with rika.ScopedFile() as db:
+            with rika.hashsum.HashCache(db.path) as cache:
+                self.assertEqual(
+                    rika.hashsum.sha1(_PNG),
+                    cache.get(_PNG, 'sha1')
+                )
+            with rika.hashsum.HashCache(db.path) as cache:
+                self.assertEqual(
+                    rika.hashsum.sha1(_PNG),
+                    cache.get(_PNG, 'sha1')
+                )
+                self.assertEqual(0, cache.compact())
+
+    def test_compact(self):
+        """ test compact() removing entries of removed file. """
+        with rika.hashsum.HashCache(':memory:') as cache:
+            with rika.ScopedFile() as tmp:
+                cache.get(tmp.path, 'sha256')
+                cache.get(_EMPTY, 'sha256')
+            self.assertEqual(1, cache.compact())
+            self.assertEqual(0, cache.compact())
+
+    def test_wrong_arguments(self):
+        """ test HashCache using wrong arguments. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.HashCache, None
+        )
+        with rika.hashsum.HashCache(':memory:') as cache:
+            self.assertRaises(
+                OSError,
+                cache.get, _NOT_FOUND, 'md5'
+            )
+            self.assertRaises(
+                LookupError,
+                cache.get, _PNG, 'md4'
+            )
+            self.assertRaises(
+                TypeError,
+                cache.get, b'abc', 'md5'
+            )
+
+
+class TestNew(unittest.TestCase):
+    """ test new() and Hasher. """
+    def test_update(self):
+        """ test update() in pieces. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        for name in ('adler32', 'crc32', 'md5', 'sha1', 'sha224', 'sha256',
+                     'sha384', 'sha512'):
+            hasher = rika.hashsum.new(name)
+            self.assertEqual(name, hasher.name)
+            for i in range(0, len(b), 1000):
+                hasher.update(b[i:i + 1000])
+            required = getattr(rika.hashsum, name)(b)
+            self.assertEqual(required, hasher.value())
+            self.assertEqual(required[1], hasher.digest_size)
+            self.assertEqual(_to_str(required), hasher.hexdigest())
+            self.assertEqual(
+                required[0].to_bytes(required[1], byteorder='big'),
+                hasher.digest()
+            )
+
+    def test_copy(self):
+        """ test copy() is independent. """
+        for name in ('adler32', 'crc32', 'sha256'):
+            hasher = rika.hashsum.new(name)
+            hasher.update(b'abc')
+            other = hasher.copy()
+            other.update(b'def')
+            self.assertEqual(
+                getattr(rika.hashsum, name)(b'abc'),
+                hasher.value()
+            )
+            self.assertEqual(
+                getattr(rika.hashsum, name)(b'abcdef'),
+                other.value()
+            )
+
+    def test_wrong_name(self):
+        """ test new() using wrong name. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.new, b'md5'
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.new, 'md4'
+        )
+
+
+class TestFromStream(unittest.TestCase):
+    """ test from_stream(). """
+    def test_file_like(self):
+        """ test from_stream() using file-like object. """
+        with open(_PNG, 'rb') as file:
+            self.assertEqual(
+                rika.hashsum.md5(_PNG),
+                rika.hashsum.from_stream(file, 'md5', 100)
+            )
+        self.assertEqual(
+            rika.hashsum.md5(b''),
+            rika.hashsum.from_stream(io.BytesIO(), 'md5')
+        )
+
+    def test_iterable(self):
+        """ test from_stream() using generator and list. """
+        chunks = (bytes([i]) * i for i in range(256))
+        self.assertEqual(
+            rika.hashsum.crc32(b''.join(bytes([i]) * i for i in range(256))),
+            rika.hashsum.from_stream(chunks, 'crc32')
+        )
+        self.assertEqual(
+            rika.hashsum.sha1(b'abcdef'),
+            rika.hashsum.from_stream([b'abc', bytearray(b'def')], 'sha1')
+        )
+
+    def test_wrong_arguments(self):
+        """ test from_stream() using wrong arguments. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.from_stream, 1, 'md5'
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.from_stream, [b'abc'], 'md5', 1.0
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.from_stream, [b'abc'], 'md4'
+        )
+
+
+class TestInputTypes(unittest.TestCase):
+    """ test types of path_or_bytes. """
+    def test_path_like(self):
+        """ test os.PathLike. """
+        self.assertEqual(
+            rika.hashsum.md5(_PNG),
+            rika.hashsum.md5(pathlib.Path(_PNG))
+        )
+        self.assertEqual(
+            rika.hashsum.md5(_PNG),
+            rika.hashsum.md5(pathlib.Path(_PNG), mmap=True)
+        )
+
+    def test_file_descriptor(self):
+        """ test file descriptor read from the current position. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+            file.seek(100)
+            self.assertEqual(
+                rika.hashsum.crc32(b[100:]),
+                rika.hashsum.crc32(file.fileno(), 1000)
+            )
+            # file descriptor is not closed
+            os.fstat(file.fileno())
+
+    def test_file_object(self):
+        """ test binary file object and file-like object. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+            file.seek(0)
+            self.assertEqual(
+                rika.hashsum.sha1(b),
+                rika.hashsum.sha1(file, 1000)
+            )
+            self.assertFalse(file.closed)
+        with open(_PNG, 'rb', buffering=0) as file:
+            self.assertEqual(
+                rika.hashsum.sha1(b),
+                rika.hashsum.sha1(file)
+            )
+        self.assertEqual(
+            rika.hashsum.multi(b, ['adler32', 'sha224']),
+            rika.hashsum.multi(io.BytesIO(b), ['adler32', 'sha224'], 7)
+        )
+
+    def test_buffer(self):
+        """ test objects supporting buffer protocol. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        self.assertEqual(
+            rika.hashsum.sha256(b),
+            rika.hashsum.sha256(memoryview(b))
+        )
+        self.assertEqual(
+            rika.hashsum.sha256(b[100:200]),
+            rika.hashsum.sha256(memoryview(b)[100:200])
+        )
+        # not contiguous
+        self.assertEqual(
+            rika.hashsum.adler32(b[::2]),
+            rika.hashsum.adler32(memoryview(b)[::2])
+        )
+        # not byte format
+        data = array.array('I', range(1000))
+        self.assertEqual(
+            rika.hashsum.sha384(data.tobytes()),
+            rika.hashsum.sha384(data)
+        )
+        self.assertEqual(
+            rika.hashsum.crc32(data.tobytes()),
+            rika.hashsum.crc32(memoryview(data))
+        )
+
+    def test_mmap(self):
+        """ test mmap object. """
+        with open(_PNG, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                self.assertEqual(
+                    rika.hashsum.sha512(_PNG),
+                    rika.hashsum.sha512(m)
+                )
+
+
+class TestChunked(unittest.TestCase):
+    """ test chunked(). """
+    def test_png_file_name(self):
+        """ test chunked() using file name to png. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        chunks, root = rika.hashsum.chunked(_PNG, 'sha256', 4096, 2)
+        self.assertEqual(-(-len(b) // 4096), len(chunks))
+        self.assertEqual(
+            [rika.hashsum.sha256(b[i:i + 4096])
+             for i in range(0, len(b), 4096)],
+            chunks
+        )
+        self.assertEqual(32, root[1])
+        # same result in process and small block_size
+        self.assertEqual(
+            (chunks, root),
+            rika.hashsum.chunked(_PNG, 'sha256', 4096, 2, 'process', 100)
+        )
+
+    def test_merkle_root(self):
+        """ test Merkle root of one and three chunks. """
+        b = b'abcdefgh'
+        chunks, root = rika.hashsum.chunked(_PNG, 'md5')
+        self.assertEqual([rika.hashsum.md5(_PNG)], chunks)
+        self.assertEqual(
+            rika.hashsum.md5(
+                b'\x00' + chunks[0][0].to_bytes(16, byteorder='big')),
+            root
+        )
+        with rika.ScopedFile() as tmp:
+            tmp.write(b, binarymode=True)
+            chunks, root = rika.hashsum.chunked(tmp.path, 'md5', 3)
+        self.assertEqual(
+            [rika.hashsum.md5(b'abc'), rika.hashsum.md5(b'def'),
+             rika.hashsum.md5(b'gh')],
+            chunks
+        )
+        leaves = [
+            rika.hashsum.md5(b'\x00' + i[0].to_bytes(16, byteorder='big'))
+            [0].to_bytes(16, byteorder='big')
+            for i in chunks
+        ]
+        left = rika.hashsum.md5(b'\x01' + leaves[0] + leaves[1])
+        self.assertEqual(
+            rika.hashsum.md5(
+                b'\x01' + left[0].to_bytes(16, byteorder='big') + leaves[2]),
+            root
+        )
+
+    def test_second_preimage(self):
+        """ test root of a parent node as data differs from original. """
+        c1, c2 = b'a' * 100, b'b' * 100
+        with rika.ScopedFile() as tmp:
+            tmp.write(c1 + c2, binarymode=True)
+            _, root = rika.hashsum.chunked(tmp.path, 'sha256', 100)
+        forged = b'\x01' + \
+            rika.hashsum.sha256(c1)[0].to_bytes(32, byteorder='big') + \
+            rika.hashsum.sha256(c2)[0].to_bytes(32, byteorder='big')
+        with rika.ScopedFile() as tmp:
+            tmp.write(forged, binarymode=True)
+            _, forged_root = rika.hashsum.chunked(tmp.path, 'sha256', 100)
+        self.assertNotEqual(root, forged_root)
+
+    def test_empty_file_name(self):
+        """ test chunked() using file name to empty. """
+        crc = rika.hashsum.crc32(b'')
+        leaf = b'\x00' + crc[0].to_bytes(4, byteorder='big')
+        self.assertEqual(
+            ([crc], rika.hashsum.crc32(leaf)),
+            rika.hashsum.chunked(_EMPTY, 'crc32')
+        )
+
+    def test_wrong_arguments(self):
+        """ test chunked() using wrong arguments. """
+        self.assertRaises(
+            OSError,
+            rika.hashsum.chunked, _NOT_FOUND
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.chunked, b'abc'
+        )
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.chunked, _PNG, chunk_size=0
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.chunked, _PNG, 'md4'
+        )
+
+
+class TestCombine(unittest.TestCase):
+    """ test crc32_combine() and adler32_combine(). """
+    def test_combine(self):
+        """ test combine() using various lengths. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        for i in (0, 1, 2, 3, 100, 1000, 65520, 65521, 65522, len(b)):
+            for name in ('crc32', 'adler32'):
+                function = getattr(rika.hashsum, name)
+                combine = getattr(rika.hashsum, name + '_combine')
+                self.assertEqual(
+                    function(b)[0],
+                    combine(function(b[:i])[0], function(b[i:])[0],
+                            len(b) - i)
+                )
+        data = b * 30
+        self.assertEqual(
+            rika.hashsum.adler32(b + data)[0],
+            rika.hashsum.adler32_combine(rika.hashsum.adler32(b)[0],
+                                         rika.hashsum.adler32(data)[0],
+                                         len(data))
+        )
+
+    def test_wrong_arguments(self):
+        """ test combine() using wrong arguments. """
+        for combine in (rika.hashsum.crc32_combine,
+                        rika.hashsum.adler32_combine):
+            self.assertRaises(TypeError, combine, 1.0, 0, 0)
+            self.assertRaises(TypeError, combine, 0, 1.0, 0)
+            self.assertRaises(TypeError, combine, 0, 0, 1.0)
+            self.assertRaises(ValueError, combine, 0, 0, -1)
+
+
+class TestParallelSum(unittest.TestCase):
+    """ test parallel_sum(). """
+    def test_png_file_name(self):
+        """ test parallel_sum() using file name to png. """
+        for chunk_size in (1, 1000, 65521, 10 ** 8):
+            self.assertEqual(
+                'd5db66c6',
+                _to_str(rika.hashsum.parallel_sum(_PNG, 'crc32', chunk_size,
+                                                  workers=2))
+            )
+        self.assertEqual(
+            '6191cfb5',
+            _to_str(rika.hashsum.parallel_sum(_PNG, 'adler32', 1000, 2,
+                                              'process'))
+        )
+
+    def test_empty_file_name(self):
+        """ test parallel_sum() using file name to empty. """
+        self.assertEqual(
+            '00000000',
+            _to_str(rika.hashsum.parallel_sum(_EMPTY))
+        )
+        self.assertEqual(
+            '00000001',
+            _to_str(rika.hashsum.parallel_sum(_EMPTY, 'adler32'))
+        )
+
+    def test_wrong_arguments(self):
+        """ test parallel_sum() using wrong arguments. """
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.parallel_sum, _PNG, 'md5'
+        )
+        self.assertRaises(
+            OSError,
+            rika.hashsum.parallel_sum, _NOT_FOUND
+        )
+
+
+class TestMain(unittest.TestCase):
+    """ test main(). """
+    def test_print(self):
+        """ test main() printing sums. """
+        with rika.argv_hack(['hashsum', '-j', '2', _PNG, _EMPTY]):
+            with rika.PrintHack() as hack:
+                self.assertEqual(0, rika.hashsum.main())
+        self.assertEqual(
+            '515d56e5b2bb0ea82350bc42fca54149ca135815a1c7d3fedd8e44615a77d37a'
+            '  ' + _PNG + '\n'
+            'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+            '  ' + _EMPTY + '\n',
+            hack.get()
+        )
+
+    def test_print_tag(self):
+        """ test main() printing sums in BSD style. """
+        pattern = os.path.join('data', 'hashsum', '*')
+        with rika.argv_hack(['hashsum', '-a', 'crc32', '-a', 'md5', pattern]):
+            with rika.PrintHack() as hack:
+                self.assertEqual(0, rika.hashsum.main())
+        self.assertEqual(
+            'CRC32 (' + _EMPTY + ') = 00000000\n'
+            'MD5 (' + _EMPTY + ') = d41d8cd98f00b204e9800998ecf8427e\n'
+            'CRC32 (' + _PNG + ') = d5db66c6\n'
+            'MD5 (' + _PNG + ') = 3cf229eedc092549277e8859aad2fca5\n',
+            hack.get()
+        )
+
+    def test_nocache(self):
+        """ test main() with --nocache and --direct. """
+        with rika.argv_hack(['hashsum', '--nocache', '--direct', _PNG]):
+            with rika.PrintHack() as hack:
+                self.assertEqual(0, rika.hashsum.main())
+        self.assertEqual(
+            '515d56e5b2bb0ea82350bc42fca54149ca135815a1c7d3fedd8e44615a77d37a'
+            '  ' + _PNG + '\n',
+            hack.get()
+        )
+
+    def test_not_found(self):
+        """ test main() using file name to not found. """
+        with rika.argv_hack(['hashsum', _NOT_FOUND, _EMPTY]):
+            with rika.PrintHack() as hack:
+                self.assertEqual(1, rika.hashsum.main())
+        self.assertEqual(
+            'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855'
+            '  ' + _EMPTY + '\n',
+            hack.get()
+        )
+
+    def test_check(self):
+        """ test main() checking manifest. """
+        with rika.ScopedFile() as tmp:
+            tmp.write(
+                'd5db66c6  ' + _PNG + '\n'
+                'MD5 (' + _EMPTY + ') = d41d8cd98f00b204e9800998ecf8427e\n'
+            )
+            with rika.argv_hack(['hashsum', '-c', tmp.path]):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(0, rika.hashsum.main())
+            self.assertEqual(
+                _PNG + ': OK\n' + _EMPTY + ': OK\n',
+                hack.get()
+            )
+
+            # 8 hex digits are CRC32 unless algorithm is given
+            with rika.argv_hack(['hashsum', '-c', '-a', 'adler32', tmp.path]):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(1, rika.hashsum.main())
+            self.assertEqual(
+                _PNG + ': FAILED\n' + _EMPTY + ': OK\n',
+                hack.get()
+            )
+
+            tmp.write('0' * 64 + '  ' + _NOT_FOUND + '\nbroken line\n')
+            with rika.argv_hack(['hashsum', '-c', '-q', tmp.path]):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(1, rika.hashsum.main())
+            self.assertEqual(
+                _NOT_FOUND + ': FAILED open or read\n',
+                hack.get()
+            )
+
+    def test_check_ambiguous(self):
+        """ test main() checking output of b2sum and sha3sum. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        with rika.ScopedFile() as tmp:
+            tmp.write(
+                hashlib.blake2b(b).hexdigest() + '  ' + _PNG + '\n' +
+                hashlib.sha3_256(b).hexdigest() + '  ' + _PNG + '\n'
+            )
+            with rika.argv_hack(['hashsum', '-c', tmp.path]):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(0, rika.hashsum.main())
+            self.assertEqual(
+                _PNG + ': OK\n' + _PNG + ': OK\n',
+                hack.get()
+            )
+
+            # given algorithm is not guessed
+            with rika.argv_hack(['hashsum', '-c', '-a', 'sha512', tmp.path]):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(1, rika.hashsum.main())
+            self.assertEqual(
+                _PNG + ': FAILED\n' + _PNG + ': FAILED\n',
+                hack.get()
+            )
+
+    @unittest.skipIf(os.name == 'nt', 'file name cannot have backslash')
+    def test_escape(self):
+        """ test main() escaping file names like coreutils. """
+        empty = ('e3b0c44298fc1c149afbf4c8996fb924'
+                 '27ae41e4649b934ca495991b7852b855')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = [os.path.join(tmp_dir, i)
+                     for i in ('back\\slash', 'new\nline', 'plain')]
+            for path in paths:
+                open(path, 'wb').close()
+            with rika.argv_hack(['hashsum'] + paths):
+                with rika.PrintHack() as hack:
+                    self.assertEqual(0, rika.hashsum.main())
+            manifest = hack.get()
+            self.assertEqual(
+                '\\' + empty + '  ' + tmp_dir + '/back\\\\slash\n'
+                '\\' + empty + '  ' + tmp_dir + '/new\\nline\n' +
+                empty + '  ' + tmp_dir + '/plain\n',
+                manifest
+            )
+
+            with rika.ScopedFile() as tmp:
+                tmp.write(manifest)
+                with rika.argv_hack(['hashsum', '-c', tmp.path]):
+                    with rika.PrintHack() as hack:
+                        self.assertEqual(0, rika.hashsum.main())
+            self.assertEqual(
+                manifest.count('\n'),
+                hack.get().count(': OK\n')
+            )
+
+    def test_check_stdin(self):
+        """ test main() checking manifest piped into stdin. """
+        manifest = (
+            '515d56e5b2bb0ea82350bc42fca54149ca135815a1c7d3fedd8e44615a77d37a'
+            '  ' + _PNG + '\n'
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        for args in (['-c'], ['-c', '-']):
+            result = subprocess.run(
+                [sys.executable, '-m', 'rika.hashsum'] + args,
+                input=manifest, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, universal_newlines=True, env=env)
+            self.assertEqual(0, result.returncode, result.stderr)
+            self.assertEqual(_PNG + ': OK\n', result.stdout)
+
+
+class TestVerifyManifest(unittest.TestCase):
+    """ test verify_manifest(). """
+    _MANIFEST = (
+        '515d56e5b2bb0ea82350bc42fca54149ca135815a1c7d3fedd8e44615a77d37a'
+        '  python-logo-master-v3-TM.png\n'
+        '\n'
+        'MD5 (empty) = d41d8cd98f00b204e9800998ecf8427e\n'
+        'CRC32 (empty) = 00000001\n'
+        'd41d8cd98f00b204e9800998ecf8427e 0 notfound\n'
+        'd41d8cd98f00b204e9800998ecf8427e 100 empty\n'
+    )
+
+    def test_verify(self):
+        """ test verify_manifest() with all status. """
+        root_dir = os.path.join('data', 'hashsum')
+        with rika.ScopedFile() as tmp:
+            tmp.write(self._MANIFEST)
+            result = sorted(rika.hashsum.verify_manifest(tmp.path, root_dir,
+                                                         workers=2))
+        self.assertEqual(
+            [('empty', 'FAILED'), ('empty', 'OK'), ('empty', 'SIZE'),
+             ('notfound', 'MISSING'), ('python-logo-master-v3-TM.png', 'OK')],
+            result
+        )
+
+    def test_fail_fast(self):
+        """ test verify_manifest() stopping at the first failure. """
+        root_dir = os.path.join('data', 'hashsum')
+        with rika.ScopedFile() as tmp:
+            tmp.write(self._MANIFEST)
+            result = list(rika.hashsum.verify_manifest(
+                tmp.path, root_dir, fail_fast=True))
+        # stat failures are found before reading any file
+        self.assertEqual([('notfound', 'MISSING')], result)
+
+    def test_algorithm(self):
+        """ test verify_manifest() using algorithm for plain lines. """
+        with rika.ScopedFile() as tmp:
+            tmp.write('6191cfb5  ' + _PNG + '\n')
+            self.assertEqual(
+                [(_PNG, 'FAILED')],
+                list(rika.hashsum.verify_manifest(tmp.path,
+                                                  algorithm='crc32'))
+            )
+            self.assertEqual(
+                [(_PNG, 'OK')],
+                list(rika.hashsum.verify_manifest(tmp.path,
+                                                  algorithm='adler32'))
+            )
+
+    def test_ambiguous(self):
+        """ test verify_manifest() guessing from ambiguous length of hex. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        with rika.ScopedFile() as tmp:
+            # 8 hex digits are CRC32 or Adler-32
+            tmp.write('6191cfb5  ' + _PNG + '\n')
+            self.assertEqual(
+                [(_PNG, 'OK')],
+                list(rika.hashsum.verify_manifest(tmp.path))
+            )
+            # 128 hex digits are SHA-512, BLAKE2b, SHA3-512 or SHAKE256
+            tmp.write(hashlib.blake2b(b).hexdigest() + '  ' + _PNG + '\n' +
+                      '0' * 128 + '  ' + _PNG + '\n')
+            self.assertEqual(
+                [(_PNG, 'OK'), (_PNG, 'FAILED')],
+                list(rika.hashsum.verify_manifest(tmp.path, workers=1))
+            )
+
+    def test_wrong_manifest(self):
+        """ test verify_manifest() using wrong manifest. """
+        self.assertRaises(
+            OSError,
+            list, rika.hashsum.verify_manifest(_NOT_FOUND)
+        )
+        with rika.ScopedFile() as tmp:
+            tmp.write('broken line\n')
+            self.assertRaises(
+                ValueError,
+                list, rika.hashsum.verify_manifest(tmp.path)
+            )
+            self.assertRaises(
+                LookupError,
+                list, rika.hashsum.verify_manifest(tmp.path, algorithm='md4')
+            )
+
+
+class TestFindDuplicates(unittest.TestCase):
+    """ test find_duplicates(). """
+    def test_tree(self):
+        """ test find_duplicates() using test data tree. """
+        groups, stats = rika.hashsum.find_duplicates(_TREE, workers=2)
+        # all text files are empty
+        self.assertEqual(
+            [sorted(rika.my_glob(_TREE, recursive=True))],
+            groups
+        )
+        self.assertEqual(0, stats['bytes_read'])
+        self.assertEqual(0, stats['bytes_total'])
+
+        groups, stats = rika.hashsum.find_duplicates(_TREE, '*.log', False)
+        self.assertEqual([], groups)
+        self.assertEqual(1, stats['files'])
+        self.assertEqual(0, stats['size_candidates'])
+
+    def test_stages(self):
+        """ test find_duplicates() rejecting files at each stage. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        contents = {
+            'a.png': b,
+            'b.png': b,
+            'c.png': b[:-1] + b'\0',  # differs at the tail
+            'd.png': b[:5000] + b'\0' + b[5001:],  # differs in the middle
+            'e.png': b + b'\0',  # differs in size
+            'f.txt': b'abc',
+            'g.txt': b'abc',
+            'h.txt': b'abd',
+        }
+        root_dir = tempfile.mkdtemp()
+        try:
+            for name, data in contents.items():
+                with open(os.path.join(root_dir, name), 'wb') as file:
+                    file.write(data)
+            groups, stats = rika.hashsum.find_duplicates(root_dir,
+                                                         edge_size=100)
+        finally:
+            shutil.rmtree(root_dir)
+        self.assertEqual(
+            [[os.path.join(root_dir, 'a.png'),
+              os.path.join(root_dir, 'b.png')],
+             [os.path.join(root_dir, 'f.txt'),
+              os.path.join(root_dir, 'g.txt')]],
+            groups
+        )
+        self.assertEqual(8, stats['files'])
+        self.assertEqual(7, stats['size_candidates'])
+        self.assertEqual(6, stats['partial_candidates'])
+        self.assertEqual(len(b) * 5 + 1 + 9, stats['bytes_total'])
+        # stage 2 reads 200 bytes of 4 png, stage 3 reads 3 png and 3 txt
+        self.assertEqual(200 * 4 + len(b) * 3 + 9, stats['bytes_read'])
+
+    def test_wrong_arguments(self):
+        """ test find_duplicates() using wrong arguments. """
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.find_duplicates, _TREE, edge_size=0
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.find_duplicates, _TREE, algorithm='md4'
+        )
+
+
+class TestCalculate(unittest.TestCase):
+    """ test calculate(), algorithms(), and register(). """
+    def test_hashlib(self):
+        """ test calculate() of BLAKE2, SHA-3 and SHAKE with hashlib. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        for name in ('blake2b', 'blake2s', 'sha3_224', 'sha3_256',
+                     'sha3_384', 'sha3_512'):
+            digest = hashlib.new(name, b).digest()
+            required = (int.from_bytes(digest, 'big'), len(digest))
+            self.assertEqual(required, rika.hashsum.calculate(_PNG, name))
+            self.assertEqual(required, rika.hashsum.calculate(b, name, 1000))
+        for name, size in (('shake_128', 32), ('shake_256', 64)):
+            digest = hashlib.new(name, b).digest(size)
+            required = (int.from_bytes(digest, 'big'), size)
+            self.assertEqual(required, rika.hashsum.calculate(_PNG, name))
+            hasher = rika.hashsum.new(name)
+            hasher.update(b[:1000])
+            other = hasher.copy()
+            other.update(b[1000:])
+            self.assertEqual(required, other.value())
+            self.assertEqual(digest.hex(), other.hexdigest())
+
+    def test_same_as_functions(self):
+        """ test calculate() is same as each function. """
+        for name in ('adler32', 'crc32', 'md5', 'sha1', 'sha224', 'sha256',
+                     'sha384', 'sha512'):
+            self.assertEqual(
+                getattr(rika.hashsum, name)(_PNG),
+                rika.hashsum.calculate(_PNG, name)
+            )
+
+    def test_xxh64(self):
+        """ test xxh64 and its pure python version with known values. """
+        data = bytes(range(256)) * 4
+        for factory in (rika.hashsum._XXH64,
+                        lambda: rika.hashsum._new('xxh64')):
+            for b, required in ((b'', 0xef46db3751d8e999),
+                                (b'a', 0xd24ec4f1a98c6e5b),
+                                (b'abc', 0x44bc2cf5ad770999)):
+                hasher = factory()
+                hasher.update(b)
+                self.assertEqual(required.to_bytes(8, 'big'), hasher.digest())
+            whole = factory()
+            whole.update(data)
+            pieces = factory()
+            for i in range(0, len(data), 7):
+                pieces.update(data[i:i + 7])
+            self.assertEqual(whole.digest(), pieces.digest())
+            self.assertEqual(whole.digest(), pieces.copy().digest())
+        self.assertEqual('xxh64', rika.hashsum.new('xxh64').name)
+        self.assertEqual(8, rika.hashsum.calculate(_EMPTY, 'xxh64')[1])
+
+    def test_algorithms(self):
+        """ test algorithms() is sorted and usable. """
+        names = rika.hashsum.algorithms()
+        self.assertEqual(sorted(names), names)
+        for name in ('adler32', 'sha512', 'blake2b', 'sha3_256', 'xxh64'):
+            self.assertIn(name, names)
+        for name in names:
+            self.assertEqual(name, rika.hashsum.new(name).name)
+
+    def test_register(self):
+        """ test register() adds and replaces algorithm. """
+        try:
+            rika.hashsum.register('test_md5', hashlib.md5)
+            self.assertIn('test_md5', rika.hashsum.algorithms())
+            self.assertEqual(
+                rika.hashsum.md5(_PNG),
+                rika.hashsum.calculate(_PNG, 'test_md5')
+            )
+            self.assertEqual(
+                {'test_md5': rika.hashsum.md5(b'abc')},
+                rika.hashsum.multi(b'abc', ['test_md5'])
+            )
+            self.assertRaises(
+                ValueError,
+                rika.hashsum.register, 'test_md5', hashlib.sha1
+            )
+            rika.hashsum.register('test_md5', hashlib.sha1, replace=True)
+            self.assertEqual(
+                rika.hashsum.sha1(b'abc'),
+                rika.hashsum.calculate(b'abc', 'test_md5')
+            )
+        finally:
+            rika.hashsum._FACTORIES.pop('test_md5', None)
+
+    def test_wrong_arguments(self):
+        """ test calculate() and register() using wrong arguments. """
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.calculate, _PNG, 'md4'
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.calculate, _PNG, None
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.register, b'name', hashlib.md5
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.register, 'name', 'md5'
+        )
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.register, 'md5', hashlib.md5
+        )
+
+
+class TestBatch(unittest.TestCase):
+    """ test batch(). """
+    def test_batch(self):
+        """ test batch() is same as calculate() of each buffer. """
+        with open(_PNG, 'rb') as file:
+            b = file.read()
+        buffers = [b'', b'abc', b, bytearray(b'xyz'), memoryview(b)[10:20]]
+        for name in rika.hashsum.algorithms():
+            required = [rika.hashsum.calculate(i, name)[0] for i in buffers]
+            result = rika.hashsum.batch(name, buffers)
+            self.assertEqual(required, list(result))
+            if name in ('adler32', 'crc32'):
+                self.assertIsInstance(result, array.array)
+                self.assertEqual('L', result.typecode)
+            else:
+                self.assertIsInstance(result, list)
+
+    def test_iterable(self):
+        """ test batch() using generator and empty iterable. """
+        self.assertEqual(
+            [rika.hashsum.md5(bytes([i]))[0] for i in range(10)],
+            rika.hashsum.batch('md5', (bytes([i]) for i in range(10)))
+        )
+        self.assertEqual([], rika.hashsum.batch('sha1', []))
+        self.assertEqual(array.array('L'), rika.hashsum.batch('crc32', []))
+
+    def test_wrong_arguments(self):
+        """ test batch() using wrong arguments. """
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.batch, 'md4', [b'']
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.batch, b'md5', [b'']
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.batch, 'crc32', ['abc']
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.batch, 'md5', ['abc']
+        )
+
+
+class TestCopyAndHash(unittest.TestCase):
+    """ test copy_and_hash(). """
+    def setUp(self):
+        """ create temporary directory. """
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """ remove temporary directory. """
+        shutil.rmtree(self.tmp)
+
+    def test_copy(self):
+        """ test copy_and_hash() copies file and returns multi(). """
+        for src, block_size in ((_PNG, 1000), (_PNG, 1 << 20), (_EMPTY, 1)):
+            dst = os.path.join(self.tmp, 'copy')
+            result = rika.hashsum.copy_and_hash(src, dst, ['crc32', 'md5'],
+                                                block_size)
+            self.assertEqual(rika.hashsum.multi(src, ['crc32', 'md5']),
+                             result)
+            with open(src, 'rb') as a, open(dst, 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+    def test_overwrite(self):
+        """ test copy_and_hash() overwrites dst using pathlib. """
+        dst = pathlib.Path(self.tmp) / 'copy'
+        dst.write_bytes(b'x' * 100000)
+        result = rika.hashsum.copy_and_hash(pathlib.Path(_EMPTY), dst,
+                                            ['sha256'])
+        self.assertEqual({'sha256': rika.hashsum.sha256(b'')}, result)
+        self.assertEqual(b'', dst.read_bytes())
+
+    def test_errors(self):
+        """ test copy_and_hash() using wrong arguments. """
+        dst = os.path.join(self.tmp, 'copy')
+        self.assertRaises(
+            OSError,
+            rika.hashsum.copy_and_hash, _NOT_FOUND, dst, ['md5']
+        )
+        self.assertFalse(os.path.exists(dst))
+        self.assertRaises(
+            shutil.SameFileError,
+            rika.hashsum.copy_and_hash, _PNG, _PNG, ['md5']
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.copy_and_hash, _PNG, dst, 'md5'
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.copy_and_hash, b'data', dst, ['md5']
+        )
+        self.assertRaises(
+            LookupError,
+            rika.hashsum.copy_and_hash, _PNG, dst, ['md4']
+        )
+
+
+class TestRollingAdler32(unittest.TestCase):
+    """ test RollingAdler32 and rolling_adler32(). """
+    def setUp(self):
+        """ read test data. """
+        with open(_PNG, 'rb') as file:
+            self.data = file.read()
+
+    def test_roll(self):
+        """ test roll() is same as zlib.adler32() of each window. """
+        for window in (1, 16, 1000):
+            rolling = rika.hashsum.RollingAdler32(self.data[:window])
+            self.assertEqual(window, rolling.window)
+            self.assertEqual(zlib.adler32(self.data[:window]),
+                             rolling.checksum)
+            for i in range(2000):
+                checksum = rolling.roll(self.data[i],
+                                        self.data[i + window])
+                self.assertEqual(
+                    zlib.adler32(self.data[i + 1:i + 1 + window]),
+                    checksum
+                )
+            self.assertEqual(checksum, rolling.checksum)
+
+    def test_rolling_adler32(self):
+        """ test rolling_adler32() with and without numpy. """
+        numpy = rika.hashsum._numpy
+        data = self.data[:5000]
+        try:
+            for module in (numpy, None):
+                rika.hashsum._numpy = module
+                for window in (1, 64, 5000):
+                    required = [zlib.adler32(data[i:i + window])
+                                for i in range(len(data) - window + 1)]
+                    result = rika.hashsum.rolling_adler32(data, window)
+                    self.assertEqual('L', result.typecode)
+                    self.assertEqual(required, list(result))
+                self.assertEqual(
+                    [], list(rika.hashsum.rolling_adler32(data, 5001)))
+        finally:
+            rika.hashsum._numpy = numpy
+
+    def test_wrong_arguments(self):
+        """ test wrong arguments. """
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.RollingAdler32, b''
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.RollingAdler32, 'abc'
+        )
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.rolling_adler32, b'abc', 0
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.rolling_adler32, 'abc', 1
+        )
+
+
+class TestCdcChunks(unittest.TestCase):
+    """ test cdc_chunks(). """
+    def setUp(self):
+        """ create random data. """
+        self.data = random.Random(1).getrandbits(8 * 300000).to_bytes(
+            300000, 'little')
+
+    def check_chunks(self, chunks, data, min_size, max_size, algorithm):
+        """ check chunks cover data and have correct values. """
+        offset = 0
+        for i, (start, length, value, size) in enumerate(chunks):
+            self.assertEqual(offset, start)
+            self.assertLessEqual(length, max_size)
+            if i != len(chunks) - 1:
+                self.assertGreaterEqual(length, min_size)
+            self.assertEqual(
+                rika.hashsum.calculate(data[start:start + length],
+                                       algorithm),
+                (value, size)
+            )
+            offset += length
+        self.assertEqual(len(data), offset)
+
+    def test_chunks(self):
+        """ test chunks of bytes, file object and file path. """
+        chunks = list(rika.hashsum.cdc_chunks(self.data))
+        self.assertGreater(len(chunks), 10)
+        self.check_chunks(chunks, self.data, rika.hashsum.CDC_MIN_SIZE,
+                          rika.hashsum.CDC_MAX_SIZE, 'sha256')
+        self.assertEqual(
+            chunks,
+            list(rika.hashsum.cdc_chunks(io.BytesIO(self.data),
+                                         block_size=1000))
+        )
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'data')
+            with open(path, 'wb') as file:
+                file.write(self.data)
+            self.assertEqual(chunks,
+                             list(rika.hashsum.cdc_chunks(path,
+                                                          block_size=7777)))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_sizes(self):
+        """ test min_size, avg_size, max_size and algorithm. """
+        chunks = list(rika.hashsum.cdc_chunks(self.data, 'crc32', 100, 256,
+                                              1000))
+        self.check_chunks(chunks, self.data, 100, 1000, 'crc32')
+        self.assertLess(len(self.data) / len(chunks), 1000)
+        self.assertEqual([], list(rika.hashsum.cdc_chunks(b'')))
+        self.assertEqual(
+            [(0, 3) + rika.hashsum.md5(b'abc')],
+            list(rika.hashsum.cdc_chunks(b'abc', 'md5'))
+        )
+
+    def test_without_numpy(self):
+        """ test pure python gear hash gives same chunks. """
+        numpy = rika.hashsum._numpy
+        data = self.data[:50000]
+        required = list(rika.hashsum.cdc_chunks(data, 'md5', 64, 512, 4096,
+                                                3000))
+        try:
+            rika.hashsum._numpy = None
+            self.assertEqual(
+                required,
+                list(rika.hashsum.cdc_chunks(data, 'md5', 64, 512, 4096,
+                                             3000))
+            )
+        finally:
+            rika.hashsum._numpy = numpy
+
+    def test_shift(self):
+        """ test inserted bytes change only chunks near them. """
+        chunks = rika.hashsum.cdc_chunks(self.data)
+        shifted = rika.hashsum.cdc_chunks(self.data[:100000] + b'insert' +
+                                          self.data[100000:])
+        values = {i[2] for i in chunks}
+        shifted_values = {i[2] for i in shifted}
+        self.assertLessEqual(len(values - shifted_values), 2)
+
+    def test_wrong_arguments(self):
+        """ test cdc_chunks() using wrong arguments. """
+        for args in ((0, 16, 16), (100, 50, 1000), (10, 100, 50),
+                     (1, 8, 8)):
+            self.assertRaises(
+                ValueError,
+                list, rika.hashsum.cdc_chunks(b'abc', 'md5', *args)
+            )
+        self.assertRaises(
+            TypeError,
+            list, rika.hashsum.cdc_chunks(1.0)
+        )
+        self.assertRaises(
+            LookupError,
+            list, rika.hashsum.cdc_chunks(b'abc', 'md4')
+        )
+        self.assertRaises(
+            OSError,
+            list, rika.hashsum.cdc_chunks(_NOT_FOUND)
+        )
+
+
+class TestObserver(unittest.TestCase):
+    """ test Observer and observer argument. """
+    def test_progress(self):
+        """ test progress of file path and byte data. """
+        progress = []
+        observer = rika.hashsum.Observer(progress.append, interval=0)
+        size = os.path.getsize(_PNG)
+        self.assertEqual(
+            rika.hashsum.sha256(_PNG),
+            rika.hashsum.sha256(_PNG, 1000, observer=observer)
+        )
+        self.assertEqual((size + 999) // 1000 + 1, len(progress))
+        self.assertEqual([1000, 2000],
+                         [i.bytes for i in progress[:2]])
+        last = progress[-1]
+        self.assertEqual(('sha256',), last.algorithms)
+        self.assertEqual((size, size, True),
+                         (last.bytes, last.total, last.done))
+        self.assertFalse(any(i.done for i in progress[:-1]))
+        self.assertGreaterEqual(last.seconds, 0)
+
+        del progress[:]
+        rika.hashsum.multi(b'abc', ['md5', 'crc32'], observer=observer)
+        self.assertEqual(2, len(progress))
+        self.assertEqual((('md5', 'crc32'), 3, 3, True),
+                         progress[-1][:3] + (progress[-1].done,))
+
+    def test_interval(self):
+        """ test large interval reports only the last progress. """
+        progress = []
+        observer = rika.hashsum.Observer(progress.append, interval=3600)
+        with open(_PNG, 'rb') as file:
+            rika.hashsum.crc32(file, 100, observer=observer)
+        self.assertEqual(1, len(progress))
+        self.assertIsNone(progress[0].total)
+        self.assertTrue(progress[0].done)
+
+    def test_stats(self):
+        """ test counters of functions, hash_tree() and copy_and_hash(). """
+        observer = rika.hashsum.Observer()
+        size = os.path.getsize(_PNG)
+        rika.hashsum.md5(_PNG, observer=observer)
+        rika.hashsum.calculate(_EMPTY, 'md5', observer=observer)
+        rika.hashsum.multi(memoryview(b'abcd'), ['md5', 'sha1'],
+                           observer=observer)
+        stats = observer.stats()
+        self.assertEqual({'md5', 'sha1'}, set(stats))
+        self.assertEqual((3, size + 4),
+                         (stats['md5']['files'], stats['md5']['bytes']))
+        self.assertEqual((1, 4),
+                         (stats['sha1']['files'], stats['sha1']['bytes']))
+        self.assertEqual(
+            {'files', 'bytes', 'seconds', 'bytes_per_second'},
+            set(stats['md5'])
+        )
+
+        observer.reset()
+        self.assertEqual({}, observer.stats())
+        results = list(rika.hashsum.hash_tree(_TREE, algorithm='crc32',
+                                              workers=2, observer=observer))
+        self.assertEqual(len(results), observer.stats()['crc32']['files'])
+        self.assertEqual(sum(os.path.getsize(i[0]) for i in results),
+                         observer.stats()['crc32']['bytes'])
+
+        observer.reset()
+        tmp = tempfile.mkdtemp()
+        try:
+            rika.hashsum.copy_and_hash(_PNG, os.path.join(tmp, 'copy'),
+                                       ['sha256'], observer=observer)
+        finally:
+            shutil.rmtree(tmp)
+        self.assertEqual(size, observer.stats()['sha256']['bytes'])
+
+    def test_subclass(self):
+        """ test on_progress() can be overridden. """
+        class Counter(rika.hashsum.Observer):
+            """ count reports. """
+            count = 0
+
+            def on_progress(self, progress):
+                """ count. """
+                Counter.count += 1
+        rika.hashsum.adler32(b'abc', observer=Counter())
+        self.assertEqual(1, Counter.count)
+
+    def test_wrong_arguments(self):
+        """ test wrong arguments. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.Observer, 'print'
+        )
+        self.assertRaises(
+            ValueError,
+            rika.hashsum.Observer, None, -1
+        )
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.sha1, b'abc', observer=print
+        )
+        self.assertRaises(
+            ValueError,
+            list, rika.hashsum.hash_tree(_TREE, executor='process',
+                                         observer=rika.hashsum.Observer())
+        )
+
+
+class TestIOHints(unittest.TestCase):
+    """ test hints argument and IOHints. """
+    def test_hints(self):
+        """ test all hints give same values. """
+        for hints in (rika.hashsum.BULK_HINTS,
+                      rika.hashsum.IOHints(readahead=4096),
+                      rika.hashsum.IOHints(False, False, True),
+                      rika.hashsum.IOHints(direct=True, readahead=1000)):
+            for path in (_PNG, _EMPTY):
+                for block_size in (1, 1000, rika.hashsum.DEFAULT_BLOCK_SIZE):
+                    self.assertEqual(
+                        rika.hashsum.sha1(path),
+                        rika.hashsum.sha1(path, block_size, hints=hints)
+                    )
+            self.assertEqual(
+                rika.hashsum.multi(_PNG, ['md5', 'crc32']),
+                rika.hashsum.multi(_PNG, ['md5', 'crc32'], hints=hints)
+            )
+            self.assertEqual(
+                rika.hashsum.adler32(b'abc'),
+                rika.hashsum.calculate(b'abc', 'adler32', hints=hints)
+            )
+
+    def test_direct_refused_at_reading(self):
+        """ test falling back when O_DIRECT is refused by readinto(). """
+        class RefusingFile(io.FileIO):
+            """ file whose first readinto() fails like O_DIRECT. """
+            refused = False
+
+            def readinto(self, buffer):
+                """ raise EINVAL at the first call. """
+                if not self.refused:
+                    self.refused = True
+                    raise OSError(errno.EINVAL, 'Invalid argument')
+                return super().readinto(buffer)
+
+        open_hinted = rika.hashsum._open_hinted
+        rika.hashsum._open_hinted = lambda path, hints: (
+            RefusingFile(path), True)
+        try:
+            self.assertEqual(
+                rika.hashsum.sha1(_PNG),
+                rika.hashsum.sha1(_PNG, 1000,
+                                  hints=rika.hashsum.IOHints(direct=True))
+            )
+        finally:
+            rika.hashsum._open_hinted = open_hinted
+
+    def test_defaults(self):
+        """ test default of IOHints. """
+        self.assertEqual((True, True, False, 0), rika.hashsum.BULK_HINTS)
+        self.assertEqual(rika.hashsum.IOHints(), rika.hashsum.BULK_HINTS)
+
+    def test_hash_tree_and_verify(self):
+        """ test hints of hash_tree() and verify_manifest(). """
+        self.assertEqual(
+            sorted(rika.hashsum.hash_tree(_TREE, algorithm='md5')),
+            sorted(rika.hashsum.hash_tree(_TREE, algorithm='md5',
+                                          hints=rika.hashsum.BULK_HINTS))
+        )
+        tmp = tempfile.mkdtemp()
+        try:
+            manifest = os.path.join(tmp, 'SUMS')
+            with open(manifest, 'w') as file:
+                file.write('{0:064x}  {1}\n'.format(
+                    rika.hashsum.sha256(_PNG)[0], os.path.abspath(_PNG)))
+            self.assertEqual(
+                [(os.path.abspath(_PNG), 'OK')],
+                list(rika.hashsum.verify_manifest(
+                    manifest, hints=rika.hashsum.BULK_HINTS))
+            )
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_wrong_arguments(self):
+        """ test wrong hints and not found. """
+        self.assertRaises(
+            TypeError,
+            rika.hashsum.md5, _PNG, hints=(True, True, False, 0)
+        )
+        self.assertRaises(
+            OSError,
+            rika.hashsum.md5, _NOT_FOUND, hints=rika.hashsum.BULK_HINTS
+        )
+        self.assertRaises(
+            OSError,
+            rika.hashsum.md5, _NOT_FOUND,
+            hints=rika.hashsum.IOHints(direct=True)
+        )
+
+
 if __name__ == '__main__':
+    suite = unittest.TestSuite()
+    suite.addTest(doctest.DocTestSuite(rika.hashsum))
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
     unittest.main()
@@ -0,0 +1,443 @@
+# -*- coding:utf-8 -*-
+""" unit test of html_image.
+
+Here testing create_table() (including colspan and rowspan),
+create_canvas() (including payload), write_table() and write_canvas() in
+rika.html_image.py
+numpy array is tested only if NumPy is installed, and PIL image is tested
+only if Pillow is installed.
+"""
+
+import unittest
+import base64
+import io
+import os.path
+import sys
+import tempfile
+import zlib
+_SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(os.path.join(_SCRIPT_DIR, '..', '..'))
+import rika.html_image
+try:
+    import PIL.Image
+except ImportError:  # tests using PIL image are skipped
+    PIL = None
+
+__author__ = 'suomesta'
+__version__ = '1.0.0'
+
+_RGBA = [(0, 1, 2, 3), (9, 10, 99, 100), (254, 255, 128, 0),
+         (7, 70, 200, 255), (1, 2, 3, 4), (5, 6, 7, 8)]
+
+
+def _payload(text):
+    """ extract and decode base64 payload of canvas string. """
+    start = text.index(';base64,') + len(';base64,')
+    return base64.b64decode(text[start:text.index('"', start)])
+
+
+def _pixels(text):
+    """ extract pixels part of canvas string. """
+    start = text.index('let tmp = [') + len('let tmp = [')
+    return text[start:text.index('];', start)]
+
+
+class TestCreateTable(unittest.TestCase):
+    """ test create_table(). """
+    def test_create_table(self):
+        """ test create_table() of 2 x 2. """
+        self.assertEqual(
+            '<table border=0 cellpadding=0 cellspacing=0 width=2 height=2>'
+            '<tr height=1><td width=1 bgcolor=#000102></td>'
+            '<td width=1 bgcolor=#090a63></td></tr>'
+            '<tr height=1><td bgcolor=#feff80></td>'
+            '<td bgcolor=#0746c8></td></tr>'
+            '</table>',
+            ''.join(rika.html_image.create_table(2, 2, _RGBA[:4]))
+        )
+
+
+class _Sequence(object):
+    """ sequence which counts access of items, like PIL getdata(). """
+    def __init__(self, items):
+        """ initialize with items. """
+        self.items = items
+        self.count = 0
+
+    def __getitem__(self, index):
+        """ return item and count access. """
+        self.count += 1
+        return self.items[index]
+
+
+class TestRows(unittest.TestCase):
+    """ test create_table() reads rows in linear time. """
+    def test_single_pass(self):
+        """ test each pixel of sequence is read only once. """
+        rgb = [(i % 256, 0, 0) for i in range(4 * 50)]
+        for colspan in (False, True):
+            sequence = _Sequence(rgb)
+            self.assertEqual(
+                ''.join(rika.html_image.create_table(4, 50, rgb, colspan)),
+                ''.join(rika.html_image.create_table(4, 50, sequence,
+                                                     colspan))
+            )
+            self.assertEqual(4 * 50, sequence.count)
+        self.assertEqual(
+            ''.join(rika.html_image.create_table(4, 50, rgb)),
+            ''.join(rika.html_image.create_table(4, 50, iter(rgb)))
+        )
+
+    def test_bytes(self):
+        """ test raw RGB and RGBA bytes give same string as list. """
+        required = ''.join(rika.html_image.create_table(3, 2, _RGBA, True))
+        for channels in (3, 4):
+            data = bytes(v for p in _RGBA for v in p[:channels])
+            self.assertEqual(
+                required,
+                ''.join(rika.html_image.create_table(3, 2, data, True))
+            )
+        self.assertRaises(
+            ValueError,
+            ''.join, rika.html_image.create_table(3, 2, bytes(10))
+        )
+
+    @unittest.skipIf(rika.html_image._numpy is None, 'NumPy is required')
+    def test_numpy(self):
+        """ test numpy array gives same string as list. """
+        numpy = rika.html_image._numpy
+        rgba = numpy.array(_RGBA, dtype=numpy.uint8).reshape(2, 3, 4)
+        self.assertEqual(
+            ''.join(rika.html_image.create_table(3, 2, _RGBA)),
+            ''.join(rika.html_image.create_table(3, 2, rgba))
+        )
+
+
+class TestSpan(unittest.TestCase):
+    """ test colspan and rowspan of create_table(). """
+    _A, _B = (1, 2, 3), (4, 5, 6)
+
+    def test_colspan(self):
+        """ test horizontal runs are merged except the first row. """
+        a, b = self._A, self._B
+        self.assertEqual(
+            '<table border=0 cellpadding=0 cellspacing=0 width=3 height=2>'
+            '<tr height=1><td width=1 bgcolor=#010203></td>'
+            '<td width=1 bgcolor=#010203></td>'
+            '<td width=1 bgcolor=#040506></td></tr>'
+            '<tr height=1><td bgcolor=#040506></td>'
+            '<td colspan=2 bgcolor=#010203></td></tr>'
+            '</table>',
+            ''.join(rika.html_image.create_table(3, 2, [a, a, b, b, a, a],
+                                                 colspan=True))
+        )
+
+    def test_rowspan(self):
+        """ test vertical runs are merged with and without colspan. """
+        a, b = self._A, self._B
+        rgb = [a, b, b,
+               a, b, b,
+               a, b, b,
+               b, b, b]
+        self.assertEqual(
+            '<tr height=1><td rowspan=2 bgcolor=#010203></td>'
+            '<td colspan=2 rowspan=2 bgcolor=#040506></td></tr>'
+            '<tr height=1></tr>'
+            '<tr height=1><td colspan=3 bgcolor=#040506></td></tr>',
+            ''.join(rika.html_image.create_table(
+                3, 4, rgb, colspan=True, rowspan=True)).split('</tr>', 1)[1]
+            [:-len('</table>')]
+        )
+        self.assertEqual(
+            '<tr height=1><td rowspan=2 bgcolor=#010203></td>'
+            '<td rowspan=3 bgcolor=#040506></td>'
+            '<td rowspan=3 bgcolor=#040506></td></tr>'
+            '<tr height=1></tr>'
+            '<tr height=1><td bgcolor=#040506></td></tr>',
+            ''.join(rika.html_image.create_table(
+                3, 4, rgb, rowspan=True)).split('</tr>', 1)[1]
+            [:-len('</table>')]
+        )
+
+    def test_same_as_plain(self):
+        """ test merged table has same first row as plain table. """
+        plain = ''.join(rika.html_image.create_table(3, 2, _RGBA))
+        merged = ''.join(rika.html_image.create_table(3, 2, _RGBA, True,
+                                                      True))
+        self.assertEqual(plain, merged)
+        self.assertEqual(
+            '<table border=0 cellpadding=0 cellspacing=0 width=0 height=0>'
+            '</table>',
+            ''.join(rika.html_image.create_table(0, 0, [], True, True))
+        )
+
+
+class TestCreateCanvas(unittest.TestCase):
+    """ test create_canvas(). """
+    def test_list(self):
+        """ test create_canvas() using list of tuple. """
+        text = ''.join(rika.html_image.create_canvas('cid', 3, 2, _RGBA,
+                                                     True))
+        self.assertTrue(text.startswith(
+            '<canvas id="cid" width="3" height="2"></canvas>'))
+        self.assertEqual(
+            '0,1,2,3,9,10,99,100,254,255,128,0,7,70,200,255,1,2,3,4,5,6,7,8',
+            _pixels(text)
+        )
+        text = ''.join(rika.html_image.create_canvas('cid', 3, 2, _RGBA,
+                                                     False))
+        self.assertEqual(
+            '0,1,2,255,9,10,99,255,254,255,128,255,7,70,200,255,1,2,3,255,'
+            '5,6,7,255',
+            _pixels(text)
+        )
+
+    @unittest.skipIf(rika.html_image._numpy is None, 'NumPy is required')
+    def test_numpy(self):
+        """ test numpy array gives same string as list. """
+        numpy = rika.html_image._numpy
+        rgba = numpy.array(_RGBA, dtype=numpy.uint8).reshape(2, 3, 4)
+        for has_alpha in (True, False):
+            self.assertEqual(
+                ''.join(rika.html_image.create_canvas('c', 3, 2, _RGBA,
+                                                      has_alpha)),
+                ''.join(rika.html_image.create_canvas('c', 3, 2, rgba,
+                                                      has_alpha))
+            )
+        self.assertEqual(
+            ''.join(rika.html_image.create_canvas(
+                'c', 3, 2, [i[:3] for i in _RGBA], False)),
+            ''.join(rika.html_image.create_canvas('c', 3, 2, rgba[:, :, :3],
+                                                  False))
+        )
+
+    @unittest.skipIf(rika.html_image._numpy is None, 'NumPy is required')
+    def test_numpy_pieces(self):
+        """ test numpy array larger than ENCODE_PIXELS, and all values. """
+        numpy = rika.html_image._numpy
+        rgba = numpy.arange(256 * 9, dtype=numpy.uint32).astype(numpy.uint8)
+        rgba = rgba.reshape(-1, 4)
+        pixels = [tuple(i) for i in rgba.tolist()]
+        encode_pixels = rika.html_image.ENCODE_PIXELS
+        try:
+            for rika.html_image.ENCODE_PIXELS in (7, 576, 1000):
+                self.assertEqual(
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 1, len(pixels), pixels, True)),
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 1, len(pixels), rgba, True))
+                )
+        finally:
+            rika.html_image.ENCODE_PIXELS = encode_pixels
+        self.assertEqual(
+            '', _pixels(''.join(rika.html_image.create_canvas(
+                'c', 0, 0, rgba[:0], True)))
+        )
+
+    @unittest.skipIf(rika.html_image._numpy is None, 'NumPy is required')
+    def test_wrong_shape(self):
+        """ test numpy array of wrong shape. """
+        numpy = rika.html_image._numpy
+        for rgba, has_alpha in ((numpy.zeros((2, 2, 2), numpy.uint8), False),
+                                (numpy.zeros((2, 2, 3), numpy.uint8), True),
+                                (numpy.zeros(4, numpy.uint8), False)):
+            self.assertRaises(
+                ValueError,
+                ''.join, rika.html_image.create_canvas('c', 2, 2, rgba,
+                                                       has_alpha)
+            )
+
+
+class TestPayload(unittest.TestCase):
+    """ test payload of create_canvas(). """
+    def test_base64(self):
+        """ test base64 payload is raw RGBA. """
+        for has_alpha in (True, False):
+            required = bytes(v for p in _RGBA
+                             for v in p[:3] + (p[3] if has_alpha else 255,))
+            text = ''.join(rika.html_image.create_canvas(
+                'cid', 3, 2, _RGBA, has_alpha, 'base64'))
+            self.assertTrue(text.startswith(
+                '<canvas id="cid" width="3" height="2"></canvas>'))
+            self.assertEqual(required, _payload(text))
+            text = ''.join(rika.html_image.create_canvas(
+                'cid', 3, 2, _RGBA, has_alpha, 'deflate'))
+            self.assertIn('DecompressionStream("deflate")', text)
+            self.assertEqual(required, zlib.decompress(_payload(text)))
+
+    def test_bytes(self):
+        """ test raw RGBA bytes is allowed for all payloads. """
+        rgba = bytes(v for p in _RGBA for v in p)
+        for payload in rika.html_image.PAYLOADS:
+            for has_alpha in (True, False):
+                self.assertEqual(
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 3, 2, _RGBA, has_alpha, payload)),
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 3, 2, rgba, has_alpha, payload))
+                )
+
+    @unittest.skipIf(rika.html_image._numpy is None, 'NumPy is required')
+    def test_numpy(self):
+        """ test numpy array gives same payload as list. """
+        numpy = rika.html_image._numpy
+        rgba = numpy.array(_RGBA, dtype=numpy.uint8).reshape(2, 3, 4)
+        for has_alpha in (True, False):
+            self.assertEqual(
+                ''.join(rika.html_image.create_canvas(
+                    'c', 3, 2, _RGBA, has_alpha, 'base64')),
+                ''.join(rika.html_image.create_canvas(
+                    'c', 3, 2, rgba, has_alpha, 'base64'))
+            )
+
+    def test_wrong_payload(self):
+        """ test unknown payload. """
+        self.assertRaises(
+            ValueError,
+            ''.join, rika.html_image.create_canvas('c', 3, 2, _RGBA, True,
+                                                   'gzip')
+        )
+
+
+class _Writer(object):
+    """ binary writer which writes at most 5 bytes at once. """
+    def __init__(self):
+        """ initialize with empty chunks. """
+        self.chunks = []
+
+    def write(self, block):
+        """ record at most 5 bytes of block. """
+        self.chunks.append(bytes(block[:5]))
+        return len(self.chunks[-1])
+
+
+class _Socket(object):
+    """ imitation of socket. """
+    def __init__(self):
+        """ initialize with empty chunks. """
+        self.chunks = []
+
+    def sendall(self, data):
+        """ record data. """
+        self.chunks.append(data)
+
+
+class TestWrite(unittest.TestCase):
+    """ test write_table() and write_canvas(). """
+    def test_write_table(self):
+        """ test write_table() writes same string as create_table(). """
+        for colspan, rowspan in ((False, False), (True, True)):
+            required = ''.join(rika.html_image.create_table(
+                3, 2, _RGBA, colspan, rowspan))
+            fp = io.StringIO()
+            self.assertEqual(
+                len(required),
+                rika.html_image.write_table(fp, 3, 2, _RGBA, colspan,
+                                            rowspan)
+            )
+            self.assertEqual(required, fp.getvalue())
+
+    def test_write_canvas(self):
+        """ test write_canvas() writes same bytes as create_canvas(). """
+        rgba = _RGBA * 30000  # larger than ENCODE_PIXELS and ENCODE_BYTES
+        for payload in rika.html_image.PAYLOADS:
+            required = ''.join(rika.html_image.create_canvas(
+                'c', 300, 600, rgba, True, payload))
+            fp = io.BytesIO()
+            rika.html_image.write_canvas(fp, 'c', 300, 600, rgba, True,
+                                         payload)
+            self.assertEqual(required.encode('ascii'), fp.getvalue())
+        text = ''.join(rika.html_image.create_canvas(
+            'c', 300, 600, rgba, True, 'deflate'))
+        self.assertEqual(bytes(v for p in rgba for v in p),
+                         zlib.decompress(_payload(text)))
+        self.assertRaises(
+            ValueError,
+            rika.html_image.write_canvas, io.BytesIO(), 'c', 3, 2, _RGBA,
+            True, 'gzip'
+        )
+
+    def test_chunk_size(self):
+        """ test each write is bounded by chunk_size. """
+        required = ''.join(rika.html_image.create_canvas('c', 3, 2, _RGBA,
+                                                         True))
+        chunks = []
+        fp = io.StringIO()
+        fp.write = lambda text: chunks.append(text)
+        rika.html_image.write_canvas(fp, 'c', 3, 2, _RGBA, True,
+                                     chunk_size=16)
+        self.assertEqual(required, ''.join(chunks))
+        self.assertTrue(all(len(i) <= 16 for i in chunks))
+
+    def test_short_write_and_socket(self):
+        """ test short writes are retried, and socket uses sendall(). """
+        required = ''.join(rika.html_image.create_table(3, 2, _RGBA))
+        for fp in (_Writer(), _Socket()):
+            rika.html_image.write_table(fp, 3, 2, _RGBA)
+            self.assertEqual(required.encode('ascii'), b''.join(fp.chunks))
+
+
+class TestPil(unittest.TestCase):
+    """ test PIL image with and without NumPy. """
+    @unittest.skipIf(PIL is None, 'Pillow is required')
+    def test_without_numpy(self):
+        """ test PIL image gives same string as list without NumPy. """
+        image = PIL.Image.new('RGBA', (3, 2))
+        image.putdata(_RGBA)
+        numpy = rika.html_image._numpy
+        try:
+            rika.html_image._numpy = None
+            for payload in rika.html_image.PAYLOADS:
+                self.assertEqual(
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 3, 2, _RGBA, True, payload)),
+                    ''.join(rika.html_image.create_canvas(
+                        'c', 3, 2, image, True, payload))
+                )
+            self.assertEqual(
+                ''.join(rika.html_image.create_table(3, 2, _RGBA, True)),
+                ''.join(rika.html_image.create_table(3, 2, image, True))
+            )
+            image = image.convert('RGB')
+            self.assertEqual(
+                ''.join(rika.html_image.create_canvas(
+                    'c', 3, 2, _RGBA, False, 'base64')),
+                ''.join(rika.html_image.create_canvas(
+                    'c', 3, 2, image, False, 'base64'))
+            )
+        finally:
+            rika.html_image._numpy = numpy
+
+    @unittest.skipIf(PIL is None, 'Pillow is required')
+    def test_modes(self):
+        """ test palette and grayscale PNG are converted into RGBA. """
+        rgba = [p[:3] + (255,) for p in _RGBA]
+        gray_alpha = [(p[0], p[3]) for p in _RGBA]
+        images = (
+            (PIL.Image.new('RGB', (3, 2)).quantize(), rgba),
+            (PIL.Image.new('LA', (3, 2)),
+             [(g, g, g, a) for g, a in gray_alpha]),
+        )
+        images[0][0].putpalette([v for p in rgba for v in p[:3]])
+        images[0][0].putdata(range(6))
+        images[1][0].putdata(gray_alpha)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for index, (image, required) in enumerate(images):
+                path = os.path.join(tmp_dir, '{0}.png'.format(index))
+                image.save(path)
+                for payload in rika.html_image.PAYLOADS:
+                    text = ''.join(rika.html_image.create_canvas_by_pil(
+                        path, 'c', payload))
+                    self.assertEqual(
+                        ''.join(rika.html_image.create_canvas(
+                            'c', 3, 2, required, True, payload)),
+                        text
+                    )
+                text = ''.join(rika.html_image.create_canvas_by_pil(
+                    path, 'c', 'base64'))
+                self.assertEqual(bytes(v for p in required for v in p),
+                                 _payload(text))
+
+
+if __name__ == '__main__':
+    unittest.main()